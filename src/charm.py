@@ -15,16 +15,29 @@
 
 """Charmed operator for proxying uncharmed MySQL databases to charmed applications."""
 
+import json
 import logging
+import subprocess
+from typing import cast
 
 import ops
-from charms.data_platform_libs.v0.data_interfaces import DatabaseProvides, DatabaseRequestedEvent
+from charms.data_platform_libs.v0.data_interfaces import DatabaseRequestedEvent
 from hpc_libs.interfaces import block_unless
 from hpc_libs.utils import StopCharm, leader, refresh
 
+import peers
 import proxy
-from constants import DATABASE_INTEGRATION_NAME, DB_URI_SECRET_LABEL
-from state import check_mysql_proxy, db_uri_secret_exists
+from constants import (
+    DATABASE_INTEGRATION_NAME,
+    DB_URI_SECRET_LABEL,
+    DIRECT_MODE,
+    PEER_INTEGRATION_NAME,
+    POOLED_MODE,
+    TLS_SECRET_LABEL,
+)
+from hook_tools import HookToolTracer
+from provides import MySQLProvides
+from state import check_mysql_proxy, db_uri_secret_exists, proxy_config_valid
 
 logger = logging.getLogger(__name__)
 refresh = refresh(hook=check_mysql_proxy)
@@ -36,45 +49,67 @@ class MySQLProxyCharm(ops.CharmBase):
 
     def __init__(self, framework: ops.Framework) -> None:
         super().__init__(framework)
+        # Created before the hook tool tracer so that the integration data staged by the
+        # provider is written, and traced, before the tracer reports the dispatch.
+        self.mysql = MySQLProvides(self, DATABASE_INTEGRATION_NAME)
+        self.hook_tools = HookToolTracer(self)
         framework.observe(self.on.install, self._on_install)
         framework.observe(self.on.config_changed, self._on_config_changed)
         framework.observe(self.on.secret_changed, self._on_secret_changed)
+        framework.observe(self.on.secret_remove, self._on_secret_remove)
+        framework.observe(self.on.update_status, self._on_update_status)
+        framework.observe(self.on.leader_elected, self._on_peers_changed)
+        framework.observe(self.on[PEER_INTEGRATION_NAME].relation_changed, self._on_peers_changed)
+        framework.observe(self.on[PEER_INTEGRATION_NAME].relation_departed, self._on_peers_changed)
+        framework.observe(self.on.remove, self._on_remove)
+        framework.observe(self.on.top_queries_action, self._on_top_queries_action)
+        framework.observe(self.on.hook_tools_action, self._on_hook_tools_action)
 
-        self.mysql = DatabaseProvides(self, DATABASE_INTEGRATION_NAME)
         framework.observe(self.mysql.on.database_requested, self._on_database_requested)
+        for event in (
+            self.on[DATABASE_INTEGRATION_NAME].relation_changed,
+            self.on[DATABASE_INTEGRATION_NAME].relation_departed,
+            self.on[DATABASE_INTEGRATION_NAME].relation_broken,
+        ):
+            framework.observe(event, self._on_database_integration_changed)
 
     @refresh
     def _on_install(self, _: ops.InstallEvent):
-        if not self.unit.is_leader():
-            raise StopCharm(
-                ops.BlockedStatus(
-                    "MySQL proxy high-availability is not supported. Scale down application"
-                )
-            )
+        """Handle when the proxy unit is installed."""
 
-    @leader
     @refresh
     @block_unless(db_uri_secret_exists)
+    @block_unless(proxy_config_valid)
     def _on_config_changed(self, _: ops.ConfigChangedEvent):
         """Handle when the proxy's configuration is changed."""
-        try:
-            data = proxy.load_database_data(self)
-        except ValueError as e:
-            logger.error(e)
-            raise StopCharm(
-                ops.BlockedStatus("Failed to load database URI. See `juju debug-log` for details")
-            )
+        self._update_proxy()
 
-        proxy.set_database_data(self, data)
-
-    @leader
     @refresh
     @block_unless(db_uri_secret_exists)
+    @block_unless(proxy_config_valid)
     def _on_secret_changed(self, event: ops.SecretChangedEvent) -> None:
-        """Handle when the database URI secret is changed."""
-        if event.secret.label != DB_URI_SECRET_LABEL:
+        """Handle when the database URI or TLS secret is changed."""
+        if event.secret.label not in (DB_URI_SECRET_LABEL, TLS_SECRET_LABEL):
+            return
+
+        self._update_proxy()
+
+    @leader
+    def _on_secret_remove(self, event: ops.SecretRemoveEvent) -> None:
+        """Handle when no client tracks a revision of an integration secret anymore.
+
+        Rotating the proxied database's credentials creates a new revision of every
+        integration's secret. Juju emits `secret-remove` for each old revision once
+        every client has moved to a newer one, so the revision can be pruned.
+        """
+        if not (event.secret.label or "").startswith(f"{DATABASE_INTEGRATION_NAME}."):
             return
 
+        logger.debug("removing revision %d of secret %s", event.revision, event.secret.label)
+        event.remove_revision()
+
+    def _update_proxy(self) -> None:
+        """Update the proxy service of this unit, and the integration data if leader."""
         try:
             data = proxy.load_database_data(self)
         except ValueError as e:
@@ -83,11 +118,89 @@ class MySQLProxyCharm(ops.CharmBase):
                 ops.BlockedStatus("Failed to load database URI. See `juju debug-log` for details")
             )
 
-        proxy.set_database_data(self, data)
+        try:
+            tls = proxy.load_tls_data(self)
+        except ValueError as e:
+            logger.error(e)
+            raise StopCharm(
+                ops.BlockedStatus("Failed to load TLS secret. See `juju debug-log` for details")
+            )
+
+        try:
+            proxy.update_service(self, data, tls)
+        except subprocess.CalledProcessError:
+            peers.publish_endpoint(self, "")
+            raise StopCharm(
+                ops.BlockedStatus(
+                    "Failed to update MySQL proxy service. See `juju debug-log` for details"
+                )
+            )
+
+        self._publish_endpoint()
+        if self.unit.is_leader():
+            proxy.set_database_data(self, data, tls=tls)
+
+    @refresh
+    def _on_update_status(self, _: ops.UpdateStatusEvent) -> None:
+        """Refresh the unit status and continue updating integrations left by earlier hooks."""
+        proxy.probe_backend(self)
+        changed = self._publish_endpoint()
+        if self.unit.is_leader():
+            # Other units changing health emit `relation-changed` on the peer integration,
+            # but this unit does not, so its endpoint changes are handled here.
+            if changed:
+                proxy.update_endpoints(self)
+            proxy.resume_database_data(self)
+
+    @leader
+    def _on_peers_changed(self, _: ops.EventBase) -> None:
+        """Handle when proxy units join, leave, or change health."""
+        proxy.update_endpoints(self)
+
+    def _publish_endpoint(self) -> bool:
+        """Publish the proxy endpoint of this unit to its peers while it is healthy.
+
+        Returns:
+            `True` if the published endpoint changed.
+        """
+        # The leader is in maintenance while it pages through integrations, but healthy.
+        healthy = self.config.get("mode") != DIRECT_MODE and not isinstance(
+            check_mysql_proxy(self), ops.BlockedStatus
+        )
+        return peers.publish_endpoint(self, proxy.local_endpoint(self) if healthy else "")
+
+    def _on_remove(self, _: ops.RemoveEvent) -> None:
+        """Handle when the proxy unit is removed."""
+        try:
+            proxy.remove_service()
+        except subprocess.CalledProcessError:
+            logger.warning("failed to remove MySQL proxy service. ignoring")
+
+    def _on_top_queries_action(self, event: ops.ActionEvent) -> None:
+        """Show the query digests with the highest total execution time."""
+        if self.config.get("mode") != POOLED_MODE:
+            event.fail("Query digests are only collected in `pooled` mode")
+            return
+
+        queries = proxy.top_queries(cast(int, event.params["limit"]))
+        event.set_results({"queries": json.dumps(queries, indent=2)})
+
+    def _on_hook_tools_action(self, event: ops.ActionEvent) -> None:
+        """Show the hook tools invoked by each event handler since the report was reset."""
+        event.set_results({"report": json.dumps(self.hook_tools.report(), indent=2)})
+        if event.params["reset"]:
+            self.hook_tools.reset()
+
+    def _on_database_integration_changed(self, event: ops.RelationEvent) -> None:
+        """Handle when client units join or leave a database integration."""
+        proxy.update_clients(self)
+        if self.unit.is_leader() and not isinstance(event, ops.RelationBrokenEvent):
+            proxy.update_endpoints(self, event.relation)
 
     @leader
     @refresh
     @block_unless(db_uri_secret_exists)
+    @block_unless(proxy_config_valid)
     def _on_database_requested(self, event: DatabaseRequestedEvent) -> None:
         """Handle when a client requests a database."""
         try:
@@ -98,7 +211,15 @@ class MySQLProxyCharm(ops.CharmBase):
                 ops.BlockedStatus("Failed to load database URI. See `juju debug-log` for details")
             )
 
-        proxy.set_database_data(self, data, integration_id=event.relation.id)
+        try:
+            tls = proxy.load_tls_data(self)
+        except ValueError as e:
+            logger.error(e)
+            raise StopCharm(
+                ops.BlockedStatus("Failed to load TLS secret. See `juju debug-log` for details")
+            )
+
+        proxy.set_database_data(self, data, tls=tls, integration_id=event.relation.id)
 
 
 if __name__ == "__main__":  # pragma: nocover
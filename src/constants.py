@@ -14,7 +14,41 @@
 
 """Constants used within the MySQL proxy charmed operation."""
 
+from pathlib import Path
+
 DATABASE_INTEGRATION_NAME = "database"
+PEER_INTEGRATION_NAME = "mysql-proxy-peers"
 
 DB_URI_SECRET_LABEL = "mysql-proxy-db-uri"
 DB_URI_SECRET_KEY = "db-uri"
+
+TLS_SECRET_LABEL = "mysql-proxy-tls"
+TLS_SECRET_KEY = "tls-secret"
+
+DIRECT_MODE = "direct"
+PASSTHROUGH_MODE = "passthrough"
+POOLED_MODE = "pooled"
+PROXY_MODES = (DIRECT_MODE, PASSTHROUGH_MODE, POOLED_MODE)
+
+# Seconds to wait for a backend endpoint to answer a probe.
+BACKEND_PROBE_TIMEOUT = 5.0
+# Age, in seconds, above which backend probe results are ignored.
+BACKEND_PROBE_MAX_AGE = 900.0
+# Age, in seconds, above which unchanged backend probe results are published again so
+# that peers do not ignore them.
+BACKEND_PROBE_REPUBLISH_AGE = BACKEND_PROBE_MAX_AGE / 2
+
+# Seconds a hook may spend updating the data of database integrations. Remaining
+# integrations are updated by later hooks.
+INTEGRATION_UPDATE_BUDGET = 60.0
+
+PROXY_SERVICE = "mysql-proxy"
+PROXY_SERVICE_FILE = Path(f"/etc/systemd/system/{PROXY_SERVICE}.service")
+PROXY_CONFIG_FILE = Path("/etc/mysql-proxy/proxy.json")
+PROXY_CLIENTS_FILE = Path("/etc/mysql-proxy/clients.json")
+PROXY_RUNTIME_DIR = Path("/run/mysql-proxy")
+PROXY_UNIX_SOCKET = PROXY_RUNTIME_DIR / "mysql.sock"
+PROXY_SLOW_QUERY_LOG = Path("/var/log/mysql-proxy/slow-query.log")
+PROXY_TLS_CERT_FILE = Path("/etc/mysql-proxy/tls/cert.pem")
+PROXY_TLS_KEY_FILE = Path("/etc/mysql-proxy/tls/key.pem")
+PROXY_BACKEND_CA_FILE = Path("/etc/mysql-proxy/tls/backend-ca.pem")
@@ -0,0 +1,157 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Count and time the hook tools invoked by the charm."""
+
+import functools
+import logging
+import time
+from collections.abc import Callable
+from typing import Any
+
+import ops
+
+_logger = logging.getLogger(__name__)
+
+# Methods of the ops model backend that invoke a hook tool, mapped to the hook tool.
+HOOK_TOOLS = {
+    "action_fail": "action-fail",
+    "action_get": "action-get",
+    "action_log": "action-log",
+    "action_set": "action-set",
+    "application_version_set": "application-version-set",
+    "close_port": "close-port",
+    "config_get": "config-get",
+    "credential_get": "credential-get",
+    "is_leader": "is-leader",
+    "juju_log": "juju-log",
+    "network_get": "network-get",
+    "open_port": "open-port",
+    "opened_ports": "opened-ports",
+    "planned_units": "goal-state",
+    "relation_get": "relation-get",
+    "relation_ids": "relation-ids",
+    "relation_list": "relation-list",
+    "relation_model_get": "relation-model-get",
+    "relation_remote_app_name": "relation-list",
+    "relation_set": "relation-set",
+    "resource_get": "resource-get",
+    "secret_add": "secret-add",
+    "secret_get": "secret-get",
+    "secret_grant": "secret-grant",
+    "secret_info_get": "secret-info-get",
+    "secret_remove": "secret-remove",
+    "secret_revoke": "secret-revoke",
+    "secret_set": "secret-set",
+    "status_get": "status-get",
+    "status_set": "status-set",
+    "storage_add": "storage-add",
+    "storage_get": "storage-get",
+    "storage_list": "storage-list",
+}
+
+
+class HookToolTracer(ops.Object):
+    """Count and time every hook tool invocation of the charm, per event handler.
+
+    The methods of the charm's model backend are wrapped so that each hook tool
+    invocation is recorded against the event being handled when it is invoked.
+    A summary of the invocations of the current dispatch is logged at debug level
+    before the dispatch commits, and merged into a report kept across dispatches
+    in the unit's local state.
+
+    Args:
+        charm: Charm whose hook tool invocations to trace.
+        key: Key of the tracer in the charm's framework.
+    """
+
+    _stored = ops.StoredState()
+
+    def __init__(self, charm: ops.CharmBase, key: str = "hook-tools") -> None:
+        super().__init__(charm, key)
+        self._stored.set_default(report={})
+        # Maps event names to hook tools to their number of calls and total seconds.
+        self.calls: dict[str, dict[str, list[float]]] = {}
+        self._backend = charm.model._backend
+        for method, tool in HOOK_TOOLS.items():
+            if function := getattr(self._backend, method, None):
+                setattr(self._backend, method, self._trace(tool, function))
+
+        self.framework.observe(self.framework.on.pre_commit, self._on_pre_commit)
+
+    def report(self) -> dict[str, dict[str, dict[str, float]]]:
+        """Get the hook tool invocations of every dispatch since the report was last reset.
+
+        Returns:
+            Map of event names to hook tools to their number of `calls` and total `seconds`.
+        """
+        report = _merge(dict(self._stored.report), self.calls)
+        return {
+            event: {tool: {"calls": int(n), "seconds": round(t, 6)} for tool, (n, t) in tools}
+            for event, tools in sorted(
+                (event, sorted(tools.items())) for event, tools in report.items()
+            )
+        }
+
+    def reset(self) -> None:
+        """Reset the report, including the invocations of the current dispatch."""
+        self._stored.report = {}
+        self.calls = {}
+
+    def _trace(self, tool: str, function: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(function)
+        def traced(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                # The backend tracks the event being handled, if any.
+                event = getattr(self._backend, "_hook_is_running", "") or "dispatch"
+                calls = self.calls.setdefault(event, {}).setdefault(tool, [0, 0.0])
+                calls[0] += 1
+                calls[1] += time.perf_counter() - started
+
+        return traced
+
+    def _on_pre_commit(self, _: ops.PreCommitEvent) -> None:
+        """Log the hook tool invocations of the dispatch and add them to the report."""
+        for event, tools in sorted(self.calls.items()):
+            _logger.debug(
+                "hook tools used by %s: %s",
+                event,
+                ", ".join(
+                    f"{tool} x{int(n)} ({t:.3f}s)"
+                    for tool, (n, t) in sorted(tools.items(), key=lambda item: -item[1][1])
+                ),
+            )
+
+        self._stored.report = _merge(dict(self._stored.report), self.calls)
+        self.calls = {}
+
+
+def _merge(
+    report: dict[str, dict[str, list[float]]], calls: dict[str, dict[str, list[float]]]
+) -> dict[str, dict[str, list[float]]]:
+    """Add hook tool invocations to a report. Returns a new report."""
+    merged = {
+        event: {tool: list(c) for tool, c in tools.items()} for event, tools in report.items()
+    }
+    for event, tools in calls.items():
+        for tool, (n, t) in tools.items():
+            total = merged.setdefault(event, {}).setdefault(tool, [0, 0.0])
+            total[0] += n
+            total[1] += t
+
+    return merged
@@ -0,0 +1,279 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Manage the peer integration between MySQL proxy units."""
+
+import hashlib
+import json
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+from ops import CharmBase
+
+from constants import BACKEND_PROBE_REPUBLISH_AGE, PEER_INTEGRATION_NAME
+from proxyd.probe import ProbeResult
+
+if TYPE_CHECKING:
+    from charm import MySQLProxyCharm
+
+_logger = logging.getLogger(__name__)
+
+ENDPOINT_KEY = "endpoint"
+PROBES_KEY = "probes"
+CURSOR_KEY = "integration-update-cursor"
+# Prefix of the keys holding the digests of each client's databag, by integration ID.
+DIGESTS_KEY_PREFIX = "integration-digests-"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Progress of an update of every database integration spanning several hooks.
+
+    Attributes:
+        next_id: ID of the next integration to update. Integrations are updated
+            by increasing ID.
+        done: Number of integrations updated so far.
+        total: Number of integrations to update.
+        endpoints_only: Whether only the proxy endpoints of the integrations are updated.
+    """
+
+    next_id: int
+    done: int
+    total: int
+    endpoints_only: bool = False
+
+
+def publish_endpoint(charm: "MySQLProxyCharm", endpoint: str) -> bool:
+    """Publish the proxy endpoint of this unit to its peers.
+
+    Args:
+        charm: Instance of the charm to access the peer integration.
+        endpoint: Endpoint that clients may connect to. The unit's endpoint is
+            withdrawn if empty, e.g. if the unit's proxy service is not healthy.
+
+    Returns:
+        `True` if the published endpoint changed.
+    """
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return False
+
+    databag = integration.data[charm.unit]
+    if databag.get(ENDPOINT_KEY, "") == endpoint:
+        return False
+
+    if endpoint:
+        databag[ENDPOINT_KEY] = endpoint
+    else:
+        databag.pop(ENDPOINT_KEY, None)
+    return True
+
+
+def endpoints(charm: "MySQLProxyCharm") -> dict[str, str]:
+    """Get the proxy endpoints published by every unit, including this unit.
+
+    Args:
+        charm: Instance of the charm to access the peer integration.
+
+    Returns:
+        Map of unit names to the endpoint published by the unit, ordered by unit
+        number. Units that have not published an endpoint are left out.
+    """
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return {}
+
+    published = {
+        unit.name: endpoint
+        for unit in (charm.unit, *integration.units)
+        if (endpoint := integration.data[unit].get(ENDPOINT_KEY))
+    }
+    return dict(sorted(published.items(), key=lambda item: _unit_number(item[0])))
+
+
+def units(charm: "MySQLProxyCharm") -> list[str]:
+    """Get the names of every unit of the application, including this unit.
+
+    Returns:
+        Names of the units, ordered by unit number. Empty if the peer integration
+        has not been established yet.
+    """
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return []
+
+    return sorted((unit.name for unit in (charm.unit, *integration.units)), key=_unit_number)
+
+
+def publish_probes(charm: "MySQLProxyCharm", results: list[ProbeResult]) -> None:
+    """Publish the results of the backend probes run by this unit to its peers.
+
+    The timestamp and round-trip time of every probe change on each run, but peers only
+    act on whether endpoints are reachable, their role, and their version. Results are
+    therefore only published again once the outcome of a probe changes, or once the
+    published results are old enough that peers would soon ignore them, so that probes
+    do not emit `relation-changed` on every peer each time they run.
+    """
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return
+
+    databag = integration.data[charm.unit]
+    try:
+        published = [ProbeResult(**result) for result in json.loads(databag.get(PROBES_KEY, "[]"))]
+    except (ValueError, TypeError):
+        published = []
+
+    now = time.time()
+    if (
+        PROBES_KEY in databag
+        and _outcomes(published) == _outcomes(results)
+        and all(now - result.timestamp < BACKEND_PROBE_REPUBLISH_AGE for result in published)
+    ):
+        return
+
+    databag[PROBES_KEY] = json.dumps([asdict(result) for result in results], sort_keys=True)
+
+
+def probe_results(charm: "MySQLProxyCharm") -> list[ProbeResult]:
+    """Get the results of the backend probes published by every unit, including this unit."""
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return []
+
+    results = []
+    for unit in (charm.unit, *integration.units):
+        try:
+            content = json.loads(integration.data[unit].get(PROBES_KEY, "[]"))
+            results.extend(ProbeResult(**result) for result in content)
+        except (ValueError, TypeError) as e:
+            _logger.warning("ignoring invalid backend probe results of %s: %s", unit.name, e)
+
+    return results
+
+
+def load_cursor(charm: "MySQLProxyCharm") -> Cursor | None:
+    """Load the progress of the pending update of every database integration, if any."""
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return None
+
+    if not (content := integration.data[charm.app].get(CURSOR_KEY)):
+        return None
+
+    try:
+        return Cursor(**json.loads(content))
+    except (ValueError, TypeError) as e:
+        _logger.warning("ignoring invalid integration update cursor: %s", e)
+        return None
+
+
+def save_cursor(charm: "MySQLProxyCharm", cursor: Cursor | None) -> bool:
+    """Save the progress of an update of every database integration.
+
+    The cursor is saved in the application databag of the peer integration, so that
+    a new leader continues the update. Must only be called by the leader.
+
+    Args:
+        charm: Instance of the charm to access the peer integration.
+        cursor: Progress to save, or `None` if the update is complete.
+
+    Returns:
+        `True` if the cursor was saved, `False` if the peer integration has not been
+        established yet.
+    """
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return False
+
+    databag = integration.data[charm.app]
+    if cursor:
+        databag[CURSOR_KEY] = json.dumps(asdict(cursor), sort_keys=True)
+    else:
+        databag.pop(CURSOR_KEY, None)
+    return True
+
+
+def load_digests(charm: CharmBase, integration_id: int) -> dict[str, str] | None:
+    """Load the digests of a client's databag at its last diff, if any."""
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return None
+
+    if not (content := integration.data[charm.app].get(f"{DIGESTS_KEY_PREFIX}{integration_id}")):
+        return None
+
+    try:
+        digests = json.loads(content)
+    except ValueError as e:
+        _logger.warning("ignoring invalid digests of integration %d: %s", integration_id, e)
+        return None
+
+    return digests if isinstance(digests, dict) else None
+
+
+def save_digests(charm: CharmBase, integration_id: int, digests: dict[str, str] | None) -> bool:
+    """Save the digests of a client's databag to tell which fields change next.
+
+    The digests are saved in the application databag of the peer integration rather
+    than in the database integration, where clients would see them, and so that a new
+    leader keeps telling changes apart. Must only be called by the leader.
+
+    Args:
+        charm: Instance of the charm to access the peer integration.
+        integration_id: ID of the database integration of the client.
+        digests: Digests to save, or `None` if the integration is gone.
+
+    Returns:
+        `True` if the digests were saved, `False` if the peer integration has not been
+        established yet.
+    """
+    if (integration := charm.model.get_relation(PEER_INTEGRATION_NAME)) is None:
+        return False
+
+    databag = integration.data[charm.app]
+    key = f"{DIGESTS_KEY_PREFIX}{integration_id}"
+    if digests is not None:
+        databag[key] = json.dumps(digests, sort_keys=True)
+    else:
+        databag.pop(key, None)
+    return True
+
+
+def rank(key: str, units: Iterable[str]) -> list[str]:
+    """Rank proxy units by preference for `key` with rendezvous hashing.
+
+    Every unit is scored by hashing it together with `key`, and units are ranked by
+    descending score. Keys are spread evenly across units, and when a unit joins or
+    leaves, only the keys that rank it first, about 1/N of them, change their
+    preferred unit. The ranking of the remaining units is left unchanged.
+
+    Args:
+        key: Key to rank units for, e.g. the ID of a client integration.
+        units: Names of the units to rank.
+
+    Returns:
+        Names of the units, most preferred first.
+    """
+
+    def score(unit: str) -> bytes:
+        return hashlib.blake2b(f"{key}/{unit}".encode(), digest_size=8).digest()
+
+    return sorted(units, key=score, reverse=True)
+
+
+def _unit_number(name: str) -> int:
+    """Get the number of a unit from its name, e.g. `1` for `mysql-proxy/1`."""
+    return int(name.rpartition("/")[2])
+
+
+def _outcomes(results: list[ProbeResult]) -> set[tuple[str, bool, str, str]]:
+    """Get the outcome of each probe, leaving out what changes on every probe."""
+    return {(result.endpoint, result.reachable, result.role, result.version) for result in results}
@@ -0,0 +1,264 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Provide MySQL databases to client applications over the `mysql_client` interface."""
+
+import hashlib
+
+from charms.data_platform_libs.v0.data_interfaces import (
+    PROV_SECRET_FIELDS,
+    PROV_SECRET_PREFIX,
+    REQ_SECRET_FIELDS,
+    CachedSecret,
+    DatabaseProvides,
+    Diff,
+    SecretCache,
+    SecretGroup,
+    get_encoded_dict,
+    get_encoded_list,
+)
+from ops import (
+    Application,
+    CharmBase,
+    Model,
+    PreCommitEvent,
+    Relation,
+    RelationBrokenEvent,
+    RelationChangedEvent,
+    Unit,
+)
+
+import peers
+from constants import PEER_INTEGRATION_NAME
+
+# Field of the local databag holding a full copy of the client's databag, as set by the library.
+LEGACY_DATA_FIELD = "data"
+
+
+class MySQLProvides(DatabaseProvides):
+    """Provider side of the `mysql_client` interface, tuned for many client integrations.
+
+    `DatabaseProvides` is extended rather than patched so that the charm library can
+    still be updated from Charmhub as is.
+
+    The secret fields requested and provided by a client are decoded from its databag
+    on every read and write of the integration's data. The decoded fields are memoized
+    per integration for the lifetime of the charm instance, i.e. a single dispatch, and
+    are decoded again only if the client's encoded fields differ from the memoized ones.
+
+    To tell which fields of a client's databag changed, the library keeps a full copy
+    of the databag in the integration's local databag. Only a short digest of every
+    field is kept instead, which the changed fields are found from just as well. The
+    digests are kept in the peer integration, out of sight of clients, and a full copy
+    left by the library is replaced by digests on the next change. The library's full
+    copy is only used until the peer integration is established.
+
+    Every setter of the library writes to the integration's local databag right away,
+    so publishing the data of an integration takes several `relation-set` calls.
+    Changes to the local databags are staged instead, with later changes to a field
+    replacing earlier ones, and written once per integration before the dispatch
+    commits. Fields whose value is unchanged are not written. Reading the local data
+    of an integration through the library writes its staged changes first.
+
+    The secrets of the integrations are looked up in an `IntegrationSecretCache`.
+    """
+
+    def __init__(self, charm: CharmBase, relation_name: str) -> None:
+        super().__init__(charm, relation_name)
+        # Maps integration IDs to the encoded secret fields of the client
+        # and their decoded requested and provided secret fields.
+        self._secret_fields: dict[
+            int, tuple[tuple[str | None, str | None], list[str] | None, list[str] | None]
+        ] = {}
+        self.secrets = IntegrationSecretCache(self._model, self.component, self)
+        # Maps integration IDs to the integration and the changes staged in its local databag.
+        self._staged: dict[int, tuple[Relation, dict[str, str]]] = {}
+        self.framework.observe(self.framework.on.pre_commit, self._on_pre_commit)
+        self.framework.observe(charm.on[relation_name].relation_broken, self._on_relation_broken)
+
+    def flush(self, relation: Relation | None = None) -> None:
+        """Write the changes staged in the local databag of `relation`, or of every integration."""
+        if relation:
+            staged = [self._staged.pop(relation.id)] if relation.id in self._staged else []
+        else:
+            staged, self._staged = list(self._staged.values()), {}
+
+        for integration, changes in staged:
+            integration.data[self.local_app].update(changes)
+
+    def _on_pre_commit(self, _: PreCommitEvent) -> None:
+        """Write the changes staged in the dispatch before it commits."""
+        self.flush()
+
+    def _stage(self, relation: Relation, changes: dict[str, str]) -> None:
+        """Stage changes to the local databag of `relation`. An empty value deletes a field."""
+        self._staged.setdefault(relation.id, (relation, {}))[1].update(changes)
+
+    def _update_relation_data_without_secrets(
+        self, component: Application | Unit, relation: Relation, data: dict[str, str]
+    ) -> None:
+        """Stage changes to the local databag of `relation`."""
+        if component != self.local_app:
+            return super()._update_relation_data_without_secrets(component, relation, data)
+
+        self._stage(relation, data)
+
+    def _delete_relation_data_without_secrets(
+        self, component: Application | Unit, relation: Relation, fields: list[str]
+    ) -> None:
+        """Stage the deletion of `fields` from the local databag of `relation`."""
+        if component != self.local_app:
+            return super()._delete_relation_data_without_secrets(component, relation, fields)
+
+        self._stage(relation, dict.fromkeys(fields, ""))
+
+    def _fetch_my_specific_relation_data(
+        self, relation: Relation, fields: list[str] | None
+    ) -> dict:
+        """Fetch the local data of `relation`, including its staged changes."""
+        self.flush(relation)
+        return super()._fetch_my_specific_relation_data(relation, fields)
+
+    def _load_secrets_from_databag(self, relation: Relation) -> None:
+        """Load the secret fields requested and provided by the client of `relation`."""
+        databag = relation.data[relation.app]
+        encoded = (databag.get(REQ_SECRET_FIELDS), databag.get(PROV_SECRET_FIELDS))
+        memo = self._secret_fields.get(relation.id)
+        if memo is None or memo[0] != encoded:
+            memo = (
+                encoded,
+                get_encoded_list(relation, relation.app, REQ_SECRET_FIELDS),
+                get_encoded_list(relation, relation.app, PROV_SECRET_FIELDS),
+            )
+            self._secret_fields[relation.id] = memo
+
+        _, requested_secrets, provided_secrets = memo
+        if requested_secrets is not None:
+            self._local_secret_fields = requested_secrets
+
+        if provided_secrets is not None:
+            self._remote_secret_fields = provided_secrets
+
+    def _diff(self, event: RelationChangedEvent) -> Diff:
+        """Get the fields of the client's databag changed since the last diff."""
+        bucket = self.relation_data.data_component
+        if not bucket:
+            return Diff([], [], [])
+
+        if self._model.get_relation(PEER_INTEGRATION_NAME) is None:
+            # The digests cannot be saved before the peer integration is established.
+            return super()._diff(event)
+
+        old = peers.load_digests(self.charm, event.relation.id)
+        if old is None:
+            legacy = get_encoded_dict(event.relation, bucket, LEGACY_DATA_FIELD) or {}
+            old = {key: _digest(value) for key, value in legacy.items()}
+
+        new = (
+            {
+                key: _digest(value)
+                for key, value in event.relation.data[event.app].items()
+                if key != LEGACY_DATA_FIELD
+            }
+            if event.app
+            else {}
+        )
+        added = new.keys() - old.keys()
+        deleted = old.keys() - new.keys()
+        changed = {key for key in old.keys() & new.keys() if old[key] != new[key]}
+
+        if new != old or LEGACY_DATA_FIELD in event.relation.data[bucket]:
+            peers.save_digests(self.charm, event.relation.id, new)
+            self._stage(event.relation, {LEGACY_DATA_FIELD: ""})
+        return Diff(added, changed, deleted)
+
+    def _on_relation_broken(self, event: RelationBrokenEvent) -> None:
+        """Forget the digests of the client's databag once its integration is gone."""
+        if self.local_unit.is_leader():
+            peers.save_digests(self.charm, event.relation.id, None)
+
+
+class IntegrationSecretCache(SecretCache):
+    """Cache of the secrets shared with the clients of the provider's integrations.
+
+    The library looks up the secret of every integration and secret group by label,
+    which takes a `secret-get` call per label, including the labels of secrets that
+    were never created, and then fetches the content of every secret it updates again.
+
+    Instead, the secrets of every integration are indexed by label and URI in a
+    single pass over the integrations' local databags when the cache is first used
+    in a dispatch. The URI of every secret is published in the local databag in the
+    same hook the secret is added in, so labels with no published URI are known to
+    have no secret and are not looked up. Indexed secrets are fetched once, when first
+    used, and their content is kept from that fetch, as owners get the content of the
+    latest revision without refreshing it.
+
+    Args:
+        model: Model of the charm.
+        component: Owner of the secrets.
+        provider: Provider whose integrations' secrets to cache.
+    """
+
+    def __init__(
+        self, model: Model, component: Application | Unit, provider: "MySQLProvides"
+    ) -> None:
+        super().__init__(model, component)
+        self.provider = provider
+        # Maps labels of the integrations' secrets to their URI, once indexed.
+        self._uris: dict[str, str] | None = None
+
+    @property
+    def uris(self) -> dict[str, str]:
+        """Map of labels of the integrations' secrets to their URI."""
+        if self._uris is None:
+            self._uris = {}
+            for relation in self.provider.relations:
+                for field, uri in relation.data[self.component].items():
+                    if field.startswith(PROV_SECRET_PREFIX):
+                        group = SecretGroup(field.removeprefix(PROV_SECRET_PREFIX))
+                        label = self.provider._generate_secret_label(
+                            self.provider.relation_name, relation.id, group
+                        )
+                        self._uris[label] = uri
+
+        return self._uris
+
+    def get(
+        self, label: str, uri: str | None = None, legacy_labels: list[str] = []
+    ) -> CachedSecret | None:
+        """Get a secret from the cache, fetching it if it exists but was not used yet."""
+        if label in self._secrets:
+            return self._secrets[label]
+
+        if label.startswith(f"{self.provider.relation_name}.") and not uri:
+            if label not in self.uris:
+                return None
+            uri = self.uris[label]
+
+        secret = super().get(label, uri, legacy_labels)
+        if secret and label in self.uris and secret.meta:
+            # The content was fetched along with the secret.
+            secret._secret_content = secret.meta.get_content()
+        return secret
+
+    def remove(self, label: str) -> None:
+        """Remove a secret and forget its URI."""
+        super().remove(label)
+        self.uris.pop(label, None)
+
+
+def _digest(value: str) -> str:
+    """Get a short digest of a databag field's value."""
+    return hashlib.blake2b(value.encode(), digest_size=8).hexdigest()
@@ -0,0 +1,53 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Run the MySQL proxy daemon."""
+
+import argparse
+import logging
+from pathlib import Path
+
+from proxyd import tls
+from proxyd.config import ProxyConfig
+from proxyd.workers import Supervisor, run_worker, worker_count
+
+
+def main() -> None:
+    """Run the MySQL proxy daemon until it receives `SIGTERM` or `SIGINT`.
+
+    The daemon reloads its configuration file when it receives `SIGHUP`.
+    """
+    parser = argparse.ArgumentParser(prog="proxyd", description=__doc__)
+    parser.add_argument("--config", type=Path, required=True, help="proxy configuration file")
+    parser.add_argument("--log-level", default="INFO", help="logging level")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=args.log_level.upper(),
+        format="%(asctime)s %(levelname)s %(process)d %(name)s: %(message)s",
+    )
+    config = ProxyConfig.load(args.config)
+    context = None
+    if config.tls_cert_file:
+        context = tls.server_context(config.tls_cert_file, config.tls_key_file)
+
+    if (count := worker_count(config)) > 1:
+        Supervisor(config, count=count, path=args.config, tls_context=context).run()
+    else:
+        run_worker(config, path=args.config, tls_context=context)
+
+
+if __name__ == "__main__":  # pragma: nocover
+    main()
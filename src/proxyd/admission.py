@@ -0,0 +1,170 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Limit the number of active backend connections opened by the proxy.
+
+Client sessions that would exceed either the global limit or the limit of the
+client's relation wait in a FIFO queue until a backend connection is released
+or their queue timeout expires. Queued sessions are admitted in arrival order,
+skipping over sessions whose relation is still at its limit so that one busy
+relation cannot block the clients of every other relation.
+"""
+
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from proxyd.stats import WorkerStats
+
+
+class AdmissionTimeoutError(Exception):
+    """Raised when a client session could not be admitted before its queue timeout."""
+
+
+class AdmissionController:
+    """Admission control for backend connections.
+
+    Args:
+        limit: Maximum number of active backend connections. `0` means unlimited.
+        relation_limit: Maximum number of active backend connections per relation.
+            `0` means unlimited.
+        timeout: Seconds a client session may wait in the queue before being rejected.
+        stats: Worker statistics to record queue depth and wait time in.
+    """
+
+    def __init__(
+        self,
+        limit: int = 0,
+        relation_limit: int = 0,
+        timeout: float = 10.0,
+        stats: WorkerStats | None = None,
+    ) -> None:
+        self.limit = limit
+        self.relation_limit = relation_limit
+        self.timeout = timeout
+        self.stats = stats or WorkerStats()
+        self.active = 0
+        self._active_by_relation: dict[str, int] = {}
+        self._queue: deque[tuple[str, asyncio.Future]] = deque()
+        self._queued_by_relation: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def admit(self, relation: str) -> AsyncIterator[None]:
+        """Hold an admission slot for `relation` for the duration of the context.
+
+        Raises:
+            AdmissionTimeoutError: Raised if no slot became available before the timeout.
+        """
+        await self.acquire(relation)
+        try:
+            yield
+        finally:
+            self.release(relation)
+
+    async def acquire(self, relation: str) -> None:
+        """Acquire an admission slot for `relation`, waiting in the queue if necessary.
+
+        Raises:
+            AdmissionTimeoutError: Raised if no slot became available before the timeout.
+        """
+        # Queued sessions are admitted as soon as a slot they can use is released,
+        # so sessions of other relations still in the queue cannot use this slot.
+        if not self._queued_by_relation.get(relation) and self._available(relation):
+            self._take(relation)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queue.append((relation, waiter))
+        self._queued_by_relation[relation] = self._queued_by_relation.get(relation, 0) + 1
+        self.stats.queue_depth += 1
+        self.stats.queued_total += 1
+        queued = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout):
+                await waiter
+        except TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the timeout expired.
+                return
+
+            self.stats.queue_timeouts_total += 1
+            raise AdmissionTimeoutError(
+                f"no backend connection available for relation '{relation}' "
+                + f"after {self.timeout} seconds"
+            )
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just before the session was cancelled.
+                self.release(relation)
+            raise
+        finally:
+            self.stats.queue_wait_seconds_total += time.monotonic() - queued
+            if waiter.cancelled():
+                # Cancelled waiters are left in the queue and skipped by `_wake`.
+                self._dequeued(relation)
+
+    def release(self, relation: str) -> None:
+        """Release an admission slot held by `relation` and admit queued sessions."""
+        self.active -= 1
+        remaining = self._active_by_relation[relation] - 1
+        if remaining:
+            self._active_by_relation[relation] = remaining
+        else:
+            del self._active_by_relation[relation]
+
+        self._wake()
+
+    def _available(self, relation: str) -> bool:
+        """Check if a session of `relation` can be admitted right now."""
+        if self.limit and self.active >= self.limit:
+            return False
+
+        if self.relation_limit:
+            return self._active_by_relation.get(relation, 0) < self.relation_limit
+
+        return True
+
+    def _take(self, relation: str) -> None:
+        self.active += 1
+        self._active_by_relation[relation] = self._active_by_relation.get(relation, 0) + 1
+
+    def _dequeued(self, relation: str) -> None:
+        self.stats.queue_depth -= 1
+        remaining = self._queued_by_relation[relation] - 1
+        if remaining:
+            self._queued_by_relation[relation] = remaining
+        else:
+            del self._queued_by_relation[relation]
+
+    def _wake(self) -> None:
+        """Admit queued sessions in arrival order while slots are available."""
+        skipped: deque[tuple[str, asyncio.Future]] = deque()
+        while self._queue and not (self.limit and self.active >= self.limit):
+            relation, waiter = self._queue.popleft()
+            if waiter.done():
+                continue
+
+            if not self._available(relation):
+                skipped.append((relation, waiter))
+                continue
+
+            self._take(relation)
+            self._dequeued(relation)
+            waiter.set_result(None)
+
+        skipped.extend(self._queue)
+        self._queue = skipped
@@ -0,0 +1,182 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Scramble and verify passwords for MySQL authentication plugins.
+
+Both sides of the `mysql_native_password` and `caching_sha2_password`
+authentication exchanges are implemented: the proxy authenticates itself to
+the backend as a client, and authenticates clients as a server using the
+credentials it publishes to them.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import re
+
+NATIVE_PASSWORD = "mysql_native_password"
+CACHING_SHA2_PASSWORD = "caching_sha2_password"
+SUPPORTED_PLUGINS = (CACHING_SHA2_PASSWORD, NATIVE_PASSWORD)
+
+# `caching_sha2_password` auth-more-data messages.
+REQUEST_PUBLIC_KEY = b"\x02"
+FAST_AUTH_SUCCESS = b"\x03"
+PERFORM_FULL_AUTHENTICATION = b"\x04"
+
+NONCE_SIZE = 20
+
+
+def generate_nonce() -> bytes:
+    """Generate a nonce for a server handshake.
+
+    MySQL clients expect the nonce to be free of `NUL` bytes.
+    """
+    return bytes(byte % 127 + 1 for byte in os.urandom(NONCE_SIZE))
+
+
+def scramble(plugin: str, password: str, nonce: bytes) -> bytes:
+    """Scramble `password` with `nonce` for authentication plugin `plugin`.
+
+    Raises:
+        ValueError: Raised if `plugin` is not supported.
+    """
+    if not password:
+        return b""
+
+    secret = password.encode()
+    if plugin == NATIVE_PASSWORD:
+        stage1 = hashlib.sha1(secret).digest()
+        stage2 = hashlib.sha1(stage1).digest()
+        return _xor(stage1, hashlib.sha1(nonce[:NONCE_SIZE] + stage2).digest())
+
+    if plugin == CACHING_SHA2_PASSWORD:
+        stage1 = hashlib.sha256(secret).digest()
+        stage2 = hashlib.sha256(stage1).digest()
+        return _xor(stage1, hashlib.sha256(stage2 + nonce[:NONCE_SIZE]).digest())
+
+    raise ValueError(f"unsupported authentication plugin '{plugin}'")
+
+
+def verify(plugin: str, password: str, nonce: bytes, response: bytes) -> bool:
+    """Verify that `response` is `password` scrambled with `nonce` for `plugin`."""
+    try:
+        expected = scramble(plugin, password, nonce)
+    except ValueError:
+        return False
+
+    return hmac.compare_digest(expected, response)
+
+
+def encrypt_password(password: str, nonce: bytes, public_key: bytes) -> bytes:
+    """Encrypt `password` for `caching_sha2_password` full authentication.
+
+    The password is obfuscated with the nonce and encrypted with the server's
+    RSA public key using OAEP padding, as expected by the server when full
+    authentication is performed over an unencrypted connection.
+
+    Args:
+        password: Password to encrypt.
+        nonce: Nonce sent by the server in its handshake.
+        public_key: Server's RSA public key in PEM format.
+    """
+    modulus, exponent = _load_rsa_public_key(public_key)
+    message = _xor(password.encode() + b"\0", nonce[:NONCE_SIZE])
+    size = (modulus.bit_length() + 7) // 8
+    padded = _oaep_pad(message, size)
+    return pow(int.from_bytes(padded, "big"), exponent, modulus).to_bytes(size, "big")
+
+
+def _xor(data: bytes, key: bytes) -> bytes:
+    """XOR `data` with `key`, repeating `key` as often as needed."""
+    return bytes(byte ^ key[i % len(key)] for i, byte in enumerate(data))
+
+
+def _oaep_pad(message: bytes, size: int) -> bytes:
+    """Pad `message` with EME-OAEP using SHA-1 and MGF1-SHA-1 (RFC 8017, section 7.1.1)."""
+    digest_size = hashlib.sha1().digest_size
+    if len(message) > size - 2 * digest_size - 2:
+        raise ValueError("password is too long to encrypt with the server's public key")
+
+    block = (
+        hashlib.sha1(b"").digest()
+        + bytes(size - len(message) - 2 * digest_size - 2)
+        + b"\x01"
+        + message
+    )
+    seed = os.urandom(digest_size)
+    masked_block = _xor(block, _mgf1(seed, len(block)))
+    masked_seed = _xor(seed, _mgf1(masked_block, digest_size))
+    return b"\0" + masked_seed + masked_block
+
+
+def _mgf1(seed: bytes, length: int) -> bytes:
+    output = b""
+    counter = 0
+    while len(output) < length:
+        output += hashlib.sha1(seed + counter.to_bytes(4, "big")).digest()
+        counter += 1
+
+    return output[:length]
+
+
+def _load_rsa_public_key(pem: bytes) -> tuple[int, int]:
+    """Load the modulus and public exponent of a PEM-encoded RSA public key.
+
+    Both `SubjectPublicKeyInfo` ("PUBLIC KEY") and PKCS#1 ("RSA PUBLIC KEY")
+    encodings are supported.
+
+    Raises:
+        ValueError: Raised if `pem` is not a valid RSA public key.
+    """
+    match = re.search(rb"-----BEGIN ((?:RSA )?PUBLIC KEY)-----(.+?)-----END", pem, re.DOTALL)
+    if not match:
+        raise ValueError("server did not send a PEM-encoded public key")
+
+    der = base64.b64decode(b"".join(match.group(2).split()))
+    if match.group(1) == b"PUBLIC KEY":
+        # SubjectPublicKeyInfo ::= SEQUENCE { AlgorithmIdentifier, BIT STRING }
+        body, _ = _der_read(der, 0x30)
+        _, offset = _der_read(body, 0x30)
+        bits, _ = _der_read(body, 0x03, offset)
+        der = bits[1:]  # Skip the number of unused bits.
+
+    # RSAPublicKey ::= SEQUENCE { modulus INTEGER, publicExponent INTEGER }
+    body, _ = _der_read(der, 0x30)
+    modulus, offset = _der_read(body, 0x02)
+    exponent, _ = _der_read(body, 0x02, offset)
+    return int.from_bytes(modulus, "big"), int.from_bytes(exponent, "big")
+
+
+def _der_read(data: bytes, tag: int, offset: int = 0) -> tuple[bytes, int]:
+    """Read a DER element with tag `tag` at `offset`.
+
+    Returns:
+        The element's content and the offset of the next element.
+    """
+    if offset + 2 > len(data) or data[offset] != tag:
+        raise ValueError("malformed public key")
+
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        count = length & 0x7F
+        length = int.from_bytes(data[offset : offset + count], "big")
+        offset += count
+
+    if offset + length > len(data):
+        raise ValueError("malformed public key")
+
+    return data[offset : offset + length], offset + length
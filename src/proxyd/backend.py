@@ -0,0 +1,496 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Connect and authenticate to backend MySQL servers."""
+
+import asyncio
+import logging
+import socket
+import ssl
+import struct
+import time
+from dataclasses import dataclass
+
+from proxyd import auth, compression, protocol
+from proxyd.breaker import Breakers
+from proxyd.config import split_endpoint
+from proxyd.protocol import PacketStream, ProtocolError, ServerError
+from proxyd.stats import WorkerStats
+
+_logger = logging.getLogger(__name__)
+
+# Capabilities the proxy is able to handle on backend connections.
+SUPPORTED_CAPABILITIES = (
+    protocol.CLIENT_LONG_PASSWORD
+    | protocol.CLIENT_FOUND_ROWS
+    | protocol.CLIENT_LONG_FLAG
+    | protocol.CLIENT_CONNECT_WITH_DB
+    | protocol.CLIENT_IGNORE_SPACE
+    | protocol.CLIENT_PROTOCOL_41
+    | protocol.CLIENT_INTERACTIVE
+    | protocol.CLIENT_TRANSACTIONS
+    | protocol.CLIENT_SECURE_CONNECTION
+    | protocol.CLIENT_MULTI_STATEMENTS
+    | protocol.CLIENT_MULTI_RESULTS
+    | protocol.CLIENT_PS_MULTI_RESULTS
+    | protocol.CLIENT_PLUGIN_AUTH
+    | protocol.CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA
+    | protocol.CLIENT_SESSION_TRACK
+    | protocol.CLIENT_DEPRECATE_EOF
+    | protocol.CLIENT_QUERY_ATTRIBUTES
+)
+MAX_PACKET_SIZE = 1 << 30
+
+
+class BackendError(Exception):
+    """Raised when the proxy cannot connect or authenticate to a backend server."""
+
+
+@dataclass(frozen=True)
+class Credentials:
+    """Credentials used to authenticate to the backend.
+
+    Attributes:
+        username: Username to authenticate as.
+        password: Password of the user.
+        generation: Number of times the credentials have been rotated.
+    """
+
+    username: str
+    password: str
+    generation: int = 0
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Session properties negotiated during the handshake.
+
+    Client sessions can only be served by backend connections with the same
+    profile since these properties change how packets are encoded.
+
+    Attributes:
+        capabilities: Capability flags affecting the command phase.
+        charset: Character set of the connection.
+    """
+
+    capabilities: int
+    charset: int
+
+    @classmethod
+    def negotiate(cls, capabilities: int, charset: int) -> "Profile":
+        """Get the profile of a session from the capabilities offered or requested by a peer."""
+        return cls(
+            capabilities & SUPPORTED_CAPABILITIES & ~protocol.HANDSHAKE_CAPABILITIES, charset
+        )
+
+
+async def open_socket(
+    endpoints: list[str],
+    /,
+    timeout: float,
+    stats: WorkerStats | None = None,
+    breakers: Breakers | None = None,
+) -> tuple[socket.socket, str]:
+    """Open a TCP connection to the first reachable endpoint in `endpoints`.
+
+    Every failed attempt to connect to an endpoint is counted in `stats`. If
+    `breakers` are given, endpoints whose circuit breaker is open are skipped
+    without attempting to connect, and the outcome of every attempt is recorded
+    in the endpoint's breaker.
+
+    Returns:
+        The connected non-blocking socket and the endpoint it is connected to.
+
+    Raises:
+        BackendError: Raised if none of the endpoints are reachable.
+    """
+    loop = asyncio.get_running_loop()
+    errors = []
+    for endpoint in endpoints:
+        if breakers and not breakers.allow(endpoint):
+            errors.append(f"{endpoint}: circuit breaker open")
+            continue
+
+        sock = await _connect_endpoint(loop, endpoint, timeout, stats, errors)
+        if sock is None:
+            if breakers:
+                breakers.failure(endpoint)
+            continue
+
+        if breakers:
+            breakers.success(endpoint)
+        return sock, endpoint
+
+    raise BackendError(f"no backend endpoint reachable ({'; '.join(errors)})")
+
+
+async def _connect_endpoint(
+    loop: asyncio.AbstractEventLoop,
+    endpoint: str,
+    timeout: float,
+    stats: WorkerStats | None,
+    errors: list[str],
+) -> socket.socket | None:
+    """Open a TCP connection to any address of `endpoint`, appending failures to `errors`."""
+    host, port = split_endpoint(endpoint)
+    try:
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        errors.append(f"{endpoint}: {e}")
+        if stats:
+            stats.backend_errors_total += 1
+        return None
+
+    for family, type_, proto, _, address in infos:
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, address), timeout)
+        except (OSError, TimeoutError) as e:
+            errors.append(f"{endpoint}: {e or 'timed out'}")
+            if stats:
+                stats.backend_errors_total += 1
+            sock.close()
+            continue
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    return None
+
+
+class BackendConnection:
+    """Authenticated connection to a backend MySQL server.
+
+    Attributes:
+        sock: Connected non-blocking socket.
+        endpoint: Endpoint the connection is connected to.
+        credentials: Credentials the connection was authenticated with.
+        profile: Session properties negotiated with the server.
+        handshake: Initial handshake sent by the server.
+        schema: Default database currently selected on the connection.
+        last_used: Monotonic time at which the connection was last released.
+        codec: Codec compressing the connection, if compression was negotiated.
+        tls: TLS channel encrypting the connection, if TLS was negotiated.
+    """
+
+    def __init__(
+        self,
+        stream: PacketStream,
+        endpoint: str,
+        credentials: Credentials,
+        profile: Profile,
+        handshake: protocol.Handshake,
+    ) -> None:
+        self.sock = stream.sock
+        self.endpoint = endpoint
+        self.credentials = credentials
+        self.profile = profile
+        self.handshake = handshake
+        self.schema: str | None = None
+        self.last_used = time.monotonic()
+        self.codec = stream.codec
+        self.tls = stream.tls
+        self._stream = stream
+
+    @classmethod
+    async def connect(
+        cls,
+        endpoints: list[str],
+        credentials: Credentials,
+        profile: Profile | None = None,
+        /,
+        timeout: float = 5.0,
+        stats: WorkerStats | None = None,
+        compression_algorithm: str = "",
+        compression_level: int = 0,
+        tls_context: ssl.SSLContext | None = None,
+        tls_session: ssl.SSLSession | None = None,
+        breakers: Breakers | None = None,
+    ) -> "BackendConnection":
+        """Open and authenticate a new backend connection.
+
+        Args:
+            endpoints: Backend endpoints to try in order.
+            credentials: Credentials to authenticate with.
+            profile: Session properties to negotiate. Defaults to every capability
+                supported by both the proxy and the server, and the server's charset.
+            timeout: Seconds to wait for the connection to be established and authenticated.
+            stats: Statistics to count failed connection attempts and compression in.
+            compression_algorithm: Compression algorithm to negotiate, if any. The
+                connection is not compressed if the server does not support it.
+            compression_level: Compression level. Level 0 selects the default level.
+            tls_context: TLS context to encrypt the connection with, if any. The
+                connection fails if the server does not support TLS.
+            tls_session: TLS session to resume, if any.
+            breakers: Circuit breakers of the backend endpoints, if any.
+
+        Raises:
+            BackendError: Raised if the connection cannot be opened or authenticated.
+        """
+        sock, endpoint = await open_socket(
+            endpoints, timeout=timeout, stats=stats, breakers=breakers
+        )
+        try:
+            async with asyncio.timeout(timeout):
+                stream = PacketStream(sock)
+                handshake = protocol.Handshake.decode(await stream.read())
+                if tls_context:
+                    await _start_tls(stream, handshake, endpoint, tls_context, tls_session, stats)
+                return await cls._authenticate(
+                    stream,
+                    handshake,
+                    endpoint,
+                    credentials,
+                    profile,
+                    compression_algorithm,
+                    compression_level,
+                    stats,
+                )
+        except (OSError, TimeoutError, ProtocolError, ServerError) as e:
+            sock.close()
+            if stats:
+                stats.backend_errors_total += 1
+            raise BackendError(f"cannot authenticate to backend endpoint {endpoint}: {e}")
+
+    @classmethod
+    async def _authenticate(
+        cls,
+        stream: PacketStream,
+        handshake: protocol.Handshake,
+        endpoint: str,
+        credentials: Credentials,
+        profile: Profile | None,
+        algorithm: str,
+        level: int,
+        stats: WorkerStats | None,
+    ) -> "BackendConnection":
+        if profile is None:
+            profile = Profile.negotiate(handshake.capabilities, handshake.charset)
+
+        capabilities = (
+            profile.capabilities
+            | protocol.HANDSHAKE_CAPABILITIES & SUPPORTED_CAPABILITIES & handshake.capabilities
+        ) & ~protocol.CLIENT_CONNECT_WITH_DB
+        if stream.tls:
+            capabilities |= protocol.CLIENT_SSL
+        if algorithm and not handshake.capabilities & compression.capability(algorithm):
+            _logger.warning(
+                "backend endpoint %s does not support %s compression", endpoint, algorithm
+            )
+            algorithm = ""
+        if algorithm:
+            capabilities |= compression.capability(algorithm)
+
+        plugin = handshake.auth_plugin
+        if plugin not in auth.SUPPORTED_PLUGINS:
+            plugin = auth.CACHING_SHA2_PASSWORD
+
+        response = protocol.HandshakeResponse(
+            capabilities=capabilities,
+            max_packet_size=MAX_PACKET_SIZE,
+            charset=profile.charset,
+            username=credentials.username,
+            auth_response=auth.scramble(plugin, credentials.password, handshake.nonce),
+            auth_plugin=plugin,
+            zstd_level=level or compression.DEFAULT_LEVELS[compression.ZSTD],
+        )
+        await stream.write(response.encode())
+        await _finish_authentication(stream, credentials.password, plugin, handshake.nonce)
+        if algorithm:
+            # Both peers compress every packet sent after the authentication exchange.
+            stream.codec = compression.Codec(algorithm, level, stats)
+
+        return cls(stream, endpoint, credentials, profile, handshake)
+
+    async def init_db(self, schema: str) -> None:
+        """Select the default database of the connection.
+
+        Raises:
+            ServerError: Raised if the server cannot select the database.
+        """
+        if schema == self.schema:
+            return
+
+        payload = await self._stream.command(bytes((protocol.COM_INIT_DB,)) + schema.encode())
+        if payload[:1] == b"\xff":
+            raise ServerError(payload)
+
+        self.schema = schema
+
+    async def query(self, statement: str) -> list[tuple[str | None, ...]]:
+        """Run a query with the text protocol and get the rows of its result set.
+
+        Raises:
+            ServerError: Raised if the server cannot run the query.
+            ProtocolError: Raised if the response cannot be decoded.
+        """
+        payload = await self._stream.command(bytes((protocol.COM_QUERY,)) + statement.encode())
+        if payload[:1] == b"\xff":
+            raise ServerError(payload)
+        if payload[:1] == b"\x00":
+            return []
+
+        columns, _ = protocol.read_lenenc_int(payload)
+        for _ in range(columns):
+            await self._stream.read()
+        if not self.profile.capabilities & protocol.CLIENT_DEPRECATE_EOF:
+            await self._stream.read()
+
+        rows = []
+        while True:
+            payload = await self._stream.read()
+            if payload[:1] == b"\xff":
+                raise ServerError(payload)
+            if payload[:1] == b"\xfe" and len(payload) < protocol.MAX_PAYLOAD:
+                return rows
+            rows.append(protocol.read_text_row(payload, columns))
+
+    async def reset(self) -> bool:
+        """Reset the session state of the connection with `COM_RESET_CONNECTION`.
+
+        Returns:
+            `True` if the connection was reset and can be reused.
+        """
+        return await self._simple_command(protocol.COM_RESET_CONNECTION)
+
+    async def ping(self) -> bool:
+        """Check that the connection is still alive with `COM_PING`."""
+        return await self._simple_command(protocol.COM_PING)
+
+    @property
+    def tls_session(self) -> ssl.SSLSession | None:
+        """TLS session that new connections can resume, if the connection uses TLS."""
+        return self.tls.session if self.tls else None
+
+    async def send(self, data: bytes | memoryview, /, command: bool = False) -> None:
+        """Send raw packets forwarded from a client to the server.
+
+        Args:
+            data: Raw packets, including their headers.
+            command: Whether `data` starts a new command.
+        """
+        await self._stream.send(data, command=command)
+
+    async def recv(self) -> bytes:
+        """Receive raw packets from the server. Returns no data once the server is done.
+
+        Raises:
+            ProtocolError: Raised if compressed data cannot be decompressed.
+        """
+        return await self._stream.recv()
+
+    def close(self) -> None:
+        """Close the connection without notifying the server."""
+        self.sock.close()
+
+    async def quit(self) -> None:
+        """Close the connection after notifying the server with `COM_QUIT`."""
+        try:
+            self._stream.seq = 0
+            await self._stream.write(bytes((protocol.COM_QUIT,)))
+        except OSError:
+            pass
+        finally:
+            self.close()
+
+    async def _simple_command(self, command: int) -> bool:
+        try:
+            payload = await self._stream.command(bytes((command,)))
+        except OSError as e:
+            _logger.debug("backend connection to %s failed: %s", self.endpoint, e)
+            return False
+
+        return payload[:1] == b"\x00"
+
+
+async def _start_tls(
+    stream: PacketStream,
+    handshake: protocol.Handshake,
+    endpoint: str,
+    context: ssl.SSLContext,
+    session: ssl.SSLSession | None,
+    stats: WorkerStats | None,
+) -> None:
+    """Upgrade the connection to TLS with an `SSLRequest` packet.
+
+    Raises:
+        ProtocolError: Raised if the server does not support TLS.
+        ssl.SSLError: Raised if the TLS handshake fails.
+    """
+    if not handshake.capabilities & protocol.CLIENT_SSL:
+        raise ProtocolError("server does not support TLS")
+
+    capabilities = SUPPORTED_CAPABILITIES & handshake.capabilities | protocol.CLIENT_SSL
+    await stream.write(
+        struct.pack("<IIB", capabilities, MAX_PACKET_SIZE, handshake.charset) + bytes(23)
+    )
+    host, _ = split_endpoint(endpoint)
+    channel = stream.start_tls(
+        context, server_hostname=host if context.check_hostname else None, session=session
+    )
+    await channel.handshake()
+    if stats:
+        stats.tls_backend_handshakes_total += 1
+        stats.tls_backend_resumed_total += channel.session_reused
+
+
+async def _finish_authentication(
+    stream: PacketStream, password: str, plugin: str, nonce: bytes
+) -> None:
+    """Follow the server's lead until authentication succeeds or fails.
+
+    Raises:
+        ServerError: Raised if the server rejects the credentials.
+        ProtocolError: Raised if the server sends an unexpected packet.
+    """
+    while True:
+        payload = await stream.read()
+        header = payload[:1]
+        if header == b"\x00":
+            return
+        if header == b"\xff":
+            raise ServerError(payload)
+
+        if header == b"\xfe":
+            # AuthSwitchRequest: plugin name, nonce.
+            name, _, nonce = payload[1:].partition(b"\0")
+            plugin = name.decode()
+            if plugin not in auth.SUPPORTED_PLUGINS:
+                raise ProtocolError(f"unsupported authentication plugin '{plugin}'")
+            await stream.write(auth.scramble(plugin, password, nonce))
+        elif header == b"\x01" and plugin == auth.CACHING_SHA2_PASSWORD:
+            await _continue_caching_sha2(stream, password, nonce, payload[1:])
+        else:
+            raise ProtocolError(f"unexpected packet {payload[:16]!r} during authentication")
+
+
+async def _continue_caching_sha2(
+    stream: PacketStream, password: str, nonce: bytes, data: bytes
+) -> None:
+    """Answer `caching_sha2_password` authentication data sent by the server.
+
+    Raises:
+        ProtocolError: Raised if the server sends unexpected authentication data.
+    """
+    if data == auth.PERFORM_FULL_AUTHENTICATION and stream.tls:
+        # The password can be sent as-is over TLS.
+        await stream.write(password.encode() + b"\0")
+    elif data == auth.PERFORM_FULL_AUTHENTICATION:
+        await stream.write(auth.REQUEST_PUBLIC_KEY)
+    elif data.startswith(b"-----BEGIN"):
+        await stream.write(auth.encrypt_password(password, nonce, data))
+    elif data != auth.FAST_AUTH_SUCCESS:
+        raise ProtocolError(f"unexpected authentication data {data[:16]!r}")
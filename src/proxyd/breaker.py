@@ -0,0 +1,159 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Stop connecting to backend endpoints that keep failing.
+
+Every backend endpoint has a circuit breaker. A breaker opens after a number of
+consecutive failed connection attempts to its endpoint, and new connections then
+skip the endpoint immediately instead of waiting for a connect timeout, so they
+fail over to the next endpoint within milliseconds. Once the breaker has been open
+for a while, it becomes half-open and lets a single probe connection through. The
+breaker closes if the probe succeeds, and opens again if it fails.
+"""
+
+import logging
+import time
+
+from proxyd.stats import WorkerStats
+
+_logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Circuit breaker of a single backend endpoint.
+
+    Args:
+        failure_threshold: Number of consecutive failures that open the breaker.
+        reset_timeout: Seconds the breaker stays open before letting a probe through.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 5.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self._opened = 0.0
+        self._probe: float | None = None
+
+    def allow(self) -> bool:
+        """Check if a connection attempt may be made, and reserve the probe if half-open."""
+        now = time.monotonic()
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN:
+            if now - self._opened < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+
+        # Allow another probe if the previous one never reported back, e.g. if it was cancelled.
+        if self._probe is not None and now - self._probe < self.reset_timeout:
+            return False
+
+        self._probe = now
+        return True
+
+    def success(self) -> None:
+        """Record a successful connection attempt."""
+        self.state = CLOSED
+        self.failures = 0
+        self._probe = None
+
+    def failure(self) -> None:
+        """Record a failed connection attempt."""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self._opened = time.monotonic()
+            self._probe = None
+
+
+class Breakers:
+    """Circuit breakers of a set of backend endpoints.
+
+    The state of every breaker is mirrored in `stats.breakers`.
+
+    Args:
+        endpoints: Backend endpoints to create breakers for.
+        failure_threshold: Number of consecutive failures that open a breaker.
+        reset_timeout: Seconds a breaker stays open before letting a probe through.
+        stats: Worker statistics to record breaker states in.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        /,
+        failure_threshold: int = 3,
+        reset_timeout: float = 5.0,
+        stats: WorkerStats | None = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.stats = stats or WorkerStats()
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self.reset(endpoints)
+
+    def reset(self, endpoints: list[str]) -> None:
+        """Track the breakers of a new set of endpoints.
+
+        The breakers of endpoints that are still in use keep their state.
+        """
+        self._breakers = {
+            endpoint: self._breakers.get(endpoint)
+            or CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            for endpoint in endpoints
+        }
+        self.stats.breakers = {
+            endpoint: breaker.state for endpoint, breaker in self._breakers.items()
+        }
+
+    def allow(self, endpoint: str) -> bool:
+        """Check if a connection attempt to `endpoint` may be made."""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            return True
+
+        allowed = breaker.allow()
+        self._update(endpoint, breaker)
+        return allowed
+
+    def success(self, endpoint: str) -> None:
+        """Record a successful connection attempt to `endpoint`."""
+        if breaker := self._breakers.get(endpoint):
+            breaker.success()
+            self._update(endpoint, breaker)
+
+    def failure(self, endpoint: str) -> None:
+        """Record a failed connection attempt to `endpoint`."""
+        if breaker := self._breakers.get(endpoint):
+            breaker.failure()
+            self._update(endpoint, breaker)
+
+    def _update(self, endpoint: str, breaker: CircuitBreaker) -> None:
+        previous = self.stats.breakers.get(endpoint)
+        if previous == breaker.state:
+            return
+
+        self.stats.breakers[endpoint] = breaker.state
+        if breaker.state == OPEN:
+            self.stats.breaker_opens_total += 1
+            _logger.warning("circuit breaker of backend endpoint %s opened", endpoint)
+        else:
+            _logger.info("circuit breaker of backend endpoint %s is %s", endpoint, breaker.state)
@@ -0,0 +1,152 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Bound the memory used to buffer data forwarded between clients and the backend.
+
+Every forwarding loop holds at most one chunk of data per direction of a
+connection, so the buffers of a single connection are bounded by the size of
+the chunks it reads. Across connections, the buffered bytes are accounted in a
+`BufferBudget` shared by every connection of a worker. Once the bytes held
+exceed the high watermark, connections that buffer more than a small
+per-connection limit stop reading from their sockets until enough data has been
+written out to drop below the low watermark. Peers that keep sending are then
+held back by TCP flow control instead of by the proxy's memory. Other
+connections keep forwarding data in chunks no larger than the per-connection
+limit, so that a few slow clients do not stall every session of the worker.
+"""
+
+import asyncio
+import logging
+
+from proxyd.stats import WorkerStats
+
+_logger = logging.getLogger(__name__)
+
+# Number of bytes a connection may buffer while reading is paused.
+CONNECTION_LIMIT = 64 * 1024
+
+
+class BufferBudget:
+    """Memory budget shared by the forwarding loops of a worker.
+
+    Args:
+        high: Number of buffered bytes above which reading is paused. `0` disables
+            the budget.
+        low: Number of buffered bytes below which reading resumes.
+        stats: Worker statistics to record buffer usage in.
+        connection_limit: Number of bytes a connection may buffer while reading is
+            paused. Every connection stops reading while paused if `0`.
+    """
+
+    def __init__(
+        self,
+        high: int = 0,
+        low: int = 0,
+        stats: WorkerStats | None = None,
+        connection_limit: int = CONNECTION_LIMIT,
+    ) -> None:
+        self.high = high
+        self.low = min(low, high)
+        self.stats = stats or WorkerStats()
+        self.connection_limit = connection_limit
+        self.used = 0
+        self._resumed = asyncio.Event()
+        self._resumed.set()
+        # Events of the connections waiting for reading to resume.
+        self._waiters: set[asyncio.Event] = set()
+
+    def connection(self) -> "ConnectionBudget":
+        """Get a share of the budget for the forwarding loops of a new connection."""
+        return ConnectionBudget(self)
+
+    @property
+    def paused(self) -> bool:
+        """Whether reading is paused until buffered bytes drop below the low watermark."""
+        return not self._resumed.is_set()
+
+    async def wait(self) -> None:
+        """Wait until reading is allowed. Call before reading from a socket."""
+        if self.paused:
+            await self._resumed.wait()
+
+    def acquire(self, nbytes: int) -> None:
+        """Account `nbytes` read from a socket and not written out yet."""
+        self.used += nbytes
+        self.stats.buffer_bytes = self.used
+        if self.high and self.used > self.high and not self.paused:
+            _logger.debug("pausing reads with %d bytes buffered", self.used)
+            self._resumed.clear()
+            self.stats.buffer_paused = 1
+            self.stats.buffer_pauses_total += 1
+
+    def release(self, nbytes: int) -> None:
+        """Account `nbytes` previously acquired as written out."""
+        self.used -= nbytes
+        self.stats.buffer_bytes = self.used
+        if self.paused and self.used <= self.low:
+            _logger.debug("resuming reads with %d bytes buffered", self.used)
+            self._resumed.set()
+            self.stats.buffer_paused = 0
+            for waiter in self._waiters:
+                waiter.set()
+
+
+class ConnectionBudget:
+    """Share of a `BufferBudget` used by the forwarding loops of a single connection.
+
+    While reading is paused, a connection may keep reading as long as it buffers less
+    than the budget's connection limit, and reads at most up to that limit.
+
+    Args:
+        budget: Budget of the worker the connection is served by.
+    """
+
+    def __init__(self, budget: BufferBudget) -> None:
+        self.budget = budget
+        self.used = 0
+        self._released = asyncio.Event()
+
+    @property
+    def throttled(self) -> bool:
+        """Whether the connection buffers too much to read while reading is paused."""
+        return self.budget.paused and self.used >= self.budget.connection_limit
+
+    async def wait(self) -> None:
+        """Wait until the connection may read. Call before reading from a socket."""
+        while self.throttled:
+            self._released.clear()
+            self.budget._waiters.add(self._released)
+            try:
+                await self._released.wait()
+            finally:
+                self.budget._waiters.discard(self._released)
+
+    def allowance(self, nbytes: int) -> int:
+        """Get how many of `nbytes` the connection may read. Call after `wait`."""
+        if not self.budget.paused:
+            return nbytes
+
+        return min(nbytes, self.budget.connection_limit - self.used)
+
+    def acquire(self, nbytes: int) -> None:
+        """Account `nbytes` read from a socket and not written out yet."""
+        self.used += nbytes
+        self.budget.acquire(nbytes)
+
+    def release(self, nbytes: int) -> None:
+        """Account `nbytes` previously acquired as written out."""
+        self.used -= nbytes
+        self.budget.release(nbytes)
+        self._released.set()
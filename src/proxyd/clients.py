@@ -0,0 +1,113 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Identify which relation a client connection belongs to."""
+
+import asyncio
+import ipaddress
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+_logger = logging.getLogger(__name__)
+
+CLIENTS_REFRESH_INTERVAL = 5.0
+
+
+@dataclass(frozen=True)
+class Client:
+    """Client application a connection belongs to.
+
+    Attributes:
+        relation: ID of the client's relation with the proxy.
+        application: Name of the client application.
+    """
+
+    relation: str
+    application: str
+
+
+UNKNOWN_CLIENT = Client(relation="", application="unknown")
+
+# Address that clients connected to the proxy's Unix socket are looked up with.
+UNIX_ADDRESS = "unix"
+
+
+class ClientMap:
+    """Map client addresses to the relation they belong to.
+
+    The map is read from a JSON file written by the charm, e.g.
+    `{"10.0.0.7": {"relation": "5", "application": "slurmdbd"}}`,
+    and reloaded whenever the file changes.
+    """
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self._clients: dict[str, Client] = {}
+        self._mtime: int | None = None
+
+    def lookup(self, address: str) -> Client:
+        """Get the client that owns `address`."""
+        return self._clients.get(_normalize(address), UNKNOWN_CLIENT)
+
+    def refresh(self) -> bool:
+        """Reload the map if the underlying file has changed.
+
+        Returns:
+            `True` if the map was reloaded.
+        """
+        if self.path is None:
+            return False
+
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+
+        if mtime == self._mtime:
+            return False
+
+        self._mtime = mtime
+        try:
+            content = json.loads(self.path.read_text()) if mtime is not None else {}
+            self._clients = {
+                _normalize(address): Client(**client) for address, client in content.items()
+            }
+        except (OSError, ValueError, TypeError) as e:
+            _logger.warning("cannot load client map %s: %s", self.path, e)
+            return False
+
+        _logger.info("loaded %d client address(es) from %s", len(self._clients), self.path)
+        return True
+
+    async def watch(self, interval: float = CLIENTS_REFRESH_INTERVAL) -> None:
+        """Reload the map whenever the underlying file changes until cancelled."""
+        while True:
+            self.refresh()
+            await asyncio.sleep(interval)
+
+
+def _normalize(address: str) -> str:
+    """Normalize IPv4-mapped IPv6 addresses to their IPv4 form."""
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return address
+
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        return str(ip.ipv4_mapped)
+
+    return str(ip)
@@ -0,0 +1,170 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Compress the MySQL protocol between the proxy and the backend.
+
+Once a connection negotiates compression, every write is wrapped in one or more
+compressed packets: a 3-byte compressed length, a 1-byte compressed sequence
+number, and the 3-byte length of the payload before compression, followed by
+the payload. Payloads too small to benefit are sent as-is with a length of zero.
+Each compressed packet is an independent zlib stream or zstd frame.
+"""
+
+import importlib
+import struct
+import time
+import zlib
+from collections.abc import Callable
+
+from proxyd import protocol
+from proxyd.stats import WorkerStats
+
+try:
+    zstd = importlib.import_module("compression.zstd")
+except ImportError:  # Python < 3.14.
+    zstd = None
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+# Compression levels accepted for each algorithm. Level 0 selects the default level.
+LEVELS = {ZLIB: range(1, 10), ZSTD: range(1, 23)}
+DEFAULT_LEVELS = {ZLIB: 6, ZSTD: 3}
+# Payloads shorter than this are not worth compressing.
+MIN_COMPRESS_LENGTH = 50
+
+_HEADER = struct.Struct("<HBBHB")  # 3-byte length, sequence, 3-byte uncompressed length.
+_HEADER_SIZE = 7
+
+
+def available(algorithm: str) -> bool:
+    """Check if `algorithm` can be used by this Python interpreter."""
+    return algorithm == ZLIB or (algorithm == ZSTD and zstd is not None)
+
+
+def capability(algorithm: str) -> int:
+    """Get the capability flag that negotiates `algorithm` with a MySQL server."""
+    return {
+        ZLIB: protocol.CLIENT_COMPRESS,
+        ZSTD: protocol.CLIENT_ZSTD_COMPRESSION_ALGORITHM,
+    }[algorithm]
+
+
+class Codec:
+    """Compress and decompress the MySQL protocol on a single connection.
+
+    Args:
+        algorithm: Compression algorithm negotiated with the server.
+        level: Compression level. Level 0 selects the algorithm's default level.
+        stats: Worker statistics to record compression ratio and CPU time in.
+
+    Raises:
+        ValueError: Raised if `algorithm` is not available or `level` is invalid.
+    """
+
+    def __init__(self, algorithm: str, level: int = 0, stats: WorkerStats | None = None) -> None:
+        if not available(algorithm):
+            raise ValueError(f"compression algorithm '{algorithm}' is not available")
+        if level and level not in LEVELS[algorithm]:
+            raise ValueError(f"invalid {algorithm} compression level {level}")
+
+        self.algorithm = algorithm
+        self.level = level or DEFAULT_LEVELS[algorithm]
+        self.stats = stats or WorkerStats()
+        self.seq = 0
+        self._buffer = bytearray()
+        self._compress: Callable[[bytes], bytes]
+        self._decompress: Callable[[bytes, int], bytes]
+        if algorithm == ZLIB:
+            self._compress = lambda data: zlib.compress(data, self.level)
+            self._decompress = lambda data, size: zlib.decompress(data, bufsize=size)
+        else:
+            module = zstd
+            assert module is not None
+            self._compress = lambda data: module.compress(data, level=self.level)
+            self._decompress = lambda data, _: module.decompress(data)
+
+    def compress(self, data: bytes | memoryview, /, command: bool = False) -> bytes:
+        """Wrap `data` in compressed packets.
+
+        Args:
+            data: One or more whole or partial MySQL packets.
+            command: Whether `data` starts a new command, which restarts the
+                compressed sequence.
+        """
+        if command:
+            self.seq = 0
+
+        started = time.thread_time()
+        frames = []
+        for offset in range(0, len(data), protocol.MAX_PAYLOAD):
+            chunk = bytes(data[offset : offset + protocol.MAX_PAYLOAD])
+            size = len(chunk)
+            if size >= MIN_COMPRESS_LENGTH:
+                compressed = self._compress(chunk)
+                if len(compressed) < size:
+                    chunk = compressed
+                else:
+                    size = 0
+            else:
+                size = 0
+
+            frames.append(self._header(len(chunk), size) + chunk)
+            self.seq = (self.seq + 1) & 0xFF
+
+        self.stats.compression_cpu_seconds_total += time.thread_time() - started
+        wire = b"".join(frames)
+        self.stats.compression_payload_bytes_total += len(data)
+        self.stats.compression_wire_bytes_total += len(wire)
+        return wire
+
+    def decompress(self, data: bytes | memoryview) -> bytes:
+        """Unwrap the payloads of every complete compressed packet received so far.
+
+        Partial compressed packets are buffered until the rest of them is received.
+
+        Raises:
+            ProtocolError: Raised if a compressed packet cannot be decompressed.
+        """
+        self._buffer += data
+        started = time.thread_time()
+        payloads = []
+        offset = 0
+        while len(self._buffer) - offset >= _HEADER_SIZE:
+            low, high, seq, size_low, size_high = _HEADER.unpack_from(self._buffer, offset)
+            length = low | high << 16
+            size = size_low | size_high << 16
+            end = offset + _HEADER_SIZE + length
+            if len(self._buffer) < end:
+                break
+
+            payload = bytes(self._buffer[offset + _HEADER_SIZE : end])
+            if size:
+                try:
+                    payload = self._decompress(payload, size)
+                except Exception as e:  # zlib and zstd raise unrelated exception types.
+                    raise protocol.ProtocolError(f"cannot decompress packet: {e}")
+            payloads.append(payload)
+            self.seq = (seq + 1) & 0xFF
+            offset = end
+
+        del self._buffer[:offset]
+        self.stats.compression_cpu_seconds_total += time.thread_time() - started
+        result = b"".join(payloads)
+        self.stats.compression_payload_bytes_total += len(result)
+        self.stats.compression_wire_bytes_total += offset
+        return result
+
+    def _header(self, length: int, size: int) -> bytes:
+        return _HEADER.pack(length & 0xFFFF, length >> 16, self.seq, size & 0xFFFF, size >> 16)
@@ -0,0 +1,182 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Configuration of the MySQL proxy daemon."""
+
+import json
+from dataclasses import asdict, dataclass, fields, replace
+from pathlib import Path
+
+PASSTHROUGH = "passthrough"
+POOLED = "pooled"
+
+# Configuration fields that running workers apply on `SIGHUP` without restarting.
+RELOADABLE_FIELDS = frozenset({"endpoints", "username", "password"})
+
+
+@dataclass(frozen=True)
+class ProxyConfig:
+    """Configuration of the MySQL proxy daemon.
+
+    The configuration is rendered by the charm from `DatabaseProxyData` and
+    read by the daemon on startup.
+
+    Attributes:
+        endpoints: Backend MySQL endpoints in `host:port` form.
+        username: Username to use when accessing the backend MySQL server.
+        password: Password to use when accessing the backend MySQL server.
+        mode: How client sessions are proxied. `passthrough` forwards bytes between
+            clients and backend connections opened for them. `pooled` authenticates
+            clients at the proxy and serves them with pooled backend connections.
+        listen_address: Address to listen on for client connections.
+        listen_port: Port to listen on for client connections.
+        unix_socket: Unix socket to also listen on for client connections. Only TCP
+            connections are accepted if empty.
+        connect_timeout: Seconds to wait for a backend connection to be established.
+        zero_copy: Forward bytes with `splice(2)` when the platform supports it.
+        workers: Number of worker processes to run. `0` runs one worker per CPU core.
+        runtime_dir: Directory to write per-worker runtime statistics to.
+        clients_file: JSON file mapping client addresses to their relation.
+        max_connections: Maximum number of active backend connections across all
+            workers. `0` means unlimited.
+        max_relation_connections: Maximum number of active backend connections per
+            relation across all workers. `0` means unlimited.
+        queue_timeout: Seconds a client session may wait for a backend connection.
+        pool_min_size: Number of idle authenticated backend connections kept open
+            across all workers in `pooled` mode.
+        pool_max_idle: Maximum number of idle backend connections kept open by each
+            worker in `pooled` mode.
+        compression: Algorithm used to compress backend connections in `pooled` mode.
+            Either `zlib`, `zstd`, or empty to disable compression.
+        compression_level: Compression level. Level 0 selects the algorithm's default.
+        tls_cert_file: Certificate chain used to terminate client TLS in `pooled` mode.
+            Client TLS is not offered if empty.
+        tls_key_file: Private key of `tls_cert_file`.
+        backend_ssl_mode: TLS mode of backend connections in `pooled` mode. One of
+            `DISABLED`, `REQUIRED`, `VERIFY_CA`, or `VERIFY_IDENTITY`.
+        backend_ca_file: CA certificates used to verify the backend. Defaults to the
+            system's CA certificates if empty.
+        metrics_port: Port to serve Prometheus metrics on, on `listen_address`.
+            Metrics are not served if `0`.
+        digest_capacity: Number of query digests each worker keeps statistics for in
+            `pooled` mode. Query digests are not collected if `0`.
+        slow_query_log: File to log slow queries to in `pooled` mode. Slow queries are
+            not logged if empty.
+        slow_query_threshold: Minimum execution time, in seconds, of a slow query.
+        slow_query_sample_rate: Fraction of slow queries to log, between 0 and 1.
+        slow_query_log_max_bytes: Size of the slow query log above which it is rotated.
+        slow_query_log_backups: Number of rotated slow query logs to keep.
+        breaker_failure_threshold: Number of consecutive failed connection attempts
+            after which a backend endpoint is skipped. Endpoints are never skipped if `0`.
+        breaker_reset_timeout: Seconds a skipped backend endpoint waits before a
+            connection attempt probes it again.
+        buffer_high_watermark: Number of bytes buffered while forwarding data, across
+            all workers, above which the proxy stops reading from its sockets.
+            Reading is never paused if `0`.
+        buffer_low_watermark: Number of buffered bytes, across all workers, below which
+            the proxy resumes reading from its sockets.
+    """
+
+    endpoints: list[str]
+    username: str
+    password: str
+    mode: str = PASSTHROUGH
+    listen_address: str = "0.0.0.0"
+    listen_port: int = 3306
+    unix_socket: str = ""
+    connect_timeout: float = 5.0
+    zero_copy: bool = True
+    workers: int = 0
+    runtime_dir: str = "/run/mysql-proxy"
+    clients_file: str = ""
+    max_connections: int = 0
+    max_relation_connections: int = 0
+    queue_timeout: float = 10.0
+    pool_min_size: int = 0
+    pool_max_idle: int = 32
+    compression: str = ""
+    compression_level: int = 0
+    tls_cert_file: str = ""
+    tls_key_file: str = ""
+    backend_ssl_mode: str = "DISABLED"
+    backend_ca_file: str = ""
+    metrics_port: int = 0
+    digest_capacity: int = 1000
+    slow_query_log: str = ""
+    slow_query_threshold: float = 1.0
+    slow_query_sample_rate: float = 1.0
+    slow_query_log_max_bytes: int = 100 << 20
+    slow_query_log_backups: int = 5
+    breaker_failure_threshold: int = 3
+    breaker_reset_timeout: float = 5.0
+    buffer_high_watermark: int = 64 << 20
+    buffer_low_watermark: int = 32 << 20
+
+    @classmethod
+    def load(cls, path: Path) -> "ProxyConfig":
+        """Load proxy configuration from a JSON file.
+
+        Raises:
+            ValueError: Raised if the configuration file is not valid.
+        """
+        try:
+            return cls.from_json(path.read_text())
+        except OSError as e:
+            raise ValueError(f"cannot read proxy configuration file {path}: {e}")
+
+    @classmethod
+    def from_json(cls, content: str) -> "ProxyConfig":
+        """Create proxy configuration from a JSON document.
+
+        Raises:
+            ValueError: Raised if the JSON document is not a valid proxy configuration.
+        """
+        try:
+            return cls(**json.loads(content))
+        except (json.JSONDecodeError, TypeError) as e:
+            raise ValueError(f"invalid proxy configuration: {e}")
+
+    def to_json(self) -> str:
+        """Render proxy configuration as a JSON document."""
+        return json.dumps(asdict(self), indent=2, sort_keys=True)
+
+
+def requires_restart(old: ProxyConfig, new: ProxyConfig) -> bool:
+    """Check if moving from `old` to `new` configuration requires restarting the workers."""
+    return any(
+        getattr(old, f.name) != getattr(new, f.name)
+        for f in fields(ProxyConfig)
+        if f.name not in RELOADABLE_FIELDS
+    )
+
+
+def apply_reloadable(old: ProxyConfig, new: ProxyConfig) -> ProxyConfig:
+    """Get the `old` configuration updated with the reloadable fields of `new`."""
+    return replace(old, **{name: getattr(new, name) for name in RELOADABLE_FIELDS})
+
+
+def split_endpoint(endpoint: str) -> tuple[str, int]:
+    """Split a `host:port` endpoint into its host and port.
+
+    IPv6 hosts may be wrapped in brackets, e.g. `[::1]:3306`.
+
+    Raises:
+        ValueError: Raised if the endpoint is not in `host:port` form.
+    """
+    host, sep, port = endpoint.rpartition(":")
+    if not sep or not host or not port.isdigit():
+        raise ValueError(f"invalid endpoint '{endpoint}'. expected `host:port`")
+
+    return host.strip("[]"), int(port)
@@ -0,0 +1,245 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Aggregate statistics of client queries by digest.
+
+A digest is the text of a `COM_QUERY` statement with its literals, comments, and
+redundant whitespace stripped, so that statements which only differ by their
+values share a digest. Statistics are kept per client application and digest in
+a space-saving table: a fixed number of entries weighted by total execution time.
+When the table is full, the entry with the lowest total time is evicted and the
+new entry inherits that total time as an over-estimate. Memory stays constant
+under high-cardinality workloads while the heaviest digests are always retained.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from proxyd.stats import STATS_INTERVAL, Histogram
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 1000
+
+_TOKENS = re.compile(
+    r"""
+    (?P<comment>/\*.*?(?:\*/|$)|--[^\n]*|\#[^\n]*)
+    |(?P<literal>
+        (?:\b[xXbBnN])?'(?:[^'\\]|\\.|'')*'?
+        |"(?:[^"\\]|\\.|"")*"?
+        |\b0[xX][0-9a-fA-F]+\b
+        |(?<![\w.$])\.?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?
+    )
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+_WHITESPACE = re.compile(r"\s+")
+_LIST = re.compile(r"\(\?(?:, ?\?)*\)")
+_LISTS = re.compile(r"\(\.\.\.\)(?: ?, ?\(\.\.\.\))+")
+
+
+def normalize(statement: bytes) -> str:
+    """Normalize a SQL statement into its digest text.
+
+    String, numeric, and hexadecimal literals are replaced with `?`, lists of
+    literals such as `IN (1, 2, 3)` or multi-row `VALUES` are folded into `(...)`,
+    comments are removed, and whitespace is collapsed.
+    """
+    text = _TOKENS.sub(
+        lambda match: " " if match.lastgroup == "comment" else "?",
+        statement.decode(errors="replace"),
+    )
+    text = _WHITESPACE.sub(" ", text).strip()
+    return _LISTS.sub("(...)", _LIST.sub("(...)", text))
+
+
+@dataclass
+class DigestStats:
+    """Statistics of the queries of a client application that share a digest.
+
+    Attributes:
+        application: Name of the client application that sent the queries.
+        digest: Normalized text of the queries.
+        count: Number of queries.
+        errors: Number of queries that failed.
+        total_seconds: Total execution time of the queries.
+        rows: Number of rows returned by the queries.
+        bytes: Number of payload bytes returned by the queries.
+        latency: Latency histogram of the queries.
+        overestimate: Total execution time inherited from the entry evicted to make
+            room for this entry. The true total execution time of the digest is
+            between `total_seconds - overestimate` and `total_seconds`.
+    """
+
+    application: str
+    digest: str
+    count: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    latency: Histogram = field(default_factory=Histogram)
+    overestimate: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DigestStats":
+        """Create digest statistics from their `asdict` form."""
+        return cls(**{**data, "latency": Histogram(**data["latency"])})
+
+    @property
+    def key(self) -> tuple[str, str]:
+        """Key of the digest in a `DigestTable`."""
+        return self.application, self.digest
+
+    def merge(self, other: "DigestStats") -> None:
+        """Add the statistics of `other` to these statistics."""
+        self.count += other.count
+        self.errors += other.errors
+        self.total_seconds += other.total_seconds
+        self.rows += other.rows
+        self.bytes += other.bytes
+        self.latency.merge(other.latency)
+        self.overestimate += other.overestimate
+
+    def summary(self) -> dict:
+        """Summarize the statistics, with the p99 latency instead of the full histogram."""
+        return {
+            "application": self.application,
+            "digest": self.digest,
+            "count": self.count,
+            "errors": self.errors,
+            "total-seconds": round(self.total_seconds, 6),
+            "p99-seconds": round(self.latency.quantile(0.99), 6),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "overestimate-seconds": round(self.overestimate, 6),
+        }
+
+
+class DigestTable:
+    """Space-saving table of the digests with the highest total execution time.
+
+    Args:
+        capacity: Maximum number of digests to keep statistics for.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self._entries: dict[tuple[str, str], DigestStats] = {}
+        # Min-heap of `(total_seconds, key)` holding exactly one item per entry. Items
+        # go stale as entries are updated and are refreshed lazily when evicting.
+        self._heap: list[tuple[float, tuple[str, str]]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(
+        self,
+        application: str,
+        statement: bytes,
+        seconds: float,
+        /,
+        rows: int = 0,
+        size: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Record the execution of a query.
+
+        Args:
+            application: Name of the client application that sent the query.
+            statement: Text of the query.
+            seconds: Execution time of the query.
+            rows: Number of rows returned by the query.
+            size: Number of payload bytes returned by the query.
+            error: Whether the query failed.
+        """
+        key = (application, normalize(statement))
+        entry = self._entries.get(key) or self._insert(key)
+        entry.count += 1
+        entry.errors += error
+        entry.total_seconds += seconds
+        entry.rows += rows
+        entry.bytes += size
+        entry.latency.observe(seconds)
+
+    def top(self, limit: int) -> list[DigestStats]:
+        """Get the `limit` digests with the highest total execution time."""
+        return heapq.nlargest(limit, self._entries.values(), key=lambda e: e.total_seconds)
+
+    def publish(self, path: Path) -> None:
+        """Atomically publish the table to `path`."""
+        scratch = path.with_suffix(".tmp")
+        scratch.write_text(json.dumps([asdict(entry) for entry in self._entries.values()]))
+        scratch.replace(path)
+
+    def _insert(self, key: tuple[str, str]) -> DigestStats:
+        inherited = self._evict() if len(self._entries) >= self.capacity else 0.0
+        entry = DigestStats(*key, total_seconds=inherited, overestimate=inherited)
+        self._entries[key] = entry
+        heapq.heappush(self._heap, (inherited, key))
+        return entry
+
+    def _evict(self) -> float:
+        """Evict the entry with the lowest total execution time.
+
+        Returns:
+            The total execution time of the evicted entry.
+        """
+        while True:
+            weight, key = heapq.heappop(self._heap)
+            total = self._entries[key].total_seconds
+            if total == weight:
+                del self._entries[key]
+                return weight
+
+            heapq.heappush(self._heap, (total, key))
+
+
+async def publish_periodically(
+    table: DigestTable, path: Path, /, interval: float = STATS_INTERVAL
+) -> None:
+    """Publish a digest table to `path` every `interval` seconds until cancelled."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        while True:
+            try:
+                table.publish(path)
+            except OSError as e:
+                _logger.warning("cannot publish query digests to %s: %s", path, e)
+
+            await asyncio.sleep(interval)
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def collect(runtime_dir: Path, limit: int) -> list[DigestStats]:
+    """Collect the `limit` digests with the highest total execution time across workers."""
+    merged: dict[tuple[str, str], DigestStats] = {}
+    for path in sorted(runtime_dir.glob("digests-*.json")):
+        try:
+            entries = [DigestStats.from_dict(entry) for entry in json.loads(path.read_text())]
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            _logger.debug("ignoring unreadable query digests %s: %s", path, e)
+            continue
+
+        for entry in entries:
+            merged.setdefault(entry.key, DigestStats(*entry.key)).merge(entry)
+
+    return heapq.nlargest(limit, merged.values(), key=lambda e: e.total_seconds)
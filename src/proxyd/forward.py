@@ -0,0 +1,224 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Forward bytes between client and backend sockets.
+
+Two forwarding engines are provided:
+
+1. `splice_forward` moves bytes from one socket to another through a pipe with
+   `splice(2)`, so payloads never pass through Python memory.
+2. `copy_forward` copies bytes through a reusable user-space buffer with asyncio.
+   It is used when `splice(2)` is not available on the running platform.
+
+Both engines hold at most one chunk of data at a time, and account it in the
+connection's share of a `BufferBudget`, so that connections buffering too much
+stop reading while the worker buffers too much data.
+"""
+
+import asyncio
+import errno
+import fcntl
+import logging
+import os
+import socket
+
+from proxyd.budget import BufferBudget, ConnectionBudget
+
+_logger = logging.getLogger(__name__)
+
+COPY_BUFFER_SIZE = 256 * 1024
+PIPE_SIZE = 1024 * 1024
+# Errors raised by `splice(2)` when either end does not support splicing.
+_SPLICE_UNSUPPORTED = frozenset({errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP})
+# Errors raised when the peer has gone away. These end forwarding gracefully.
+_DISCONNECTED = (BrokenPipeError, ConnectionResetError, ConnectionAbortedError)
+
+_splice_available = hasattr(os, "splice")
+
+
+def splice_available() -> bool:
+    """Check if zero-copy forwarding with `splice(2)` is available."""
+    return _splice_available
+
+
+async def forward(
+    src: socket.socket,
+    dst: socket.socket,
+    /,
+    zero_copy: bool = True,
+    budget: ConnectionBudget | None = None,
+) -> int:
+    """Forward bytes from `src` to `dst` until `src` reaches end-of-file.
+
+    The write side of `dst` is shut down once `src` reaches end-of-file so that
+    half-closed connections are propagated to the other peer.
+
+    Args:
+        src: Non-blocking socket to read from.
+        dst: Non-blocking socket to write to.
+        zero_copy: Use `splice(2)` if available. Fall back to `copy_forward` if not.
+        budget: Share of the buffer budget to account forwarded data in, if any. Both
+            directions of a connection share the same budget.
+
+    Returns:
+        Number of bytes forwarded.
+    """
+    try:
+        if zero_copy and splice_available():
+            total = await splice_forward(src, dst, budget=budget)
+        else:
+            total = await copy_forward(src, dst, budget=budget)
+    except _DISCONNECTED:
+        # Wake up the forwarder of the opposite direction so that it does not
+        # wait forever on a peer that is never going to send anything.
+        _shutdown(dst, socket.SHUT_RDWR)
+        return 0
+
+    _shutdown(dst, socket.SHUT_WR)
+    return total
+
+
+async def splice_forward(
+    src: socket.socket, dst: socket.socket, /, budget: ConnectionBudget | None = None
+) -> int:
+    """Forward bytes from `src` to `dst` through a pipe with `splice(2)`.
+
+    Falls back to `copy_forward` if the first `splice(2)` call reports that
+    the sockets cannot be spliced. Bytes held in the pipe count against `budget`.
+
+    Returns:
+        Number of bytes forwarded.
+    """
+    global _splice_available
+
+    budget = budget or BufferBudget().connection()
+    loop = asyncio.get_running_loop()
+    rpipe, wpipe = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+    try:
+        fcntl.fcntl(wpipe, fcntl.F_SETPIPE_SZ, PIPE_SIZE)
+    except OSError:
+        # Unprivileged processes cannot grow pipes past `/proc/sys/fs/pipe-max-size`.
+        pass
+
+    flags = os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK
+    total = 0
+    try:
+        while True:
+            await budget.wait()
+            try:
+                pending = os.splice(src.fileno(), wpipe, budget.allowance(PIPE_SIZE), flags=flags)
+            except BlockingIOError:
+                await _wait_readable(loop, src)
+                continue
+            except OSError as e:
+                if total == 0 and e.errno in _SPLICE_UNSUPPORTED:
+                    _logger.warning("splice(2) is not supported (%s). using copy fallback", e)
+                    _splice_available = False
+                    return await copy_forward(src, dst, budget=budget)
+                raise
+
+            if pending == 0:
+                return total
+
+            budget.acquire(pending)
+            try:
+                total += await _drain_pipe(loop, rpipe, dst, pending)
+            finally:
+                budget.release(pending)
+    finally:
+        os.close(rpipe)
+        os.close(wpipe)
+
+
+async def copy_forward(
+    src: socket.socket, dst: socket.socket, /, budget: ConnectionBudget | None = None
+) -> int:
+    """Forward bytes from `src` to `dst` through a reusable user-space buffer.
+
+    Bytes held in the buffer count against `budget`.
+
+    Returns:
+        Number of bytes forwarded.
+    """
+    budget = budget or BufferBudget().connection()
+    loop = asyncio.get_running_loop()
+    buffer = bytearray(COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    total = 0
+    while True:
+        await budget.wait()
+        if not (nbytes := await loop.sock_recv_into(src, view[: budget.allowance(len(view))])):
+            return total
+
+        budget.acquire(nbytes)
+        try:
+            await loop.sock_sendall(dst, view[:nbytes])
+        finally:
+            budget.release(nbytes)
+        total += nbytes
+
+
+async def _drain_pipe(
+    loop: asyncio.AbstractEventLoop, rpipe: int, dst: socket.socket, pending: int
+) -> int:
+    """Splice `pending` bytes from a pipe into `dst`.
+
+    Returns:
+        Number of bytes spliced.
+    """
+    flags = os.SPLICE_F_MOVE | os.SPLICE_F_NONBLOCK
+    total = 0
+    while total < pending:
+        try:
+            moved = os.splice(rpipe, dst.fileno(), pending - total, flags=flags)
+        except BlockingIOError:
+            await _wait_writable(loop, dst)
+            continue
+
+        total += moved
+
+    return total
+
+
+async def _wait_readable(loop: asyncio.AbstractEventLoop, sock: socket.socket) -> None:
+    """Wait until `sock` is readable."""
+    waiter = loop.create_future()
+    loop.add_reader(sock.fileno(), _wake, waiter)
+    try:
+        await waiter
+    finally:
+        loop.remove_reader(sock.fileno())
+
+
+async def _wait_writable(loop: asyncio.AbstractEventLoop, sock: socket.socket) -> None:
+    """Wait until `sock` is writable."""
+    waiter = loop.create_future()
+    loop.add_writer(sock.fileno(), _wake, waiter)
+    try:
+        await waiter
+    finally:
+        loop.remove_writer(sock.fileno())
+
+
+def _shutdown(sock: socket.socket, how: int) -> None:
+    try:
+        sock.shutdown(how)
+    except OSError:
+        pass
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
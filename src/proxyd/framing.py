@@ -0,0 +1,160 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Frame MySQL packets in a reusable ring buffer without copying them.
+
+Bytes are received straight into a fixed-size ring buffer, and packets are
+handed out as `memoryview` slices of that buffer. Packets are never reassembled,
+so the memory used by a connection does not depend on the size of its packets:
+packets larger than the free space of the buffer, such as the 16 MiB packets of
+large payloads and the packets continuing them, are handed out in several
+fragments as their bytes arrive.
+"""
+
+from proxyd.protocol import MAX_PAYLOAD
+
+# Default size of the ring buffer.
+BUFFER_SIZE = 256 * 1024
+# Default number of payload bytes available before the first fragment of a packet
+# is handed out. Holds the command byte and the prefix of `COM_QUERY` statements.
+PREFIX_SIZE = 1025
+
+
+class PacketFramer:
+    """Split a stream of MySQL packets into fragments held in a ring buffer.
+
+    Received bytes are written into the region returned by `free` and registered
+    with `commit`. `next` then hands out the fragments of packets received so far.
+    Fragments are only valid until the next call to `free`.
+
+    The first fragment of a packet is only handed out once the packet's header
+    and the first `prefix_size` bytes of its payload have been received, or the
+    whole payload if it is shorter, so that the command byte and the start of the
+    payload are known before any of the packet is forwarded.
+
+    Args:
+        capacity: Size of the ring buffer.
+        prefix_size: Number of payload bytes to receive before handing out the
+            first fragment of a packet.
+
+    Attributes:
+        first: Whether the last fragment handed out starts a new packet rather than
+            continuing a packet or a 16 MiB packet.
+        command: First payload byte of the current packet, or `-1` if it is empty.
+
+    Raises:
+        ValueError: Raised if `capacity` cannot hold a packet header and its prefix.
+    """
+
+    def __init__(self, capacity: int = BUFFER_SIZE, prefix_size: int = PREFIX_SIZE) -> None:
+        if capacity < 4 + prefix_size:
+            raise ValueError(f"buffer of {capacity} bytes is too small for {prefix_size} bytes")
+
+        self.prefix_size = prefix_size
+        self.first = False
+        self.command = -1
+        self._capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        # Holds prefixes that wrap around the end of the ring buffer.
+        self._scratch = memoryview(bytearray(prefix_size))
+        self._prefix = self._view[:0]
+        self._prefix_start = 0
+        self._prefix_length = 0
+        self._head = 0
+        self._size = 0
+        self._remaining = 0  # Bytes of the current physical packet not handed out yet.
+        self._continued = False  # Whether the next physical packet continues a 16 MiB one.
+        self._starting = False  # Whether the next fragment starts a new packet.
+
+    @property
+    def buffered(self) -> int:
+        """Number of bytes received but not handed out yet."""
+        return self._size
+
+    @property
+    def prefix(self) -> memoryview:
+        """Up to `prefix_size` first payload bytes of the current packet.
+
+        Only valid until the next call to `free`.
+        """
+        start, length = self._prefix_start, self._prefix_length
+        if start + length <= self._capacity:
+            return self._view[start : start + length]
+
+        split = self._capacity - start
+        self._scratch[:split] = self._view[start:]
+        self._scratch[split:length] = self._view[: length - split]
+        return self._scratch[:length]
+
+    def free(self) -> memoryview:
+        """Get the largest contiguous free region of the ring buffer to receive bytes into."""
+        if not self._size:
+            self._head = 0
+        tail = self._head + self._size
+        if tail < self._capacity:
+            return self._view[tail:]
+
+        return self._view[tail - self._capacity : self._head]
+
+    def commit(self, nbytes: int) -> None:
+        """Register `nbytes` received into the region returned by `free`."""
+        self._size += nbytes
+
+    def next(self) -> memoryview | None:
+        """Hand out the next fragment of packet data, if enough of it has been received."""
+        if not self._remaining and not self._start():
+            return None
+
+        head = self._head
+        take = min(self._remaining, self._size, self._capacity - head)
+        if not take:
+            return None
+
+        self._head = (head + take) % self._capacity
+        self._size -= take
+        self._remaining -= take
+        self.first = self._starting
+        self._starting = False
+        return self._view[head : head + take]
+
+    def _start(self) -> bool:
+        """Start the next physical packet once its header and prefix have been received."""
+        if self._size < 4:
+            return False
+
+        buffer, head, capacity = self._buffer, self._head, self._capacity
+        if head + 3 <= capacity:
+            length = buffer[head] | buffer[head + 1] << 8 | buffer[head + 2] << 16
+        else:
+            length = (
+                buffer[head]
+                | buffer[(head + 1) % capacity] << 8
+                | buffer[(head + 2) % capacity] << 16
+            )
+
+        if not self._continued:
+            wanted = min(length, self.prefix_size)
+            if self._size < 4 + wanted:
+                return False
+
+            self._prefix_start = (head + 4) % capacity
+            self._prefix_length = wanted
+            self.command = buffer[self._prefix_start] if length else -1
+
+        self._starting = not self._continued
+        self._continued = length == MAX_PAYLOAD
+        self._remaining = 4 + length
+        return True
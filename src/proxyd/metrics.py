@@ -0,0 +1,224 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Serve proxy statistics to Prometheus.
+
+Every worker serves the metrics endpoint on the same port with `SO_REUSEPORT`.
+Whichever worker accepts a scrape publishes its own statistics, then renders
+the statistics last published by every worker. Statistics of other workers are
+therefore up to `STATS_INTERVAL` seconds old. Successive scrapes land on
+different workers, but since every worker renders the same published statistics
+and those are only ever replaced by newer ones, summed counters never go down
+between scrapes, which Prometheus would take for a counter reset.
+"""
+
+import asyncio
+import logging
+import socket
+from pathlib import Path
+
+from proxyd.stats import LATENCY_BUCKETS, Histogram, RelationStats, WorkerStats, collect
+
+_logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+PREFIX = "mysql_proxy_"
+# Seconds a scraper may take to send its request.
+REQUEST_TIMEOUT = 5.0
+# Relation counters exposed with `relation` and `application` labels.
+RELATION_COUNTERS = (
+    "connections_total",
+    "connections_active",
+    "bytes_in_total",
+    "bytes_out_total",
+    "backend_unavailable_total",
+)
+
+
+class MetricsServer:
+    """HTTP server exposing worker statistics at `/metrics`.
+
+    Args:
+        stats: Live statistics of the current worker.
+        runtime_dir: Directory other workers publish their statistics to.
+        address: Address to listen on.
+        port: Port to listen on.
+    """
+
+    def __init__(self, stats: WorkerStats, runtime_dir: Path, address: str, port: int) -> None:
+        self.stats = stats
+        self.runtime_dir = runtime_dir
+        self.address = address
+        self.port = port
+        self._listener: socket.socket | None = None
+
+    def bind(self) -> socket.socket:
+        """Create the listening socket for scrapes."""
+        listener = socket.create_server(
+            (self.address, self.port),
+            family=socket.AF_INET6 if ":" in self.address else socket.AF_INET,
+            reuse_port=True,
+        )
+        listener.setblocking(False)
+        self._listener = listener
+        return listener
+
+    async def serve_forever(self) -> None:
+        """Serve scrapes until cancelled."""
+        server = await asyncio.start_server(self._handle, sock=self._listener or self.bind())
+        async with server:
+            await server.serve_forever()
+
+    def workers(self) -> list[WorkerStats]:
+        """Publish the current worker's statistics, then collect those of every worker."""
+        try:
+            self.stats.publish(self.runtime_dir)
+        except OSError as e:
+            _logger.warning("cannot publish statistics of worker %d: %s", self.stats.worker, e)
+
+        return collect(self.runtime_dir)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            async with asyncio.timeout(REQUEST_TIMEOUT):
+                request = await reader.readuntil(b"\r\n\r\n")
+
+            method, target, _ = request.split(b"\r\n", 1)[0].split(b" ", 2)
+            if method == b"GET" and target.split(b"?", 1)[0] == b"/metrics":
+                await _respond(writer, b"200 OK", render(self.workers()).encode())
+            else:
+                await _respond(writer, b"404 Not Found", b"Not Found\n")
+        except (TimeoutError, ValueError, asyncio.IncompleteReadError, ConnectionError) as e:
+            _logger.debug("ignoring bad metrics request: %s", e)
+        finally:
+            writer.close()
+
+
+def render(workers: list[WorkerStats]) -> str:
+    """Render the statistics of `workers` in the Prometheus text exposition format.
+
+    Worker-wide statistics are summed across workers. Statistics of client
+    connections are labelled with the client's relation ID and application.
+    The circuit breakers of backend endpoints are reported as the number of
+    workers skipping or probing each endpoint.
+    """
+    lines: list[str] = []
+    _family(lines, "workers", [({}, len(workers))])
+    for name in WorkerStats.counters():
+        _family(lines, name, [({}, sum(getattr(w, name) for w in workers))])
+
+    breakers: dict[str, int] = {}
+    for worker in workers:
+        for endpoint, state in worker.breakers.items():
+            breakers[endpoint] = breakers.get(endpoint, 0) + (state != "closed")
+    _family(
+        lines,
+        "backend_breaker_open",
+        [({"endpoint": endpoint}, count) for endpoint, count in breakers.items()],
+    )
+
+    relations: dict[str, RelationStats] = {}
+    for worker in workers:
+        for relation, stats in worker.relations.items():
+            merged = relations.setdefault(relation, RelationStats(application=stats.application))
+            merged.merge(stats)
+
+    labels = {
+        relation: {"relation": relation, "application": stats.application}
+        for relation, stats in relations.items()
+    }
+    for name in RELATION_COUNTERS:
+        _family(
+            lines,
+            f"relation_{name}",
+            [(labels[relation], getattr(stats, name)) for relation, stats in relations.items()],
+        )
+    _histograms(
+        lines,
+        "backend_connect_seconds",
+        [
+            (labels[relation], stats.backend_connect_seconds)
+            for relation, stats in relations.items()
+        ],
+    )
+    _histograms(
+        lines,
+        "command_duration_seconds",
+        [
+            ({**labels[relation], "command": command}, histogram)
+            for relation, stats in relations.items()
+            for command, histogram in stats.commands.items()
+        ],
+    )
+    _family(
+        lines,
+        "command_errors_total",
+        [
+            ({**labels[relation], "command": command}, count)
+            for relation, stats in relations.items()
+            for command, count in stats.command_errors_total.items()
+        ],
+    )
+    return "\n".join(lines) + "\n"
+
+
+async def _respond(writer: asyncio.StreamWriter, status: bytes, body: bytes) -> None:
+    writer.write(
+        b"HTTP/1.1 " + status + b"\r\n"
+        + b"Content-Type: " + CONTENT_TYPE.encode() + b"\r\n"
+        + b"Content-Length: " + str(len(body)).encode() + b"\r\n"
+        + b"Connection: close\r\n\r\n"
+        + body
+    )  # fmt: skip
+    await writer.drain()
+
+
+def _family(lines: list[str], name: str, samples: list[tuple[dict[str, str], float]]) -> None:
+    """Render a counter or gauge. Metrics named `*_total` are counters."""
+    if not samples:
+        return
+
+    kind = "counter" if name.endswith("_total") else "gauge"
+    lines.append(f"# TYPE {PREFIX}{name} {kind}")
+    lines.extend(f"{PREFIX}{name}{_labels(labels)} {value}" for labels, value in samples)
+
+
+def _histograms(
+    lines: list[str], name: str, samples: list[tuple[dict[str, str], Histogram]]
+) -> None:
+    """Render a histogram with cumulative buckets."""
+    if not samples:
+        return
+
+    lines.append(f"# TYPE {PREFIX}{name} histogram")
+    for labels, histogram in samples:
+        cumulative = 0
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), histogram.buckets):
+            cumulative += count
+            bucket = _labels({**labels, "le": str(bound)})
+            lines.append(f"{PREFIX}{name}_bucket{bucket} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {histogram.sum}")
+        lines.append(f"{PREFIX}{name}_count{_labels(labels)} {cumulative}")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    escaped = (
+        (key, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels.items()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
@@ -0,0 +1,327 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Keep a warm pool of authenticated backend connections.
+
+Opening a backend connection costs a TCP handshake, possibly a TLS handshake,
+and a full MySQL authentication exchange. The pool keeps a minimum number of
+idle, authenticated connections open so that client sessions rarely pay that
+cost, including right after the proxy starts, after the backend credentials are
+rotated, and after the pool fails over to another backend endpoint. New
+connections resume the pool's most recent TLS session to shorten TLS handshakes.
+"""
+
+import asyncio
+import logging
+import ssl
+import time
+from collections import deque
+
+from proxyd.backend import BackendConnection, BackendError, Credentials, Profile
+from proxyd.breaker import Breakers
+from proxyd.stats import WorkerStats
+
+_logger = logging.getLogger(__name__)
+
+# Seconds a connection may sit idle before it is checked with `COM_PING` before use.
+VALIDATE_AFTER = 30.0
+# Seconds a connection above the minimum pool size may sit idle before it is closed.
+IDLE_TIMEOUT = 300.0
+# Seconds between two idle connections being swapped after a credential rotation.
+ROTATE_INTERVAL = 0.1
+# Seconds between two runs of the pool maintenance loop if nothing wakes it up.
+MAINTENANCE_INTERVAL = 10.0
+
+
+class BackendPool:
+    """Pool of authenticated backend connections.
+
+    Idle connections are grouped by the session profile they were negotiated
+    with. The pool is primed for the profile of the most recent client session,
+    or the server's default profile until a client has connected.
+
+    Args:
+        endpoints: Backend endpoints to connect to, in order of preference.
+        credentials: Credentials to authenticate new connections with.
+        min_size: Number of idle connections to keep open.
+        max_idle: Maximum number of idle connections to keep open.
+        max_size: Maximum number of open connections, in use or idle. `0` means unlimited.
+            Idle connections are closed to make room for new ones once it is reached.
+        connect_timeout: Seconds to wait for a new connection to be authenticated.
+        stats: Worker statistics to record pool usage in.
+        compression_algorithm: Compression algorithm to negotiate with the backend, if any.
+        compression_level: Compression level. Level 0 selects the default level.
+        tls_context: TLS context to encrypt backend connections with, if any.
+        breakers: Circuit breakers of the backend endpoints, if any.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        credentials: Credentials,
+        /,
+        min_size: int = 0,
+        max_idle: int = 32,
+        max_size: int = 0,
+        connect_timeout: float = 5.0,
+        stats: WorkerStats | None = None,
+        compression_algorithm: str = "",
+        compression_level: int = 0,
+        tls_context: ssl.SSLContext | None = None,
+        breakers: Breakers | None = None,
+    ) -> None:
+        self.endpoints = endpoints
+        self.credentials = credentials
+        self.min_size = min_size
+        self.max_idle = max(min_size, max_idle)
+        self.max_size = max_size
+        self.connect_timeout = connect_timeout
+        self.stats = stats or WorkerStats()
+        self.compression_algorithm = compression_algorithm
+        self.compression_level = compression_level
+        self.tls_context = tls_context
+        self.breakers = breakers
+        # Most recent TLS session, resumed by new connections to skip full TLS handshakes.
+        self.tls_session: ssl.SSLSession | None = None
+        self.profile: Profile | None = None
+        self.endpoint: str | None = None
+        self.server_version = ""
+        self._idle: dict[Profile, deque[BackendConnection]] = {}
+        self._active = 0
+        self._wakeup = asyncio.Event()
+
+    @property
+    def idle(self) -> int:
+        """Number of idle connections in the pool."""
+        return sum(len(connections) for connections in self._idle.values())
+
+    async def acquire(
+        self, profile: Profile | None = None, schema: str | None = None
+    ) -> BackendConnection:
+        """Take a connection out of the pool, opening a new one if none are idle.
+
+        Args:
+            profile: Session profile the connection must have.
+            schema: Default database the client requested, if any.
+
+        Raises:
+            BackendError: Raised if a new connection cannot be opened.
+        """
+        if profile is not None and profile != self.profile:
+            self.profile = profile
+            self._wakeup.set()
+
+        while connection := self._take_idle(profile or self.profile, schema):
+            if time.monotonic() - connection.last_used < VALIDATE_AFTER or await connection.ping():
+                self.stats.pool_hits_total += 1
+                break
+
+            self.stats.pool_discarded_total += 1
+            connection.close()
+        else:
+            self.stats.pool_misses_total += 1
+            if self._full():
+                self._evict()
+            connection = await self._connect(profile or self.profile)
+
+        self._active += 1
+        self.stats.pool_active += 1
+        if self.idle < self.min_size:
+            self._wakeup.set()
+
+        return connection
+
+    async def release(self, connection: BackendConnection, /, reusable: bool = True) -> None:
+        """Return a connection to the pool after its client session has ended.
+
+        Connections are closed instead if they are not reusable, were authenticated
+        with rotated credentials, or if the pool already holds `max_idle` connections
+        or `max_size` connections in total.
+        """
+        self._active -= 1
+        self.stats.pool_active -= 1
+        if (
+            not reusable
+            or connection.credentials.generation != self.credentials.generation
+            or connection.endpoint != self.endpoint
+            or self.idle >= self.max_idle
+            or self._full()
+            or not await connection.reset()
+        ):
+            self.stats.pool_discarded_total += 1
+            await connection.quit()
+            return
+
+        connection.last_used = time.monotonic()
+        self._idle.setdefault(connection.profile, deque()).append(connection)
+        self._update_idle()
+
+    def rotate(self, credentials: Credentials, endpoints: list[str] | None = None) -> None:
+        """Use new credentials and endpoints for new connections and gradually swap idle ones.
+
+        Connections in use by client sessions are closed once their session ends.
+        """
+        self.endpoints = endpoints or self.endpoints
+        self.credentials = Credentials(
+            credentials.username, credentials.password, self.credentials.generation + 1
+        )
+        _logger.info("rotating backend credentials of %d idle connection(s)", self.idle)
+        self._wakeup.set()
+
+    async def maintain(self) -> None:
+        """Prime, rotate, and trim idle connections until cancelled."""
+        while True:
+            # Clear before working so that wake-ups requested meanwhile are not lost.
+            self._wakeup.clear()
+            try:
+                await self._swap_rotated()
+                await self.prime()
+                self._trim()
+            except BackendError as e:
+                _logger.warning("cannot open idle backend connection: %s", e)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), MAINTENANCE_INTERVAL)
+            except TimeoutError:
+                pass
+
+    async def prime(self) -> None:
+        """Open idle connections until the pool holds `min_size` of them, or `max_size` in total.
+
+        Raises:
+            BackendError: Raised if a new connection cannot be opened.
+        """
+        while self.idle < self.min_size and not self._full():
+            connection = await self._connect(self.profile)
+            self.profile = self.profile or connection.profile
+            self._idle.setdefault(connection.profile, deque()).appendleft(connection)
+            self._update_idle()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+
+        self._idle.clear()
+        self._update_idle()
+
+    async def _connect(self, profile: Profile | None) -> BackendConnection:
+        """Open and authenticate a new backend connection.
+
+        Raises:
+            BackendError: Raised if the connection cannot be opened.
+        """
+        connection = await BackendConnection.connect(
+            self.endpoints,
+            self.credentials,
+            profile,
+            timeout=self.connect_timeout,
+            stats=self.stats,
+            compression_algorithm=self.compression_algorithm,
+            compression_level=self.compression_level,
+            tls_context=self.tls_context,
+            tls_session=self.tls_session,
+            breakers=self.breakers,
+        )
+        self.tls_session = connection.tls_session or self.tls_session
+        self.stats.backend_connects_total += 1
+        self.server_version = connection.handshake.server_version
+        if connection.endpoint != self.endpoint:
+            if self.endpoint is not None:
+                _logger.warning(
+                    "failing over from backend endpoint %s to %s",
+                    self.endpoint,
+                    connection.endpoint,
+                )
+            self.endpoint = connection.endpoint
+            self._drop_other_endpoints()
+
+        return connection
+
+    def _take_idle(self, profile: Profile | None, schema: str | None) -> BackendConnection | None:
+        """Take the most recently used idle connection suitable for a client session."""
+        connections = self._idle.get(profile) if profile else None
+        if not connections:
+            return None
+
+        # Prefer connections that already use the requested database. Connections with a
+        # database selected cannot serve clients that did not request one.
+        candidates = [c for c in reversed(connections) if c.schema == schema]
+        if not candidates and schema is not None:
+            candidates = list(reversed(connections))
+        if not candidates:
+            return None
+
+        connections.remove(candidates[0])
+        self._update_idle()
+        return candidates[0]
+
+    async def _swap_rotated(self) -> None:
+        """Replace idle connections authenticated with rotated credentials, one at a time."""
+        generation = self.credentials.generation
+        for profile, connections in list(self._idle.items()):
+            for stale in [c for c in connections if c.credentials.generation != generation]:
+                if self._full() and stale in connections:
+                    # Close the stale connection first to stay within the pool's size.
+                    connections.remove(stale)
+                    self._update_idle()
+                    await stale.quit()
+                fresh = await self._connect(profile)
+                connections.appendleft(fresh)
+                if stale in connections:
+                    # The stale connection may have been handed out while connecting.
+                    connections.remove(stale)
+                    await stale.quit()
+                await asyncio.sleep(ROTATE_INTERVAL)
+
+    def _drop_other_endpoints(self) -> None:
+        """Close idle connections to endpoints other than the current one."""
+        for connections in self._idle.values():
+            for connection in [c for c in connections if c.endpoint != self.endpoint]:
+                connections.remove(connection)
+                connection.close()
+
+        self._update_idle()
+        self._wakeup.set()
+
+    def _full(self) -> bool:
+        """Whether the pool holds `max_size` connections, in use or idle."""
+        return bool(self.max_size) and self._active + self.idle >= self.max_size
+
+    def _evict(self) -> None:
+        """Close the least recently used idle connection, if any."""
+        connections = [c for cs in self._idle.values() for c in cs]
+        if not connections:
+            return
+
+        oldest = min(connections, key=lambda c: c.last_used)
+        self._idle[oldest.profile].remove(oldest)
+        oldest.close()
+        self._update_idle()
+
+    def _trim(self) -> None:
+        """Close connections above the minimum pool size that have been idle for too long."""
+        now = time.monotonic()
+        for connections in self._idle.values():
+            while self.idle > self.min_size and connections:
+                if now - connections[0].last_used < IDLE_TIMEOUT:
+                    break
+                connections.popleft().close()
+
+        self._update_idle()
+
+    def _update_idle(self) -> None:
+        self.stats.pool_idle = self.idle
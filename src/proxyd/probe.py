@@ -0,0 +1,163 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Probe backend endpoints for their reachability, latency, role, and version."""
+
+import asyncio
+import logging
+import ssl
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from proxyd.backend import BackendConnection, BackendError, Credentials
+from proxyd.protocol import ProtocolError, ServerError
+
+_logger = logging.getLogger(__name__)
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    """Result of probing a backend endpoint.
+
+    Attributes:
+        endpoint: Probed backend endpoint.
+        reachable: Whether the proxy could authenticate to the endpoint.
+        timestamp: Wall-clock time at which the endpoint was probed.
+        rtt: Round-trip time, in seconds, of a `COM_PING` to the endpoint.
+        role: `primary` if the endpoint accepts writes, `replica` if it is read-only,
+            or empty if unknown.
+        version: Version of the server, as announced in its handshake.
+    """
+
+    endpoint: str
+    reachable: bool
+    timestamp: float
+    rtt: float = 0.0
+    role: str = ""
+    version: str = ""
+
+
+async def probe(
+    endpoint: str,
+    credentials: Credentials,
+    /,
+    timeout: float = 5.0,
+    tls_context: ssl.SSLContext | None = None,
+) -> ProbeResult:
+    """Probe a backend endpoint with a new authenticated connection.
+
+    Args:
+        endpoint: Backend endpoint to probe.
+        credentials: Credentials to authenticate with.
+        timeout: Seconds to wait for the whole probe to complete.
+        tls_context: TLS context to encrypt the connection with, if any.
+    """
+    timestamp = time.time()
+    try:
+        connection = await BackendConnection.connect(
+            [endpoint], credentials, timeout=timeout, tls_context=tls_context
+        )
+    except BackendError as e:
+        _logger.info("backend endpoint %s is unreachable: %s", endpoint, e)
+        return ProbeResult(endpoint, reachable=False, timestamp=timestamp)
+
+    try:
+        async with asyncio.timeout(timeout):
+            started = time.monotonic()
+            reachable = await connection.ping()
+            rtt = time.monotonic() - started
+            rows = await connection.query("SELECT @@global.read_only")
+    except (OSError, TimeoutError, ProtocolError, ServerError) as e:
+        _logger.info("cannot probe backend endpoint %s: %s", endpoint, e)
+        connection.close()
+        return ProbeResult(endpoint, reachable=False, timestamp=timestamp)
+
+    await connection.quit()
+    role = ""
+    if rows and rows[0]:
+        role = PRIMARY if rows[0][0] in ("0", "OFF") else REPLICA
+    return ProbeResult(
+        endpoint,
+        reachable=reachable,
+        timestamp=timestamp,
+        rtt=rtt,
+        role=role,
+        version=connection.handshake.server_version,
+    )
+
+
+async def probe_all(
+    endpoints: list[str],
+    credentials: Credentials,
+    /,
+    timeout: float = 5.0,
+    tls_context: ssl.SSLContext | None = None,
+) -> list[ProbeResult]:
+    """Probe several backend endpoints concurrently."""
+    return list(
+        await asyncio.gather(
+            *(
+                probe(endpoint, credentials, timeout=timeout, tls_context=tls_context)
+                for endpoint in endpoints
+            )
+        )
+    )
+
+
+def merge(results: Iterable[ProbeResult], /, max_age: float = 0.0) -> dict[str, ProbeResult]:
+    """Merge probe results gathered by several probers.
+
+    Args:
+        results: Probe results to merge.
+        max_age: Age, in seconds, above which results are ignored. Results never
+            expire if `0`.
+
+    Returns:
+        Map of backend endpoints to their most recent probe result.
+    """
+    now = time.time()
+    merged: dict[str, ProbeResult] = {}
+    for result in results:
+        if max_age and now - result.timestamp > max_age:
+            continue
+
+        current = merged.get(result.endpoint)
+        if current is None or result.timestamp > current.timestamp:
+            merged[result.endpoint] = result
+
+    return merged
+
+
+def order(endpoints: list[str], results: dict[str, ProbeResult]) -> list[str]:
+    """Order backend endpoints by preference according to probe results.
+
+    Reachable primaries come first, then reachable replicas, then endpoints that have
+    not been probed, and unreachable endpoints last. The original order of endpoints
+    is kept otherwise, so that round-trip time jitter does not reorder endpoints.
+    """
+
+    def rank(endpoint: str) -> int:
+        result = results.get(endpoint)
+        if result is None:
+            return 2
+        if not result.reachable:
+            return 3
+        return 0 if result.role == PRIMARY else 1
+
+    return sorted(endpoints, key=rank)
@@ -0,0 +1,613 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Encode and decode MySQL client/server protocol messages.
+
+Only the parts of the protocol needed by the proxy are implemented: packet
+framing, the connection phase handshake, and generic response packets.
+See https://dev.mysql.com/doc/dev/mysql-server/latest/PAGE_PROTOCOL.html
+"""
+
+import asyncio
+import socket
+import struct
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import ssl
+
+    from proxyd.compression import Codec
+    from proxyd.tls import TLSChannel
+
+MAX_PAYLOAD = 0xFFFFFF
+
+# Capability flags.
+CLIENT_LONG_PASSWORD = 1
+CLIENT_FOUND_ROWS = 1 << 1
+CLIENT_LONG_FLAG = 1 << 2
+CLIENT_CONNECT_WITH_DB = 1 << 3
+CLIENT_NO_SCHEMA = 1 << 4
+CLIENT_COMPRESS = 1 << 5
+CLIENT_ODBC = 1 << 6
+CLIENT_LOCAL_FILES = 1 << 7
+CLIENT_IGNORE_SPACE = 1 << 8
+CLIENT_PROTOCOL_41 = 1 << 9
+CLIENT_INTERACTIVE = 1 << 10
+CLIENT_SSL = 1 << 11
+CLIENT_TRANSACTIONS = 1 << 13
+CLIENT_SECURE_CONNECTION = 1 << 15
+CLIENT_MULTI_STATEMENTS = 1 << 16
+CLIENT_MULTI_RESULTS = 1 << 17
+CLIENT_PS_MULTI_RESULTS = 1 << 18
+CLIENT_PLUGIN_AUTH = 1 << 19
+CLIENT_CONNECT_ATTRS = 1 << 20
+CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA = 1 << 21
+CLIENT_SESSION_TRACK = 1 << 23
+CLIENT_DEPRECATE_EOF = 1 << 24
+CLIENT_ZSTD_COMPRESSION_ALGORITHM = 1 << 26
+CLIENT_QUERY_ATTRIBUTES = 1 << 27
+
+# Capabilities that only affect the connection phase. Every other capability
+# changes how commands and responses are encoded after the handshake.
+HANDSHAKE_CAPABILITIES = (
+    CLIENT_LONG_PASSWORD
+    | CLIENT_CONNECT_WITH_DB
+    | CLIENT_SSL
+    | CLIENT_SECURE_CONNECTION
+    | CLIENT_PLUGIN_AUTH
+    | CLIENT_CONNECT_ATTRS
+    | CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA
+)
+
+# Server status flags.
+SERVER_STATUS_AUTOCOMMIT = 1 << 1
+SERVER_MORE_RESULTS_EXISTS = 1 << 3
+SERVER_STATUS_CURSOR_EXISTS = 1 << 6
+
+# Commands.
+COM_QUIT = 0x01
+COM_INIT_DB = 0x02
+COM_QUERY = 0x03
+COM_FIELD_LIST = 0x04
+COM_STATISTICS = 0x09
+COM_PING = 0x0E
+COM_CHANGE_USER = 0x11
+COM_BINLOG_DUMP = 0x12
+COM_STMT_PREPARE = 0x16
+COM_STMT_EXECUTE = 0x17
+COM_STMT_SEND_LONG_DATA = 0x18
+COM_STMT_CLOSE = 0x19
+COM_STMT_RESET = 0x1A
+COM_SET_OPTION = 0x1B
+COM_STMT_FETCH = 0x1C
+COM_BINLOG_DUMP_GTID = 0x1E
+COM_RESET_CONNECTION = 0x1F
+# Names of commands, e.g. to label statistics with.
+COMMAND_NAMES = {value: name for name, value in list(globals().items()) if name.startswith("COM_")}
+
+# Response packet headers.
+OK_HEADER = 0x00
+AUTH_MORE_DATA_HEADER = 0x01
+EOF_HEADER = 0xFE
+ERR_HEADER = 0xFF
+
+# Server error codes. See https://dev.mysql.com/doc/mysql-errors/en/server-error-reference.html
+ER_CON_COUNT_ERROR = 1040
+ER_HANDSHAKE_ERROR = 1043
+ER_ACCESS_DENIED_ERROR = 1045
+ER_NOT_SUPPORTED_YET = 1235
+# Client error code reported by MySQL Router and other proxies when no backend is reachable.
+CR_CONN_HOST_ERROR = 2003
+
+
+class ProtocolError(Exception):
+    """Raised when a peer sends a message that does not follow the MySQL protocol."""
+
+
+class ServerError(Exception):
+    """Raised when a MySQL server responds with an `ERR_Packet`.
+
+    Attributes:
+        code: MySQL error code.
+        sqlstate: SQL state of the error.
+        message: Human-readable error message.
+        payload: Raw payload of the `ERR_Packet`.
+    """
+
+    def __init__(self, payload: bytes) -> None:
+        self.payload = payload
+        self.code = struct.unpack_from("<H", payload, 1)[0]
+        if payload[3:4] == b"#":
+            self.sqlstate = payload[4:9].decode(errors="replace")
+            self.message = payload[9:].decode(errors="replace")
+        else:
+            self.sqlstate = "HY000"
+            self.message = payload[3:].decode(errors="replace")
+
+        super().__init__(f"({self.code}) {self.message}")
+
+
+def packet(payload: bytes, /, seq: int = 0) -> bytes:
+    """Frame `payload` as a MySQL packet with a 3-byte length and 1-byte sequence ID.
+
+    Payloads of 16 MiB or more are split into several packets.
+    """
+    chunks = []
+    offset = 0
+    while True:
+        chunk = payload[offset : offset + MAX_PAYLOAD]
+        chunks.append(struct.pack("<I", len(chunk))[:3] + bytes((seq & 0xFF,)) + chunk)
+        offset += MAX_PAYLOAD
+        seq += 1
+        if len(chunk) < MAX_PAYLOAD:
+            return b"".join(chunks)
+
+
+def ok_payload(status: int = SERVER_STATUS_AUTOCOMMIT, /, header: int = OK_HEADER) -> bytes:
+    """Encode the payload of an `OK_Packet` with no affected rows and no warnings."""
+    return bytes((header, 0, 0)) + struct.pack("<HH", status, 0)
+
+
+def err_payload(code: int, sqlstate: str, message: str) -> bytes:
+    """Encode the payload of an `ERR_Packet`.
+
+    Args:
+        code: MySQL error code.
+        sqlstate: Five character SQL state of the error.
+        message: Human-readable error message.
+    """
+    return b"\xff" + struct.pack("<H", code) + b"#" + sqlstate.encode() + message.encode()
+
+
+def err_packet(code: int, sqlstate: str, message: str, /, seq: int = 0) -> bytes:
+    """Encode an `ERR_Packet` with sequence ID `seq`. See `err_payload`."""
+    return packet(err_payload(code, sqlstate, message), seq=seq)
+
+
+def lenenc_int(value: int) -> bytes:
+    """Encode a length-encoded integer."""
+    if value < 0xFB:
+        return bytes((value,))
+    if value < 1 << 16:
+        return b"\xfc" + struct.pack("<H", value)
+    if value < 1 << 24:
+        return b"\xfd" + struct.pack("<I", value)[:3]
+    return b"\xfe" + struct.pack("<Q", value)
+
+
+def read_lenenc_int(data: bytes | memoryview, offset: int = 0) -> tuple[int, int]:
+    """Decode a length-encoded integer.
+
+    Returns:
+        The decoded integer and the offset of the first byte after it.
+
+    Raises:
+        ProtocolError: Raised if `data` is too short to hold the integer.
+    """
+    try:
+        first = data[offset]
+        if first < 0xFB:
+            return first, offset + 1
+        if first == 0xFC:
+            return struct.unpack_from("<H", data, offset + 1)[0], offset + 3
+        if first == 0xFD:
+            return int.from_bytes(data[offset + 1 : offset + 4], "little"), offset + 4
+        if first == 0xFE:
+            return struct.unpack_from("<Q", data, offset + 1)[0], offset + 9
+    except (IndexError, struct.error):
+        pass
+
+    raise ProtocolError("truncated length-encoded integer")
+
+
+def read_text_row(payload: bytes, columns: int) -> tuple[str | None, ...]:
+    """Decode a row of a text protocol result set (`ProtocolText::ResultsetRow`).
+
+    Raises:
+        ProtocolError: Raised if the payload is too short to hold `columns` values.
+    """
+    values: list[str | None] = []
+    offset = 0
+    for _ in range(columns):
+        if payload[offset : offset + 1] == b"\xfb":
+            values.append(None)
+            offset += 1
+            continue
+
+        length, offset = read_lenenc_int(payload, offset)
+        if offset + length > len(payload):
+            raise ProtocolError("truncated result set row")
+        values.append(payload[offset : offset + length].decode(errors="replace"))
+        offset += length
+
+    return tuple(values)
+
+
+def read_status_flags(payload: bytes | memoryview, /, deprecate_eof: bool = False) -> int:
+    """Get the server status flags of an `OK_Packet` or `EOF_Packet` payload.
+
+    Args:
+        payload: Payload of the packet. Must at least contain the status flags.
+        deprecate_eof: Whether `CLIENT_DEPRECATE_EOF` was negotiated, in which case
+            packets starting with `0xFE` are `OK_Packet`s rather than `EOF_Packet`s.
+
+    Raises:
+        ProtocolError: Raised if the payload is too short to hold the status flags.
+    """
+    try:
+        if payload[0] == EOF_HEADER and not deprecate_eof:
+            # EOF_Packet: header, warnings, status flags.
+            return struct.unpack_from("<H", payload, 3)[0]
+
+        _, offset = read_lenenc_int(payload, 1)  # Affected rows.
+        _, offset = read_lenenc_int(payload, offset)  # Last insert ID.
+        return struct.unpack_from("<H", payload, offset)[0]
+    except (IndexError, struct.error):
+        raise ProtocolError("truncated status flags")
+
+
+@dataclass(frozen=True)
+class Handshake:
+    """Initial handshake packet sent by a MySQL server (`Protocol::HandshakeV10`).
+
+    Attributes:
+        server_version: Human-readable version of the server.
+        connection_id: ID of the connection on the server.
+        nonce: Random data to scramble authentication responses with.
+        capabilities: Capability flags supported by the server.
+        charset: Default character set of the server.
+        status: Server status flags.
+        auth_plugin: Default authentication plugin of the server.
+    """
+
+    server_version: str
+    connection_id: int
+    nonce: bytes
+    capabilities: int
+    charset: int
+    status: int
+    auth_plugin: str
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "Handshake":
+        """Decode a handshake packet payload.
+
+        Raises:
+            ProtocolError: Raised if the payload is not a `HandshakeV10` packet.
+            ServerError: Raised if the server responded with an error instead.
+        """
+        if payload[:1] == b"\xff":
+            raise ServerError(payload)
+        if payload[:1] != b"\x0a":
+            raise ProtocolError(f"unsupported handshake protocol version {payload[:1]!r}")
+
+        try:
+            end = payload.index(b"\0", 1)
+            server_version = payload[1:end].decode(errors="replace")
+            offset = end + 1
+            (connection_id,) = struct.unpack_from("<I", payload, offset)
+            nonce = payload[offset + 4 : offset + 12]
+            offset += 13
+            caps_low, charset, status, caps_high, nonce_len = struct.unpack_from(
+                "<HBHHB", payload, offset
+            )
+            offset += 18
+            capabilities = caps_low | caps_high << 16
+            if capabilities & CLIENT_SECURE_CONNECTION:
+                length = max(13, nonce_len - 8)
+                nonce += payload[offset : offset + length].rstrip(b"\0")
+                offset += length
+
+            auth_plugin = "mysql_native_password"
+            if capabilities & CLIENT_PLUGIN_AUTH:
+                auth_plugin = payload[offset:].split(b"\0", 1)[0].decode()
+        except (ValueError, struct.error) as e:
+            raise ProtocolError(f"malformed handshake packet: {e}")
+
+        return cls(
+            server_version, connection_id, nonce, capabilities, charset, status, auth_plugin
+        )
+
+    def encode(self) -> bytes:
+        """Encode the handshake packet payload."""
+        return b"".join(
+            (
+                b"\x0a",
+                self.server_version.encode() + b"\0",
+                struct.pack("<I", self.connection_id),
+                self.nonce[:8] + b"\0",
+                struct.pack(
+                    "<HBHHB",
+                    self.capabilities & 0xFFFF,
+                    self.charset,
+                    self.status,
+                    self.capabilities >> 16,
+                    len(self.nonce) + 1,
+                ),
+                bytes(10),
+                self.nonce[8:] + b"\0",
+                self.auth_plugin.encode() + b"\0",
+            )
+        )
+
+
+@dataclass(frozen=True)
+class HandshakeResponse:
+    """Handshake response packet sent by a MySQL client (`Protocol::HandshakeResponse41`).
+
+    Attributes:
+        capabilities: Capability flags requested by the client.
+        max_packet_size: Maximum size of packets the client will send.
+        charset: Character set requested by the client.
+        username: Username to authenticate as.
+        auth_response: Scrambled password or other authentication data.
+        database: Default database to use once authenticated.
+        auth_plugin: Authentication plugin used to generate `auth_response`.
+        attributes: Raw connection attributes sent by the client.
+        zstd_level: zstd compression level requested by the client.
+    """
+
+    capabilities: int
+    max_packet_size: int
+    charset: int
+    username: str
+    auth_response: bytes
+    database: str | None = None
+    auth_plugin: str = ""
+    attributes: bytes = b""
+    zstd_level: int = 0
+
+    @classmethod
+    def decode(cls, payload: bytes) -> "HandshakeResponse":
+        """Decode a handshake response packet payload.
+
+        Raises:
+            ProtocolError: Raised if the payload is not a `HandshakeResponse41` packet.
+        """
+        try:
+            capabilities, max_packet_size, charset = struct.unpack_from("<IIB", payload)
+            if not capabilities & CLIENT_PROTOCOL_41:
+                raise ProtocolError("clients without CLIENT_PROTOCOL_41 are not supported")
+
+            offset = 32
+            end = payload.index(b"\0", offset)
+            username = payload[offset:end].decode()
+            offset = end + 1
+            if capabilities & CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA:
+                length, offset = read_lenenc_int(payload, offset)
+            else:
+                length, offset = payload[offset], offset + 1
+            auth_response = payload[offset : offset + length]
+            offset += length
+
+            database = None
+            if capabilities & CLIENT_CONNECT_WITH_DB and offset < len(payload):
+                end = payload.index(b"\0", offset)
+                database = payload[offset:end].decode()
+                offset = end + 1
+
+            auth_plugin = ""
+            if capabilities & CLIENT_PLUGIN_AUTH and offset < len(payload):
+                end = payload.find(b"\0", offset)
+                end = len(payload) if end < 0 else end
+                auth_plugin = payload[offset:end].decode()
+                offset = end + 1
+
+            attributes = b""
+            if capabilities & CLIENT_CONNECT_ATTRS and offset < len(payload):
+                length, start = read_lenenc_int(payload, offset)
+                attributes = payload[offset : start + length]
+                offset = start + length
+
+            zstd_level = 0
+            if capabilities & CLIENT_ZSTD_COMPRESSION_ALGORITHM and offset < len(payload):
+                zstd_level = payload[offset]
+        except (ValueError, IndexError, struct.error) as e:
+            raise ProtocolError(f"malformed handshake response packet: {e}")
+
+        return cls(
+            capabilities,
+            max_packet_size,
+            charset,
+            username,
+            auth_response,
+            database,
+            auth_plugin,
+            attributes,
+            zstd_level,
+        )
+
+    def encode(self) -> bytes:
+        """Encode the handshake response packet payload."""
+        parts = [
+            struct.pack("<IIB", self.capabilities, self.max_packet_size, self.charset),
+            bytes(23),
+            self.username.encode() + b"\0",
+        ]
+        if self.capabilities & CLIENT_PLUGIN_AUTH_LENENC_CLIENT_DATA:
+            parts.append(lenenc_int(len(self.auth_response)) + self.auth_response)
+        else:
+            parts.append(bytes((len(self.auth_response),)) + self.auth_response)
+        if self.capabilities & CLIENT_CONNECT_WITH_DB:
+            parts.append((self.database or "").encode() + b"\0")
+        if self.capabilities & CLIENT_PLUGIN_AUTH:
+            parts.append(self.auth_plugin.encode() + b"\0")
+        if self.capabilities & CLIENT_CONNECT_ATTRS:
+            parts.append(self.attributes or b"\0")
+        if self.capabilities & CLIENT_ZSTD_COMPRESSION_ALGORITHM:
+            parts.append(bytes((self.zstd_level,)))
+
+        return b"".join(parts)
+
+
+class PacketStream:
+    """Read and write MySQL packets on a non-blocking socket.
+
+    Packets split across several reads are reassembled, as are payloads split
+    across several 16 MiB packets. Once negotiated, TLS and compression are
+    applied transparently to every read and write, including raw reads and
+    writes used to forward packets without reassembling them.
+
+    Attributes:
+        sock: Connected non-blocking socket.
+        seq: Sequence number of the next packet.
+        tls: TLS channel encrypting the stream once TLS has been negotiated.
+        codec: Codec compressing the stream once compression has been negotiated.
+    """
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.seq = 0
+        self.tls: "TLSChannel | None" = None
+        self.codec: "Codec | None" = None
+        self._buffer = bytearray()
+
+    async def read(self) -> bytes:
+        """Read the payload of the next packet.
+
+        Raises:
+            ConnectionError: Raised if the peer closes the connection mid-packet.
+        """
+        payload = b""
+        while True:
+            header = await self._read_exactly(4)
+            length = int.from_bytes(header[:3], "little")
+            self.seq = (header[3] + 1) & 0xFF
+            payload += await self._read_exactly(length)
+            if length < MAX_PAYLOAD:
+                return payload
+
+    async def write(self, payload: bytes) -> None:
+        """Write `payload` as the next packet in the sequence."""
+        data = packet(payload, seq=self.seq)
+        command = self.seq == 0
+        self.seq = (self.seq + len(payload) // MAX_PAYLOAD + 1) & 0xFF
+        await self.send(data, command=command)
+
+    async def read_raw(self) -> bytes:
+        """Read the next physical packet, including its header, without reassembling it.
+
+        Raises:
+            ConnectionError: Raised if the peer closes the connection mid-packet.
+        """
+        header = await self._read_exactly(4)
+        self.seq = (header[3] + 1) & 0xFF
+        return header + await self._read_exactly(int.from_bytes(header[:3], "little"))
+
+    async def command(self, payload: bytes) -> bytes:
+        """Send a command packet and read the first packet of the response."""
+        self.seq = 0
+        await self.write(payload)
+        return await self.read()
+
+    def start_tls(
+        self,
+        context: "ssl.SSLContext",
+        /,
+        server_side: bool = False,
+        server_hostname: str | None = None,
+        session: "ssl.SSLSession | None" = None,
+    ) -> "TLSChannel":
+        """Encrypt the rest of the stream with TLS. The TLS handshake must be performed next.
+
+        Bytes already received are handed over to TLS, since a peer may send its
+        first TLS handshake message right after asking to upgrade the connection.
+        """
+        from proxyd.tls import TLSChannel
+
+        self.tls = TLSChannel(
+            self.sock,
+            context,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session,
+        )
+        self.tls.feed(self.drain())
+        return self.tls
+
+    async def send(self, data: bytes | memoryview, /, command: bool = False) -> None:
+        """Send raw packets, including their headers.
+
+        Args:
+            data: Raw packets to send.
+            command: Whether `data` starts a new command.
+        """
+        if self.codec:
+            data = self.codec.compress(data, command=command)
+        if self.tls:
+            await self.tls.sendall(data)
+        else:
+            await asyncio.get_running_loop().sock_sendall(self.sock, data)
+
+    async def recv(self) -> bytes:
+        """Receive raw packet data. Returns no data once the peer has closed the connection.
+
+        Data already buffered by previous reads is returned first.
+
+        Raises:
+            ProtocolError: Raised if compressed data cannot be decompressed.
+        """
+        return self.drain() if self._buffer else await self._receive()
+
+    async def recv_into(self, buffer: memoryview) -> int:
+        """Receive raw packet data into `buffer`. Returns `0` once the peer has closed.
+
+        Data already buffered by previous reads is returned first. Bytes are received
+        straight into `buffer` unless the stream is compressed.
+
+        Raises:
+            ProtocolError: Raised if compressed data cannot be decompressed.
+        """
+        if not self._buffer:
+            if self.tls and not self.codec:
+                return await self.tls.recv_into(buffer)
+            if not self.codec:
+                return await asyncio.get_running_loop().sock_recv_into(self.sock, buffer)
+            self._buffer += await self._receive()
+
+        nbytes = min(len(buffer), len(self._buffer))
+        buffer[:nbytes] = self._buffer[:nbytes]
+        del self._buffer[:nbytes]
+        return nbytes
+
+    def drain(self) -> bytes:
+        """Remove and return bytes read from the socket but not consumed yet."""
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+    async def _receive(self) -> bytes:
+        while True:
+            if self.tls:
+                data = await self.tls.recv()
+            else:
+                data = await asyncio.get_running_loop().sock_recv(self.sock, 256 * 1024)
+            if not data or not self.codec:
+                return data
+            # Wait for the rest of partially received compressed packets.
+            if data := self.codec.decompress(data):
+                return data
+
+    async def _read_exactly(self, nbytes: int) -> bytes:
+        while len(self._buffer) < nbytes:
+            chunk = await self._receive()
+            if not chunk:
+                raise ConnectionError("connection closed by peer")
+            self._buffer += chunk
+
+        data = bytes(self._buffer[:nbytes])
+        del self._buffer[:nbytes]
+        return data
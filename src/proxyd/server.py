@@ -0,0 +1,246 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Accept client connections and proxy them to the backend MySQL server."""
+
+import asyncio
+import logging
+import os
+import socket
+import ssl
+import time
+
+from proxyd import protocol
+from proxyd.admission import AdmissionController, AdmissionTimeoutError
+from proxyd.backend import BackendError, open_socket
+from proxyd.breaker import Breakers
+from proxyd.budget import BufferBudget
+from proxyd.clients import UNIX_ADDRESS, Client, ClientMap
+from proxyd.config import ProxyConfig
+from proxyd.digest import DigestTable
+from proxyd.forward import forward
+from proxyd.pool import BackendPool
+from proxyd.session import PooledSession
+from proxyd.slowlog import SlowQueryLog
+from proxyd.stats import RelationStats, WorkerStats
+
+_logger = logging.getLogger(__name__)
+
+
+def bind_unix(path: str) -> socket.socket:
+    """Create a listening Unix socket for client connections at `path`.
+
+    A stale socket left at `path` by a previous proxy process is replaced. The socket
+    is accessible by every local user, as clients authenticate with MySQL credentials.
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(path)
+        os.chmod(path, 0o666)
+        listener.listen(1024)
+    except OSError:
+        listener.close()
+        raise
+
+    listener.setblocking(False)
+    return listener
+
+
+class ProxyServer:
+    """Proxy for MySQL client connections.
+
+    Without a backend connection pool, each accepted client connection is paired
+    with a new connection to the first reachable backend endpoint. Bytes are then
+    forwarded in both directions until both peers have closed their side of the
+    connection. With a pool, client sessions are served by `PooledSession`, which
+    also terminates client TLS if a TLS context is given, and records the digests
+    and slow queries of clients if a digest table or slow query log is given.
+    Backend endpoints whose circuit breaker is open are skipped when connecting.
+    Data buffered while forwarding is accounted in a budget shared by every session.
+    Client sessions wait in the admission queue if the backend connection limits
+    have been reached. Statistics of client sessions are recorded per relation.
+
+    The listening socket is bound with `SO_REUSEPORT` so that several worker
+    processes can accept connections on the same port. If a Unix socket is
+    configured, clients on the same machine may also connect through it, skipping
+    the TCP loopback. Unix sockets cannot be shared with `SO_REUSEPORT`, so worker
+    processes accept connections on a Unix listener inherited from their supervisor.
+    Clients of the Unix socket are attributed to the relation mapped to `UNIX_ADDRESS`.
+    """
+
+    def __init__(
+        self,
+        config: ProxyConfig,
+        stats: WorkerStats | None = None,
+        clients: ClientMap | None = None,
+        admission: AdmissionController | None = None,
+        pool: BackendPool | None = None,
+        tls_context: ssl.SSLContext | None = None,
+        digests: DigestTable | None = None,
+        slow_log: SlowQueryLog | None = None,
+        breakers: Breakers | None = None,
+        budget: BufferBudget | None = None,
+        unix_listener: socket.socket | None = None,
+    ) -> None:
+        self.config = config
+        self.pool = pool
+        self.tls_context = tls_context
+        self.digests = digests
+        self.slow_log = slow_log
+        self.breakers = breakers
+        self.stats = stats or WorkerStats()
+        self.budget = budget or BufferBudget(stats=self.stats)
+        self.clients = clients or ClientMap()
+        self.admission = admission or AdmissionController(
+            limit=config.max_connections,
+            relation_limit=config.max_relation_connections,
+            timeout=config.queue_timeout,
+            stats=self.stats,
+        )
+        self._listener: socket.socket | None = None
+        self._unix_listener = unix_listener
+        self._sessions: set[asyncio.Task] = set()
+
+    def bind(self) -> socket.socket:
+        """Create the listening socket for client connections."""
+        listener = socket.create_server(
+            (self.config.listen_address, self.config.listen_port),
+            family=socket.AF_INET6 if ":" in self.config.listen_address else socket.AF_INET,
+            backlog=1024,
+            reuse_port=True,
+        )
+        listener.setblocking(False)
+        self._listener = listener
+        return listener
+
+    async def serve_forever(self) -> None:
+        """Accept and proxy client connections until cancelled."""
+        listeners = [self._listener or self.bind()]
+        if self.config.unix_socket:
+            listeners.append(self._unix_listener or bind_unix(self.config.unix_socket))
+
+        try:
+            await asyncio.gather(*(self._accept(listener) for listener in listeners))
+        finally:
+            for listener in listeners:
+                listener.close()
+            for session in self._sessions:
+                session.cancel()
+
+    async def _accept(self, listener: socket.socket) -> None:
+        """Accept client connections on `listener` until cancelled."""
+        loop = asyncio.get_running_loop()
+        _logger.info("listening for client connections on %s", listener.getsockname())
+        while True:
+            client, address = await loop.sock_accept(listener)
+            session = loop.create_task(self._handle(client, address))
+            self._sessions.add(session)
+            session.add_done_callback(self._sessions.discard)
+
+    async def _handle(self, client: socket.socket, address: tuple | str) -> None:
+        """Proxy a single client connection."""
+        loop = asyncio.get_running_loop()
+        client.setblocking(False)
+        if client.family == socket.AF_UNIX:
+            # Clients of the Unix socket are unnamed, so they all share the same address.
+            address = UNIX_ADDRESS
+            owner = self.clients.lookup(UNIX_ADDRESS)
+        else:
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            owner = self.clients.lookup(address[0])
+        relation = self.stats.relation(owner)
+        self.stats.connections_total += 1
+        self.stats.connections_active += 1
+        relation.connections_total += 1
+        relation.connections_active += 1
+        try:
+            with client:
+                try:
+                    async with self.admission.admit(owner.relation):
+                        if self.pool:
+                            await self._serve_pooled(client, owner, relation)
+                        else:
+                            await self._proxy(client, address, relation)
+                except AdmissionTimeoutError as e:
+                    _logger.warning("rejecting client %s of %s: %s", address, owner.application, e)
+                    await loop.sock_sendall(
+                        client,
+                        protocol.err_packet(
+                            protocol.ER_CON_COUNT_ERROR, "08004", "Too many connections"
+                        ),
+                    )
+        finally:
+            self.stats.connections_active -= 1
+            relation.connections_active -= 1
+
+    async def _serve_pooled(
+        self, client: socket.socket, owner: Client, relation: RelationStats
+    ) -> None:
+        """Serve a client session with a pooled backend connection."""
+        assert self.pool is not None
+        session = PooledSession(
+            client,
+            self.pool,
+            tls_context=self.tls_context,
+            owner=owner,
+            relation=relation,
+            digests=self.digests,
+            slow_log=self.slow_log,
+            budget=self.budget,
+        )
+        try:
+            await session.run()
+        finally:
+            self.stats.bytes_in_total += session.received
+            self.stats.bytes_out_total += session.sent
+            relation.bytes_in_total += session.received
+            relation.bytes_out_total += session.sent
+
+    async def _proxy(
+        self, client: socket.socket, address: tuple | str, relation: RelationStats
+    ) -> None:
+        """Forward bytes between a client and a new backend connection."""
+        started = time.monotonic()
+        try:
+            backend, _ = await open_socket(
+                self.config.endpoints,
+                timeout=self.config.connect_timeout,
+                stats=self.stats,
+                breakers=self.breakers,
+            )
+        except BackendError as e:
+            _logger.error("cannot proxy client %s: %s", address, e)
+            relation.backend_unavailable_total += 1
+            return
+
+        relation.backend_connect_seconds.observe(time.monotonic() - started)
+
+        budget = self.budget.connection()
+        with backend:
+            received, sent = await asyncio.gather(
+                forward(client, backend, zero_copy=self.config.zero_copy, budget=budget),
+                forward(backend, client, zero_copy=self.config.zero_copy, budget=budget),
+            )
+
+        self.stats.bytes_in_total += received
+        self.stats.bytes_out_total += sent
+        relation.bytes_in_total += received
+        relation.bytes_out_total += sent
+        _logger.debug("client %s closed. %d bytes in, %d bytes out", address, received, sent)
@@ -0,0 +1,356 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Serve client sessions with pooled backend connections.
+
+In `pooled` mode the proxy authenticates clients itself, using the same
+credentials it publishes to them, and then binds the client session to an
+authenticated connection taken from the backend connection pool. Once the
+client quits, the backend connection is reset and returned to the pool.
+"""
+
+import asyncio
+import itertools
+import logging
+import socket
+import ssl
+import struct
+import time
+
+from proxyd import auth, protocol
+from proxyd.backend import SUPPORTED_CAPABILITIES, BackendConnection, BackendError, Profile
+from proxyd.budget import BufferBudget
+from proxyd.clients import UNKNOWN_CLIENT, Client
+from proxyd.digest import DigestTable
+from proxyd.framing import PacketFramer
+from proxyd.pool import BackendPool
+from proxyd.protocol import PacketStream, ProtocolError, ServerError
+from proxyd.slowlog import SlowQueryLog
+from proxyd.stats import RelationStats
+from proxyd.tracker import PacketScanner, Response, ResponseTracker
+
+_logger = logging.getLogger(__name__)
+
+# Server version reported to clients until the pool has connected to the backend.
+DEFAULT_SERVER_VERSION = "8.0.0-mysql-proxy"
+DEFAULT_CHARSET = 255  # utf8mb4_0900_ai_ci
+# Capabilities offered to clients. `CLIENT_LOCAL_FILES`, `CLIENT_COMPRESS`, and
+# `CLIENT_SSL` are never offered since the proxy cannot follow those exchanges.
+FRONTEND_CAPABILITIES = SUPPORTED_CAPABILITIES | protocol.CLIENT_CONNECT_WITH_DB
+# Seconds a client may take to complete the handshake.
+HANDSHAKE_TIMEOUT = 10.0
+# Size of the `SSLRequest` packet a client sends to upgrade the connection to TLS.
+SSL_REQUEST_SIZE = 32
+
+_connection_ids = itertools.count(1)
+
+
+class PooledSession:
+    """Client session served by a pooled backend connection.
+
+    Args:
+        client: Connected non-blocking client socket.
+        pool: Pool to take the backend connection from.
+        tls_context: TLS context to terminate client TLS with, if any.
+        owner: Client application the session belongs to.
+        relation: Statistics of the client's relation to record the session in.
+        digests: Table to record the digests of the client's queries in, if any.
+        slow_log: Log to record the client's slow queries in, if any.
+        budget: Buffer budget to account data forwarded by the session in, if any.
+    """
+
+    def __init__(
+        self,
+        client: socket.socket,
+        pool: BackendPool,
+        tls_context: ssl.SSLContext | None = None,
+        owner: Client = UNKNOWN_CLIENT,
+        relation: RelationStats | None = None,
+        digests: DigestTable | None = None,
+        slow_log: SlowQueryLog | None = None,
+        budget: BufferBudget | None = None,
+    ) -> None:
+        self.client = client
+        self.pool = pool
+        self.tls_context = tls_context
+        self.owner = owner
+        self.relation = relation or RelationStats(application=owner.application)
+        self.digests = digests
+        self.slow_log = slow_log
+        self.budget = (budget or BufferBudget()).connection()
+        self.received = 0
+        self.sent = 0
+        self._stream = PacketStream(client)
+        self._plugin = auth.CACHING_SHA2_PASSWORD
+        self._tracker: ResponseTracker | None = None
+        self._discarding = False  # Whether the current client packet is dropped.
+
+    async def run(self) -> None:
+        """Authenticate the client, then proxy its commands until it quits."""
+        try:
+            async with asyncio.timeout(HANDSHAKE_TIMEOUT):
+                handshake = await self._authenticate()
+        except (ProtocolError, TimeoutError, ssl.SSLError) as e:
+            _logger.warning("handshake with client failed: %s", e)
+            await self._error(protocol.ER_HANDSHAKE_ERROR, "08S01", "Bad handshake")
+            return
+
+        if handshake is None:
+            return
+
+        started = time.monotonic()
+        try:
+            backend = await self.pool.acquire(
+                Profile.negotiate(handshake.capabilities, handshake.charset), handshake.database
+            )
+        except BackendError as e:
+            _logger.error("cannot serve client session: %s", e)
+            self.relation.backend_unavailable_total += 1
+            await self._error(
+                protocol.CR_CONN_HOST_ERROR, "HY000", "Can't connect to remote MySQL server"
+            )
+            return
+
+        self.relation.backend_connect_seconds.observe(time.monotonic() - started)
+        reusable = False
+        try:
+            if handshake.database:
+                await backend.init_db(handshake.database)
+            await self._accept(handshake)
+            reusable = await self._proxy(backend)
+        except ServerError as e:
+            await self._stream.write(e.payload)
+            reusable = True
+        except OSError as e:
+            _logger.debug("client session ended abruptly: %s", e)
+        finally:
+            await self.pool.release(backend, reusable=reusable)
+
+    async def _authenticate(self) -> protocol.HandshakeResponse | None:
+        """Perform the server side of the connection phase.
+
+        Returns:
+            The client's handshake response if the client authenticated successfully.
+        """
+        nonce = auth.generate_nonce()
+        await self._stream.write(
+            protocol.Handshake(
+                server_version=self.pool.server_version or DEFAULT_SERVER_VERSION,
+                connection_id=next(_connection_ids),
+                nonce=nonce,
+                capabilities=FRONTEND_CAPABILITIES
+                | (protocol.CLIENT_SSL if self.tls_context else 0),
+                charset=DEFAULT_CHARSET,
+                status=protocol.SERVER_STATUS_AUTOCOMMIT,
+                auth_plugin=auth.CACHING_SHA2_PASSWORD,
+            ).encode()
+        )
+
+        payload = await self._stream.read()
+        if len(payload) == SSL_REQUEST_SIZE:
+            payload = await self._start_tls(payload)
+        response = protocol.HandshakeResponse.decode(payload)
+        plugin, data = response.auth_plugin, response.auth_response
+        if plugin not in auth.SUPPORTED_PLUGINS:
+            # AuthSwitchRequest: ask the client to use a plugin the proxy can verify.
+            plugin = auth.CACHING_SHA2_PASSWORD
+            await self._stream.write(b"\xfe" + plugin.encode() + b"\0" + nonce + b"\0")
+            data = await self._stream.read()
+
+        credentials = self.pool.credentials
+        if response.username != credentials.username or not auth.verify(
+            plugin, credentials.password, nonce, data
+        ):
+            _logger.warning("access denied for user '%s'", response.username)
+            await self._error(
+                protocol.ER_ACCESS_DENIED_ERROR,
+                "28000",
+                f"Access denied for user '{response.username}' (using password: "
+                + f"{'YES' if data else 'NO'})",
+            )
+            return None
+
+        self._plugin = plugin
+        return response
+
+    async def _start_tls(self, request: bytes) -> bytes:
+        """Terminate TLS requested by the client with an `SSLRequest` packet.
+
+        Returns:
+            The client's handshake response, received over TLS.
+
+        Raises:
+            ProtocolError: Raised if the client requests TLS but TLS is not configured.
+            ssl.SSLError: Raised if the TLS handshake fails.
+        """
+        (capabilities,) = struct.unpack_from("<I", request)
+        if not capabilities & protocol.CLIENT_SSL or self.tls_context is None:
+            raise ProtocolError("unexpected SSLRequest from client")
+
+        channel = self._stream.start_tls(self.tls_context, server_side=True)
+        await channel.handshake()
+        stats = self.pool.stats
+        stats.tls_client_handshakes_total += 1
+        stats.tls_client_resumed_total += channel.session_reused
+        return await self._stream.read()
+
+    async def _accept(self, handshake: protocol.HandshakeResponse) -> None:
+        """Tell the client that authentication succeeded."""
+        if self._plugin == auth.CACHING_SHA2_PASSWORD and self.pool.credentials.password:
+            await self._stream.write(b"\x01" + auth.FAST_AUTH_SUCCESS)
+        await self._stream.write(protocol.ok_payload())
+
+    async def _proxy(self, backend: BackendConnection) -> bool:
+        """Proxy commands between the client and the backend.
+
+        Returns:
+            Whether the backend connection can be reused by another client session.
+        """
+        self._tracker = ResponseTracker(backend.profile.capabilities, on_response=self._record)
+        upstream = asyncio.create_task(self._forward_commands(backend))
+        downstream = asyncio.create_task(self._forward_responses(backend))
+        done, _ = await asyncio.wait((upstream, downstream), return_when=asyncio.FIRST_COMPLETED)
+        if downstream in done:
+            # The backend closed the connection, or its responses could not be forwarded.
+            if error := downstream.exception():
+                _logger.warning("proxying responses from %s failed: %s", backend.endpoint, error)
+            upstream.cancel()
+            await asyncio.gather(upstream, return_exceptions=True)
+            return False
+
+        downstream.cancel()
+        await asyncio.gather(downstream, return_exceptions=True)
+        return upstream.result() and self._tracker.idle
+
+    async def _forward_commands(self, backend: BackendConnection) -> bool:
+        """Forward client commands to the backend until the client quits.
+
+        Packets are framed in a ring buffer and forwarded as they arrive, without
+        being reassembled or copied.
+
+        Returns:
+            `True` if the client quit gracefully with `COM_QUIT` or by closing its socket.
+        """
+        framer = PacketFramer()
+        while True:
+            await self.budget.wait()
+            free = framer.free()
+            free = free[: self.budget.allowance(len(free))]
+            if not (received := await self._stream.recv_into(free)):
+                return True
+
+            framer.commit(received)
+            self.budget.acquire(received)
+            try:
+                if not await self._forward_packets(framer, backend):
+                    return True
+            finally:
+                self.budget.release(received)
+
+    async def _forward_packets(self, framer: PacketFramer, backend: BackendConnection) -> bool:
+        """Forward the packet fragments received so far to the backend.
+
+        Returns:
+            `False` if the client quit with `COM_QUIT`.
+        """
+        tracker = self._tracker
+        assert tracker is not None
+        while (fragment := framer.next()) is not None:
+            if framer.first:
+                self._discarding = False
+                if framer.command == protocol.COM_QUIT:
+                    return False
+                if framer.command == protocol.COM_CHANGE_USER:
+                    self._discarding = True
+                    self._stream.seq = 1
+                    await self._error(
+                        protocol.ER_NOT_SUPPORTED_YET,
+                        "42000",
+                        "COM_CHANGE_USER is not supported by the proxy",
+                    )
+                    continue
+
+                tracker.command(framer.prefix)
+
+            if not self._discarding:
+                await backend.send(fragment, command=framer.first)
+                self.received += len(fragment)
+
+        return True
+
+    async def _forward_responses(self, backend: BackendConnection) -> None:
+        """Forward backend responses to the client until the backend closes the connection."""
+        assert self._tracker is not None
+        scanner = PacketScanner(self._tracker.packet)
+        while True:
+            await self.budget.wait()
+            if not (data := await backend.recv()):
+                return
+
+            # Track packets before the client can see them, so that the tracker is
+            # up to date by the time the client sends its next command.
+            scanner.feed(data)
+            self.budget.acquire(len(data))
+            try:
+                await self._stream.send(data)
+            finally:
+                self.budget.release(len(data))
+            self.sent += len(data)
+
+    def _record(self, response: Response) -> None:
+        """Record the latency of a command once the backend has responded to it."""
+        seconds = response.finished - response.started
+        self.relation.command(
+            protocol.COMMAND_NAMES.get(response.command, "COM_UNKNOWN"),
+            seconds,
+            error=response.error,
+        )
+        if response.command != protocol.COM_QUERY:
+            return
+
+        if self.digests is not None:
+            self.digests.record(
+                self.owner.application,
+                response.statement,
+                seconds,
+                rows=response.rows,
+                size=response.bytes,
+                error=response.error,
+            )
+        if self.slow_log is not None and seconds >= self.slow_log.threshold:
+            self.slow_log.record(
+                response.statement,
+                seconds,
+                application=self.owner.application,
+                relation=self.owner.relation,
+                address=self._address(),
+                rows=response.rows,
+                error=response.error,
+            )
+
+    def _address(self) -> str:
+        if self.client.family == socket.AF_UNIX:
+            # Clients of the Unix socket are unnamed.
+            return "localhost"
+        try:
+            return self.client.getpeername()[0]
+        except OSError:
+            return ""
+
+    async def _error(self, code: int, sqlstate: str, message: str) -> None:
+        try:
+            await self._stream.write(protocol.err_payload(code, sqlstate, message))
+        except OSError:
+            pass
@@ -0,0 +1,223 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Write a sampled slow query log of client queries.
+
+Slow queries are recorded in memory by the session that sent them, and written
+by a background task in batches. Formatting and file I/O run in a thread pool so
+that they never block the worker's event loop. The log follows the format of the
+MySQL slow query log, so tools such as `pt-query-digest` can read it, with an
+extra `# Application:` line attributing each query to its client application.
+
+Every worker appends to the same log file. Writes and rotations are serialized
+across workers with `flock(2)` on the log file.
+
+Logged statements include their literals, which may hold passwords or personal
+data, so the log files are only readable by their owner and group.
+"""
+
+import asyncio
+import fcntl
+import logging
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+
+from proxyd.stats import WorkerStats
+
+_logger = logging.getLogger(__name__)
+
+# Seconds between two writes of recorded slow queries.
+FLUSH_INTERVAL = 1.0
+# Maximum number of slow queries waiting to be written. Further slow queries are dropped.
+MAX_PENDING = 10_000
+# Permissions of the log files and of the directory created for them.
+LOG_MODE = 0o640
+LOG_DIR_MODE = 0o750
+
+
+@dataclass(frozen=True)
+class SlowQuery:
+    """Slow query sent by a client.
+
+    Attributes:
+        timestamp: UNIX timestamp of when the query finished.
+        application: Name of the client application that sent the query.
+        relation: ID of the client's relation.
+        address: Address of the client.
+        statement: Text of the query. Long queries are truncated.
+        seconds: Execution time of the query.
+        rows: Number of rows returned by the query.
+        error: Whether the query failed.
+    """
+
+    timestamp: float
+    application: str
+    relation: str
+    address: str
+    statement: bytes
+    seconds: float
+    rows: int
+    error: bool
+
+    def format(self) -> str:
+        """Format the query as a MySQL slow query log entry."""
+        when = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(self.timestamp))
+        micros = int(self.timestamp % 1 * 1_000_000)
+        statement = self.statement.decode(errors="replace").rstrip().rstrip(";")
+        return (
+            f"# Time: {when}.{micros:06d}Z\n"
+            + f"# User@Host: {self.application}[{self.application}] @  [{self.address}]\n"
+            + f"# Application: {self.application}  Relation: {self.relation}"
+            + f"  Error: {'yes' if self.error else 'no'}\n"
+            + f"# Query_time: {self.seconds:.6f}  Lock_time: 0.000000"
+            + f"  Rows_sent: {self.rows}  Rows_examined: 0\n"
+            + f"SET timestamp={int(self.timestamp)};\n"
+            + f"{statement};\n"
+        )
+
+
+class SlowQueryLog:
+    """Sampled slow query log.
+
+    Args:
+        path: Path of the log file.
+        threshold: Minimum execution time, in seconds, of a query to be logged.
+        sample_rate: Fraction of slow queries to log, between 0 and 1.
+        max_bytes: Size of the log file above which it is rotated.
+        backups: Number of rotated log files to keep.
+        stats: Worker statistics to record logged and dropped slow queries in.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        /,
+        threshold: float = 1.0,
+        sample_rate: float = 1.0,
+        max_bytes: int = 100 << 20,
+        backups: int = 5,
+        stats: WorkerStats | None = None,
+    ) -> None:
+        self.path = path
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.stats = stats or WorkerStats()
+        self._pending: deque[SlowQuery] = deque()
+
+    def record(
+        self,
+        statement: bytes,
+        seconds: float,
+        /,
+        application: str = "",
+        relation: str = "",
+        address: str = "",
+        rows: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Record a query if it is slow and sampled. The query is written later.
+
+        Args:
+            statement: Text of the query.
+            seconds: Execution time of the query.
+            application: Name of the client application that sent the query.
+            relation: ID of the client's relation.
+            address: Address of the client.
+            rows: Number of rows returned by the query.
+            error: Whether the query failed.
+        """
+        if seconds < self.threshold:
+            return
+
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+
+        if len(self._pending) >= MAX_PENDING:
+            self.stats.slow_queries_dropped_total += 1
+            return
+
+        self.stats.slow_queries_total += 1
+        self._pending.append(
+            SlowQuery(time.time(), application, relation, address, statement, seconds, rows, error)
+        )
+
+    async def run(self, interval: float = FLUSH_INTERVAL) -> None:
+        """Write recorded slow queries every `interval` seconds until cancelled."""
+        self.path.parent.mkdir(mode=LOG_DIR_MODE, parents=True, exist_ok=True)
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        finally:
+            # Write the last batch synchronously since the event loop is shutting down.
+            self._write(self._drain())
+
+    async def flush(self) -> None:
+        """Write recorded slow queries."""
+        if entries := self._drain():
+            await asyncio.get_running_loop().run_in_executor(None, self._write, entries)
+
+    def _drain(self) -> list[SlowQuery]:
+        entries = list(self._pending)
+        self._pending.clear()
+        return entries
+
+    def _write(self, entries: list[SlowQuery]) -> None:
+        """Append `entries` to the log file, and rotate it if it has grown too large."""
+        if not entries:
+            return
+
+        text = "".join(entry.format() for entry in entries)
+        try:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, LOG_MODE)
+            with open(fd, "a") as log:
+                # Log files created by earlier versions may be readable by anyone.
+                if os.fstat(fd).st_mode & 0o777 != LOG_MODE:
+                    os.fchmod(fd, LOG_MODE)
+                fcntl.flock(log, fcntl.LOCK_EX)
+                log.write(text)
+                log.flush()
+                size = os.fstat(log.fileno()).st_size
+                # Another worker may have rotated the file while this worker waited for
+                # the lock. Entries then land in the rotated file, which is not rotated again.
+                if size >= self.max_bytes and self._is_current(log.fileno()):
+                    self._rotate()
+        except OSError as e:
+            _logger.warning("cannot write slow query log %s: %s", self.path, e)
+
+    def _is_current(self, fd: int) -> bool:
+        try:
+            return os.stat(self.path).st_ino == os.fstat(fd).st_ino
+        except FileNotFoundError:
+            return False
+
+    def _rotate(self) -> None:
+        """Rotate `path` to `path.1`, `path.1` to `path.2`, and so on."""
+        if not self.backups:
+            self.path.unlink()
+            return
+
+        for index in range(self.backups - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                source.chmod(LOG_MODE)
+                source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
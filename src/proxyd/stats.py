@@ -0,0 +1,307 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Collect and publish runtime statistics of proxy worker processes."""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+
+from proxyd.clients import Client
+
+_logger = logging.getLogger(__name__)
+
+STATS_INTERVAL = 10.0
+# Upper bounds, in seconds, of the buckets of latency histograms.
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)  # fmt: skip
+
+
+@dataclass
+class Histogram:
+    """Latency histogram with `LATENCY_BUCKETS` buckets.
+
+    Attributes:
+        buckets: Number of observations in each bucket. The last bucket counts
+            observations above the largest bucket bound. Counts are not cumulative.
+        sum: Sum of all observations, in seconds.
+    """
+
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    sum: float = 0.0
+
+    @property
+    def count(self) -> int:
+        """Number of observations."""
+        return sum(self.buckets)
+
+    def observe(self, seconds: float) -> None:
+        """Record an observation."""
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate the `q`-quantile of the observations.
+
+        The estimate is interpolated linearly within the bucket holding the quantile.
+        Quantiles above the largest bucket bound are reported as the largest bound.
+        """
+        rank = q * self.count
+        cumulative = 0
+        for index, count in enumerate(self.buckets):
+            if count and cumulative + count >= rank:
+                if index == len(LATENCY_BUCKETS):
+                    return LATENCY_BUCKETS[-1]
+                lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+                return lower + (LATENCY_BUCKETS[index] - lower) * (rank - cumulative) / count
+            cumulative += count
+
+        return 0.0
+
+    def merge(self, other: "Histogram") -> None:
+        """Add the observations of `other` to this histogram."""
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+        self.sum += other.sum
+
+
+@dataclass
+class RelationStats:
+    """Runtime statistics of the client connections of a single relation.
+
+    Attributes:
+        application: Name of the client application of the relation.
+        connections_total: Number of client connections accepted.
+        connections_active: Number of client connections currently being proxied.
+        bytes_in_total: Number of bytes forwarded from clients to the backend.
+        bytes_out_total: Number of bytes forwarded from the backend to clients.
+        backend_unavailable_total: Number of client sessions that could not get a
+            backend connection.
+        backend_connect_seconds: Time client sessions took to get a backend connection.
+            A new connection in `passthrough` mode, a pooled connection in `pooled` mode.
+        commands: Latency of client commands by command name, from the command being
+            forwarded to the backend to the last packet of its response. Only recorded
+            in `pooled` mode.
+        command_errors_total: Number of client commands that failed by command name.
+    """
+
+    application: str = ""
+    connections_total: int = 0
+    connections_active: int = 0
+    bytes_in_total: int = 0
+    bytes_out_total: int = 0
+    backend_unavailable_total: int = 0
+    backend_connect_seconds: Histogram = field(default_factory=Histogram)
+    commands: dict[str, Histogram] = field(default_factory=dict)
+    command_errors_total: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RelationStats":
+        """Create relation statistics from their `asdict` form."""
+        return cls(
+            **{
+                **data,
+                "backend_connect_seconds": Histogram(**data["backend_connect_seconds"]),
+                "commands": {
+                    name: Histogram(**histogram) for name, histogram in data["commands"].items()
+                },
+            }
+        )
+
+    def command(self, name: str, seconds: float, /, error: bool = False) -> None:
+        """Record the latency of a client command."""
+        histogram = self.commands.get(name)
+        if histogram is None:
+            histogram = self.commands[name] = Histogram()
+        histogram.observe(seconds)
+        if error:
+            self.command_errors_total[name] = self.command_errors_total.get(name, 0) + 1
+
+    def merge(self, other: "RelationStats") -> None:
+        """Add the statistics of `other` to these statistics."""
+        for counter in (
+            "connections_total",
+            "connections_active",
+            "bytes_in_total",
+            "bytes_out_total",
+            "backend_unavailable_total",
+        ):
+            setattr(self, counter, getattr(self, counter) + getattr(other, counter))
+        self.backend_connect_seconds.merge(other.backend_connect_seconds)
+        for name, histogram in other.commands.items():
+            self.commands.setdefault(name, Histogram()).merge(histogram)
+        for name, count in other.command_errors_total.items():
+            self.command_errors_total[name] = self.command_errors_total.get(name, 0) + count
+
+
+@dataclass
+class WorkerStats:
+    """Runtime statistics of a single proxy worker process.
+
+    Counters are only ever updated by the worker's own event loop,
+    so they do not need to be protected by a lock.
+
+    Attributes:
+        worker: Index of the worker process.
+        pid: Process ID of the worker process.
+        started: UNIX timestamp of when the worker process started.
+        connections_total: Number of client connections accepted.
+        connections_active: Number of client connections currently being proxied.
+        backend_errors_total: Number of failed attempts to connect to a backend endpoint.
+        bytes_in_total: Number of bytes forwarded from clients to the backend.
+        bytes_out_total: Number of bytes forwarded from the backend to clients.
+        queue_depth: Number of client sessions waiting for a backend connection.
+        queued_total: Number of client sessions that had to wait for a backend connection.
+        queue_timeouts_total: Number of client sessions rejected after waiting too long.
+        queue_wait_seconds_total: Total number of seconds client sessions spent waiting.
+        backend_connects_total: Number of backend connections opened by the pool.
+        pool_idle: Number of idle connections in the backend connection pool.
+        pool_active: Number of pooled backend connections serving a client session.
+        pool_hits_total: Number of client sessions served by an idle pooled connection.
+        pool_misses_total: Number of client sessions that had to open a new connection.
+        pool_discarded_total: Number of pooled connections closed instead of being reused.
+        compression_payload_bytes_total: Number of bytes exchanged with the backend
+            over compressed connections, before compression or after decompression.
+        compression_wire_bytes_total: Number of bytes exchanged with the backend over
+            compressed connections, as sent on the network.
+        compression_cpu_seconds_total: CPU time spent compressing and decompressing.
+        tls_client_handshakes_total: Number of TLS handshakes with clients.
+        tls_client_resumed_total: Number of TLS handshakes with clients that resumed a session.
+        tls_backend_handshakes_total: Number of TLS handshakes with the backend.
+        tls_backend_resumed_total: Number of TLS handshakes with the backend that resumed
+            a session.
+        slow_queries_total: Number of slow queries recorded in the slow query log.
+        slow_queries_dropped_total: Number of slow queries dropped because the slow
+            query log could not keep up.
+        buffer_bytes: Number of bytes currently buffered while forwarding data.
+        buffer_paused: Whether reading is paused because too many bytes are buffered.
+        buffer_pauses_total: Number of times reading was paused because too many bytes
+            were buffered.
+        reloads_total: Number of times the worker reloaded its configuration.
+        breaker_opens_total: Number of times the circuit breaker of a backend endpoint opened.
+        breakers: State of the circuit breaker of every backend endpoint. Either
+            `closed`, `open`, or `half-open`.
+        relations: Statistics of client connections by relation ID.
+    """
+
+    worker: int = 0
+    pid: int = field(default_factory=os.getpid)
+    started: float = field(default_factory=time.time)
+    connections_total: int = 0
+    connections_active: int = 0
+    backend_errors_total: int = 0
+    bytes_in_total: int = 0
+    bytes_out_total: int = 0
+    queue_depth: int = 0
+    queued_total: int = 0
+    queue_timeouts_total: int = 0
+    queue_wait_seconds_total: float = 0.0
+    backend_connects_total: int = 0
+    pool_idle: int = 0
+    pool_active: int = 0
+    pool_hits_total: int = 0
+    pool_misses_total: int = 0
+    pool_discarded_total: int = 0
+    compression_payload_bytes_total: int = 0
+    compression_wire_bytes_total: int = 0
+    compression_cpu_seconds_total: float = 0.0
+    tls_client_handshakes_total: int = 0
+    tls_client_resumed_total: int = 0
+    tls_backend_handshakes_total: int = 0
+    tls_backend_resumed_total: int = 0
+    slow_queries_total: int = 0
+    slow_queries_dropped_total: int = 0
+    buffer_bytes: int = 0
+    buffer_paused: int = 0
+    buffer_pauses_total: int = 0
+    reloads_total: int = 0
+    breaker_opens_total: int = 0
+    breakers: dict[str, str] = field(default_factory=dict)
+    relations: dict[str, RelationStats] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WorkerStats":
+        """Create worker statistics from their `asdict` form."""
+        relations = data.get("relations", {})
+        return cls(
+            **{
+                **data,
+                "relations": {
+                    relation: RelationStats.from_dict(stats)
+                    for relation, stats in relations.items()
+                },
+            }
+        )
+
+    @classmethod
+    def counters(cls) -> list[str]:
+        """Get the names of the worker-wide counters and gauges."""
+        return [
+            f.name
+            for f in fields(cls)
+            if f.name not in ("worker", "pid", "started", "breakers", "relations")
+        ]
+
+    def relation(self, client: Client) -> RelationStats:
+        """Get the statistics of the relation `client` belongs to."""
+        stats = self.relations.get(client.relation)
+        if stats is None:
+            stats = self.relations[client.relation] = RelationStats(application=client.application)
+        return stats
+
+    def path(self, runtime_dir: Path) -> Path:
+        """Get the path of the file this worker's statistics are published to."""
+        return runtime_dir / f"worker-{self.worker}.json"
+
+    def publish(self, runtime_dir: Path) -> None:
+        """Atomically publish this worker's statistics to `runtime_dir`."""
+        path = self.path(runtime_dir)
+        scratch = path.with_suffix(".tmp")
+        scratch.write_text(json.dumps(asdict(self)))
+        scratch.replace(path)
+
+
+async def publish_periodically(
+    stats: WorkerStats, runtime_dir: Path, /, interval: float = STATS_INTERVAL
+) -> None:
+    """Publish worker statistics to `runtime_dir` every `interval` seconds until cancelled."""
+    runtime_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        while True:
+            try:
+                stats.publish(runtime_dir)
+            except OSError as e:
+                _logger.warning("cannot publish statistics of worker %d: %s", stats.worker, e)
+
+            await asyncio.sleep(interval)
+    finally:
+        stats.path(runtime_dir).unlink(missing_ok=True)
+
+
+def collect(runtime_dir: Path) -> list[WorkerStats]:
+    """Collect the statistics published by every running worker process."""
+    stats = []
+    for path in sorted(runtime_dir.glob("worker-*.json")):
+        try:
+            stats.append(WorkerStats.from_dict(json.loads(path.read_text())))
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            _logger.debug("ignoring unreadable worker statistics %s: %s", path, e)
+
+    return stats
@@ -0,0 +1,203 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Encrypt client and backend connections with TLS.
+
+MySQL upgrades a connection to TLS in the middle of the connection phase, after
+the server's initial handshake, so TLS is layered over the proxy's own non-blocking
+sockets with `ssl.SSLObject` and memory BIOs rather than `asyncio` transports.
+
+Client connections are resumed with stateless TLS session tickets. The server
+context is created once before worker processes are forked, so every worker
+shares the same ticket keys and can resume sessions started by another worker.
+"""
+
+import asyncio
+import socket
+import ssl
+from typing import cast
+
+# Backend TLS modes, following the `ssl-mode` option of MySQL clients.
+DISABLED = "DISABLED"
+REQUIRED = "REQUIRED"
+VERIFY_CA = "VERIFY_CA"
+VERIFY_IDENTITY = "VERIFY_IDENTITY"
+SSL_MODES = (DISABLED, REQUIRED, VERIFY_CA, VERIFY_IDENTITY)
+# Number of TLS 1.3 session tickets issued to clients after each full handshake.
+SESSION_TICKETS = 2
+# Maximum number of bytes read from a socket at once.
+READ_SIZE = 256 * 1024
+
+
+def server_context(cert_file: str, key_file: str) -> ssl.SSLContext:
+    """Create the TLS context used to terminate client connections.
+
+    Raises:
+        ssl.SSLError: Raised if the certificate or private key is invalid.
+        OSError: Raised if the certificate or private key cannot be read.
+    """
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.load_cert_chain(cert_file, key_file)
+    context.options &= ~ssl.OP_NO_TICKET
+    context.num_tickets = SESSION_TICKETS
+    return context
+
+
+def client_context(ssl_mode: str, ca_file: str = "") -> ssl.SSLContext | None:
+    """Create the TLS context used to connect to the backend.
+
+    Args:
+        ssl_mode: Backend TLS mode. One of `SSL_MODES`.
+        ca_file: CA certificates to verify the backend with. Defaults to the system's.
+
+    Returns:
+        The TLS context, or `None` if TLS is disabled.
+
+    Raises:
+        ValueError: Raised if `ssl_mode` is invalid.
+    """
+    if ssl_mode not in SSL_MODES:
+        raise ValueError(f"invalid ssl mode '{ssl_mode}'")
+    if ssl_mode == DISABLED:
+        return None
+
+    context = ssl.create_default_context(cafile=ca_file or None)
+    context.minimum_version = ssl.TLSVersion.TLSv1_2
+    context.check_hostname = ssl_mode == VERIFY_IDENTITY
+    if ssl_mode == REQUIRED:
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+class TLSChannel:
+    """TLS connection layered over a connected non-blocking socket.
+
+    Args:
+        sock: Connected non-blocking socket.
+        context: TLS context of the connection.
+        server_side: Whether the proxy is the TLS server of the connection.
+        server_hostname: Hostname to verify the server's certificate against.
+        session: Session to resume, if any.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        context: ssl.SSLContext,
+        /,
+        server_side: bool = False,
+        server_hostname: str | None = None,
+        session: ssl.SSLSession | None = None,
+    ) -> None:
+        self.sock = sock
+        self._incoming = ssl.MemoryBIO()
+        self._outgoing = ssl.MemoryBIO()
+        self._tls = context.wrap_bio(
+            self._incoming,
+            self._outgoing,
+            server_side=server_side,
+            server_hostname=server_hostname,
+            session=session,
+        )
+
+    def feed(self, data: bytes) -> None:
+        """Feed encrypted bytes that were received before the channel was created."""
+        self._incoming.write(data)
+
+    @property
+    def session(self) -> ssl.SSLSession | None:
+        """Session that can be used to resume this connection."""
+        return self._tls.session
+
+    @property
+    def session_reused(self) -> bool:
+        """Whether the handshake resumed a previous session."""
+        return self._tls.session_reused
+
+    async def handshake(self) -> None:
+        """Perform the TLS handshake.
+
+        Raises:
+            ssl.SSLError: Raised if the handshake fails.
+            ConnectionError: Raised if the peer closes the connection mid-handshake.
+        """
+        while True:
+            try:
+                self._tls.do_handshake()
+                break
+            except ssl.SSLWantReadError:
+                await self._flush()
+                if not await self._fill():
+                    raise ConnectionError("connection closed during TLS handshake")
+
+        await self._flush()
+
+    async def recv(self, nbytes: int = READ_SIZE) -> bytes:
+        """Receive up to `nbytes` decrypted bytes. Returns no bytes once the peer is done.
+
+        Raises:
+            ssl.SSLError: Raised if the received data cannot be decrypted.
+        """
+        while True:
+            try:
+                return self._tls.read(nbytes)
+            except ssl.SSLWantReadError:
+                # Reading may have processed post-handshake messages that need an answer.
+                await self._flush()
+                if not await self._fill():
+                    return b""
+            except (ssl.SSLZeroReturnError, ssl.SSLEOFError):
+                return b""
+
+    async def recv_into(self, buffer: memoryview) -> int:
+        """Receive decrypted bytes into `buffer`. Returns `0` once the peer is done.
+
+        Raises:
+            ssl.SSLError: Raised if the received data cannot be decrypted.
+        """
+        while True:
+            try:
+                # `read` returns the number of bytes read when given a buffer.
+                return cast(int, self._tls.read(len(buffer), buffer))
+            except ssl.SSLWantReadError:
+                await self._flush()
+                if not await self._fill():
+                    return 0
+            except (ssl.SSLZeroReturnError, ssl.SSLEOFError):
+                return 0
+
+    async def sendall(self, data: bytes | memoryview) -> None:
+        """Encrypt and send all of `data`."""
+        view = memoryview(data)
+        while view:
+            written = self._tls.write(view)
+            view = view[written:]
+            await self._flush()
+
+    async def _fill(self) -> bool:
+        """Feed encrypted bytes from the socket to the TLS object."""
+        data = await asyncio.get_running_loop().sock_recv(self.sock, READ_SIZE)
+        if not data:
+            self._incoming.write_eof()
+            return False
+
+        self._incoming.write(data)
+        return True
+
+    async def _flush(self) -> None:
+        """Send encrypted bytes produced by the TLS object to the socket."""
+        if data := self._outgoing.read():
+            await asyncio.get_running_loop().sock_sendall(self.sock, data)
@@ -0,0 +1,322 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Follow the command phase of MySQL connections forwarded by the proxy.
+
+Bytes are forwarded as they are read. `PacketScanner` finds packet boundaries
+in those reads without reassembling packets, and `ResponseTracker` uses the
+first bytes of every packet to work out when the backend has finished
+responding to each command sent by the client.
+"""
+
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from proxyd import protocol
+from proxyd.protocol import (
+    COM_BINLOG_DUMP,
+    COM_BINLOG_DUMP_GTID,
+    COM_CHANGE_USER,
+    COM_FIELD_LIST,
+    COM_QUERY,
+    COM_QUIT,
+    COM_STMT_CLOSE,
+    COM_STMT_EXECUTE,
+    COM_STMT_FETCH,
+    COM_STMT_PREPARE,
+    COM_STMT_SEND_LONG_DATA,
+    EOF_HEADER,
+    ERR_HEADER,
+    MAX_PAYLOAD,
+    OK_HEADER,
+    SERVER_MORE_RESULTS_EXISTS,
+    SERVER_STATUS_CURSOR_EXISTS,
+)
+
+# Number of payload bytes of each packet handed to the packet callback.
+# Large enough to hold the header of any `OK_Packet`.
+PREFIX_SIZE = 32
+
+# Number of bytes of `COM_QUERY` statements kept with their response, e.g. for digests.
+STATEMENT_PREFIX_SIZE = 1024
+
+# Commands the server does not respond to.
+_NO_RESPONSE = frozenset({COM_QUIT, COM_STMT_SEND_LONG_DATA, COM_STMT_CLOSE})
+# Commands whose responses cannot be followed by the tracker.
+_UNTRACKABLE = frozenset({COM_BINLOG_DUMP, COM_BINLOG_DUMP_GTID, COM_CHANGE_USER})
+
+
+class _State(IntEnum):
+    """States of the response at the head of the queue."""
+
+    FIRST = 0  # Waiting for the first packet of a response.
+    COLUMNS = 1  # Reading column definitions of a result set.
+    COLUMNS_EOF = 2  # Waiting for the `EOF_Packet` after column definitions.
+    ROWS = 3  # Reading rows of a result set.
+    PARAMS = 4  # Reading parameter definitions of a prepared statement.
+    PARAMS_EOF = 5
+    PREPARED_COLUMNS = 6  # Reading column definitions of a prepared statement.
+    PREPARED_COLUMNS_EOF = 7
+    FIELDS = 8  # Reading column definitions sent in response to `COM_FIELD_LIST`.
+
+
+class PacketScanner:
+    """Find MySQL packet boundaries in a byte stream split across arbitrary reads.
+
+    `on_packet` is called once per logical packet with the first `PREFIX_SIZE`
+    bytes of its payload (fewer for shorter packets) and the length of its first
+    physical packet. Packets continuing a 16 MiB packet are not reported.
+    """
+
+    def __init__(self, on_packet: Callable[[bytes, int], None]) -> None:
+        self.on_packet = on_packet
+        self._header = bytearray()
+        self._prefix = bytearray()
+        self._length = 0
+        self._remaining = 0
+        self._capturing = False
+        self._continued = False
+
+    def feed(self, data: bytes | bytearray | memoryview) -> None:
+        """Scan the next chunk of the byte stream."""
+        view = memoryview(data)
+        offset = 0
+        end = len(view)
+        while offset < end:
+            if self._remaining == 0 and not self._capturing:
+                needed = 4 - len(self._header)
+                self._header += view[offset : offset + needed]
+                offset += min(needed, end - offset)
+                if len(self._header) < 4:
+                    return
+
+                self._start(int.from_bytes(self._header[:3], "little"))
+                self._header.clear()
+                continue
+
+            take = min(self._remaining, end - offset)
+            if self._capturing:
+                wanted = PREFIX_SIZE - len(self._prefix)
+                self._prefix += view[offset : offset + min(wanted, take)]
+
+            offset += take
+            self._remaining -= take
+            if self._capturing and (len(self._prefix) >= PREFIX_SIZE or not self._remaining):
+                self._emit()
+
+    def _start(self, length: int) -> None:
+        """Start scanning a packet whose header has just been read."""
+        continued = self._continued
+        self._continued = length == MAX_PAYLOAD
+        self._length = length
+        self._remaining = length
+        self._capturing = not continued
+        if self._capturing and not length:
+            self._emit()
+
+    def _emit(self) -> None:
+        self._capturing = False
+        prefix = bytes(self._prefix)
+        self._prefix.clear()
+        self.on_packet(prefix, self._length)
+
+
+@dataclass
+class Response:
+    """Response of the backend to a single client command.
+
+    Attributes:
+        command: Command byte of the client command.
+        started: Monotonic time at which the command was sent to the backend.
+        statement: First `STATEMENT_PREFIX_SIZE` bytes of the statement of a `COM_QUERY`.
+        rows: Number of rows in the result sets of the response.
+        bytes: Number of payload bytes in the response.
+        error: Whether the response ended with an `ERR_Packet`.
+        finished: Monotonic time at which the last packet of the response was read.
+    """
+
+    command: int
+    started: float = field(default_factory=time.monotonic)
+    statement: bytes = b""
+    rows: int = 0
+    bytes: int = 0
+    error: bool = False
+    finished: float = 0.0
+
+
+class ResponseTracker:
+    """Track which client commands the backend has not finished responding to.
+
+    Args:
+        capabilities: Capability flags negotiated between the client and the backend.
+        on_response: Called with every response once the backend has finished sending it.
+    """
+
+    def __init__(
+        self, capabilities: int, on_response: Callable[[Response], None] | None = None
+    ) -> None:
+        self.deprecate_eof = bool(capabilities & protocol.CLIENT_DEPRECATE_EOF)
+        self.on_response = on_response
+        self.broken = False
+        self._pending: deque[Response] = deque()
+        self._state = _State.FIRST
+        self._count = 0
+        self._columns = 0
+        self._handlers = {
+            _State.FIRST: self._first,
+            _State.COLUMNS: self._column,
+            _State.COLUMNS_EOF: self._columns_eof,
+            _State.ROWS: self._row,
+            _State.PARAMS: self._param,
+            _State.PARAMS_EOF: lambda *_: self._prepared_columns(),
+            _State.PREPARED_COLUMNS: self._prepared_column,
+            _State.PREPARED_COLUMNS_EOF: lambda *_: self._finish(),
+            _State.FIELDS: self._field,
+        }
+
+    @property
+    def idle(self) -> bool:
+        """Whether the backend has responded to every command it has been sent."""
+        return not self._pending and not self.broken
+
+    def command(self, payload: bytes | memoryview) -> None:
+        """Record a command sent by the client.
+
+        `payload` must at least hold the command byte. The statement of `COM_QUERY`
+        commands is kept with their response if `payload` holds it.
+        """
+        command = payload[0] if payload else -1
+        if command in _UNTRACKABLE:
+            self.broken = True
+        elif command == COM_QUERY:
+            statement = bytes(payload[1 : STATEMENT_PREFIX_SIZE + 1])
+            self._pending.append(Response(command, statement=statement))
+        elif command not in _NO_RESPONSE:
+            self._pending.append(Response(command))
+
+    def packet(self, prefix: bytes, length: int) -> None:
+        """Track a packet sent by the backend. Compatible with `PacketScanner`."""
+        if not self._pending or self.broken:
+            return
+
+        response = self._pending[0]
+        response.bytes += length
+        header = prefix[0] if prefix else -1
+        if header == ERR_HEADER:
+            # `0xFF` never starts a column definition or a row.
+            response.error = True
+            self._finish()
+            return
+
+        try:
+            self._handlers[self._state](response, header, prefix, length)
+        except protocol.ProtocolError:
+            self.broken = True
+
+    def _first(self, response: Response, header: int, prefix: bytes, length: int) -> None:
+        """Handle the first packet of a response."""
+        command = response.command
+        if command == COM_STMT_FETCH:
+            self._state = _State.ROWS
+            self._row(response, header, prefix, length)
+        elif command == COM_FIELD_LIST:
+            self._state = _State.FIELDS
+            self._field(response, header, prefix, length)
+        elif command == COM_STMT_PREPARE and header == OK_HEADER:
+            # COM_STMT_PREPARE_OK: header, statement ID, columns, parameters, ...
+            self._columns = int.from_bytes(prefix[5:7], "little")
+            self._count = int.from_bytes(prefix[7:9], "little")
+            self._state = _State.PARAMS
+            if not self._count:
+                self._prepared_columns()
+        elif command not in (COM_QUERY, COM_STMT_EXECUTE):
+            self._finish()
+        elif header == OK_HEADER:
+            if not protocol.read_status_flags(prefix) & SERVER_MORE_RESULTS_EXISTS:
+                self._finish()
+        elif header == 0xFB:
+            # LOCAL INFILE requests are never negotiated by the proxy.
+            raise protocol.ProtocolError("unexpected LOCAL INFILE request")
+        else:
+            self._count, _ = protocol.read_lenenc_int(prefix)
+            self._state = _State.COLUMNS
+
+    def _column(self, *_) -> None:
+        self._count -= 1
+        if not self._count:
+            self._state = _State.ROWS if self.deprecate_eof else _State.COLUMNS_EOF
+
+    def _columns_eof(self, _: Response, header: int, prefix: bytes, length: int) -> None:
+        if protocol.read_status_flags(prefix) & SERVER_STATUS_CURSOR_EXISTS:
+            # Rows are fetched later with COM_STMT_FETCH.
+            self._finish()
+        else:
+            self._state = _State.ROWS
+
+    def _row(self, response: Response, header: int, prefix: bytes, length: int) -> None:
+        if not self._is_terminator(header, length):
+            response.rows += 1
+        elif protocol.read_status_flags(prefix, self.deprecate_eof) & SERVER_MORE_RESULTS_EXISTS:
+            self._state = _State.FIRST
+        else:
+            self._finish()
+
+    def _param(self, *_) -> None:
+        self._count -= 1
+        if not self._count:
+            if self.deprecate_eof:
+                self._prepared_columns()
+            else:
+                self._state = _State.PARAMS_EOF
+
+    def _prepared_columns(self) -> None:
+        """Start reading the column definitions of a prepared statement."""
+        self._count, self._columns = self._columns, 0
+        if self._count:
+            self._state = _State.PREPARED_COLUMNS
+        else:
+            self._finish()
+
+    def _prepared_column(self, *_) -> None:
+        self._count -= 1
+        if not self._count:
+            if self.deprecate_eof:
+                self._finish()
+            else:
+                self._state = _State.PREPARED_COLUMNS_EOF
+
+    def _field(self, _: Response, header: int, prefix: bytes, length: int) -> None:
+        if self._is_terminator(header, length):
+            self._finish()
+
+    def _is_terminator(self, header: int, length: int) -> bool:
+        """Check if a packet in a result set is the `EOF_Packet` or `OK_Packet` ending it."""
+        if header != EOF_HEADER:
+            return False
+
+        return length < MAX_PAYLOAD if self.deprecate_eof else length < 9
+
+    def _finish(self) -> None:
+        """Finish the response at the head of the queue."""
+        response = self._pending.popleft()
+        response.finished = time.monotonic()
+        self._state = _State.FIRST
+        self._count = 0
+        self._columns = 0
+        if self.on_response:
+            self.on_response(response)
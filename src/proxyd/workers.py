@@ -0,0 +1,381 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Run the proxy across several worker processes.
+
+Every worker process runs its own event loop and binds its own listening socket
+with `SO_REUSEPORT`, so the kernel spreads incoming client connections across
+the workers. Unix sockets cannot be shared that way, so the supervisor binds the
+Unix socket, if any, and every worker accepts connections on the inherited socket.
+The supervisor process otherwise only spawns, reaps, and respawns workers.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import socket
+import ssl
+import time
+from pathlib import Path
+
+from proxyd import digest, tls
+from proxyd.admission import AdmissionController
+from proxyd.backend import Credentials
+from proxyd.breaker import Breakers
+from proxyd.budget import BufferBudget
+from proxyd.clients import ClientMap
+from proxyd.config import POOLED, ProxyConfig, apply_reloadable, requires_restart
+from proxyd.metrics import MetricsServer
+from proxyd.pool import BackendPool
+from proxyd.server import ProxyServer, bind_unix
+from proxyd.slowlog import SlowQueryLog
+from proxyd.stats import WorkerStats, publish_periodically
+
+_logger = logging.getLogger(__name__)
+
+# Minimum number of seconds between two respawns of the same worker.
+RESPAWN_BACKOFF = 1.0
+
+
+def worker_count(config: ProxyConfig) -> int:
+    """Get the number of worker processes to run for `config`.
+
+    No more workers run than the backend connection limits allow, so that every
+    worker is allowed at least one backend connection.
+    """
+    count = config.workers if config.workers > 0 else os.cpu_count() or 1
+    limits = [
+        limit for limit in (config.max_connections, config.max_relation_connections) if limit
+    ]
+    return min([count, *limits])
+
+
+def worker_limit(limit: int, workers: int, index: int = 0) -> int:
+    """Get the share of worker `index` of a limit shared by every worker.
+
+    Workers do not coordinate with each other, so the limit is split such that the
+    shares of every worker add up to exactly `limit`. The first `limit % workers`
+    workers get one more than the others. `0` means unlimited and is not split.
+    """
+    return limit // workers + (index < limit % workers) if limit else 0
+
+
+class Worker:
+    """Proxy worker serving client connections in the current process.
+
+    Args:
+        config: Proxy configuration.
+        index: Index of the worker. Used to label the worker's statistics.
+        tls_context: TLS context to terminate client TLS with, if any.
+        unix_listener: Listening Unix socket inherited from the supervisor, if any.
+
+    Raises:
+        ValueError: Raised if the backend TLS configuration is invalid.
+    """
+
+    def __init__(
+        self,
+        config: ProxyConfig,
+        /,
+        index: int = 0,
+        tls_context: ssl.SSLContext | None = None,
+        unix_listener: socket.socket | None = None,
+    ) -> None:
+        count = worker_count(config)
+        self.config = config
+        self.stats = WorkerStats(worker=index)
+        self.clients = ClientMap(Path(config.clients_file) if config.clients_file else None)
+        self.admission = AdmissionController(
+            limit=worker_limit(config.max_connections, count, index),
+            relation_limit=worker_limit(config.max_relation_connections, count, index),
+            timeout=config.queue_timeout,
+            stats=self.stats,
+        )
+        self.budget = BufferBudget(
+            high=worker_limit(config.buffer_high_watermark, count, index),
+            low=worker_limit(config.buffer_low_watermark, count, index),
+            stats=self.stats,
+        )
+        self.breakers = None
+        if config.breaker_failure_threshold:
+            self.breakers = Breakers(
+                config.endpoints,
+                failure_threshold=config.breaker_failure_threshold,
+                reset_timeout=config.breaker_reset_timeout,
+                stats=self.stats,
+            )
+        self.pool = None
+        self.digests = None
+        if config.mode == POOLED and config.digest_capacity:
+            self.digests = digest.DigestTable(config.digest_capacity)
+        self.slow_log = None
+        if config.mode == POOLED and config.slow_query_log:
+            self.slow_log = SlowQueryLog(
+                Path(config.slow_query_log),
+                threshold=config.slow_query_threshold,
+                sample_rate=config.slow_query_sample_rate,
+                max_bytes=config.slow_query_log_max_bytes,
+                backups=config.slow_query_log_backups,
+                stats=self.stats,
+            )
+        if config.mode == POOLED:
+            self.pool = BackendPool(
+                config.endpoints,
+                Credentials(config.username, config.password),
+                min_size=worker_limit(config.pool_min_size, count, index),
+                max_idle=config.pool_max_idle,
+                max_size=worker_limit(config.max_connections, count, index),
+                connect_timeout=config.connect_timeout,
+                stats=self.stats,
+                compression_algorithm=config.compression,
+                compression_level=config.compression_level,
+                tls_context=tls.client_context(config.backend_ssl_mode, config.backend_ca_file),
+                breakers=self.breakers,
+            )
+        self.server = ProxyServer(
+            config,
+            self.stats,
+            clients=self.clients,
+            admission=self.admission,
+            pool=self.pool,
+            tls_context=tls_context,
+            digests=self.digests,
+            slow_log=self.slow_log,
+            breakers=self.breakers,
+            budget=self.budget,
+            unix_listener=unix_listener,
+        )
+        self.metrics = None
+        if config.metrics_port:
+            self.metrics = MetricsServer(
+                self.stats,
+                Path(config.runtime_dir),
+                address=config.listen_address,
+                port=config.metrics_port,
+            )
+
+    async def run(self) -> None:
+        """Serve client connections until cancelled."""
+        tasks = [
+            asyncio.create_task(publish_periodically(self.stats, Path(self.config.runtime_dir))),
+            asyncio.create_task(self.clients.watch()),
+        ]
+        if self.pool:
+            tasks.append(asyncio.create_task(self.pool.maintain()))
+        if self.metrics:
+            tasks.append(asyncio.create_task(self.metrics.serve_forever()))
+        if self.digests:
+            path = Path(self.config.runtime_dir) / f"digests-{self.stats.worker}.json"
+            tasks.append(asyncio.create_task(digest.publish_periodically(self.digests, path)))
+        if self.slow_log:
+            tasks.append(asyncio.create_task(self.slow_log.run()))
+
+        try:
+            await self.server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self.pool:
+                self.pool.close()
+
+    def reload(self, config: ProxyConfig) -> None:
+        """Apply the reloadable fields of a new configuration.
+
+        The listening socket stays open. New client sessions use the new backend
+        credentials and endpoints, while existing sessions keep their backend
+        connection until they end.
+        """
+        if requires_restart(self.config, config):
+            _logger.warning("ignoring configuration changes that require a restart")
+
+        config = apply_reloadable(self.config, config)
+        if config == self.config:
+            return
+
+        if self.breakers:
+            self.breakers.reset(config.endpoints)
+        if self.pool:
+            self.pool.rotate(Credentials(config.username, config.password), config.endpoints)
+
+        self.config = self.server.config = config
+        self.stats.reloads_total += 1
+
+
+class Supervisor:
+    """Spawn and supervise proxy worker processes.
+
+    Workers that exit unexpectedly are respawned. `SIGTERM`, `SIGINT`, and
+    `SIGHUP` received by the supervisor are forwarded to every worker. On `SIGHUP`,
+    the supervisor also reloads its own copy of the configuration so that respawned
+    workers start with the current backend credentials and endpoints.
+
+    The client TLS context is created by the supervisor so that every worker
+    inherits the same TLS session ticket keys. The Unix socket is bound by the
+    supervisor so that every worker accepts connections on it.
+    """
+
+    def __init__(
+        self,
+        config: ProxyConfig,
+        /,
+        count: int,
+        path: Path | None = None,
+        tls_context: ssl.SSLContext | None = None,
+    ) -> None:
+        self.config = config
+        self.count = count
+        self.path = path
+        self.tls_context = tls_context
+        self.unix_listener: socket.socket | None = None
+        self._workers: dict[int, int] = {}  # Maps worker PID to worker index.
+        self._spawned: dict[int, float] = {}  # Maps worker index to time of last spawn.
+        self._stopping = False
+
+    def run(self) -> None:
+        """Run worker processes until the supervisor is asked to stop."""
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, self._reload)
+        if self.config.unix_socket:
+            self.unix_listener = bind_unix(self.config.unix_socket)
+        for index in range(self.count):
+            self._spawn(index)
+
+        while self._workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            index = self._workers.pop(pid, None)
+            if index is None or self._stopping:
+                continue
+
+            _logger.warning(
+                "worker %d (pid %d) exited with status %d. respawning",
+                index,
+                pid,
+                os.waitstatus_to_exitcode(status),
+            )
+            time.sleep(max(0.0, self._spawned[index] + RESPAWN_BACKOFF - time.monotonic()))
+            self._spawn(index)
+
+    def _spawn(self, index: int) -> None:
+        """Fork a new worker process."""
+        self._spawned[index] = time.monotonic()
+        pid = os.fork()
+        if pid:
+            self._workers[pid] = index
+            _logger.info("started worker %d (pid %d)", index, pid)
+            return
+
+        # Child process. Never return into the supervisor's loop.
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            # Ignore reload requests until the worker's event loop handles them.
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            run_worker(
+                self.config,
+                index,
+                path=self.path,
+                tls_context=self.tls_context,
+                unix_listener=self.unix_listener,
+            )
+        except BaseException:
+            _logger.exception("worker %d failed", index)
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop(self, signum: int, _) -> None:
+        """Forward a stop signal to every worker process."""
+        self._stopping = True
+        self._forward(signum, _)
+
+    def _reload(self, signum: int, _) -> None:
+        """Reload the configuration and forward the reload request to every worker process."""
+        if self.path:
+            try:
+                self.config = apply_reloadable(self.config, ProxyConfig.load(self.path))
+            except ValueError as e:
+                _logger.error("cannot reload configuration: %s", e)
+
+        self._forward(signum, _)
+
+    def _forward(self, signum: int, _) -> None:
+        """Forward a signal to every worker process."""
+        for pid in self._workers:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+
+def run_worker(
+    config: ProxyConfig,
+    /,
+    worker: int = 0,
+    path: Path | None = None,
+    tls_context: ssl.SSLContext | None = None,
+    unix_listener: socket.socket | None = None,
+) -> None:
+    """Run a proxy worker until it receives `SIGTERM` or `SIGINT`.
+
+    Args:
+        config: Proxy configuration.
+        worker: Index of the worker.
+        path: Path of the configuration file to reload on `SIGHUP`.
+        tls_context: TLS context to terminate client TLS with, if any.
+        unix_listener: Listening Unix socket inherited from the supervisor, if any.
+            The worker binds the Unix socket itself if not given.
+    """
+    asyncio.run(_serve_until_stopped(config, worker, path, tls_context, unix_listener))
+
+
+async def _serve_until_stopped(
+    config: ProxyConfig,
+    index: int,
+    path: Path | None,
+    tls_context: ssl.SSLContext | None,
+    unix_listener: socket.socket | None,
+) -> None:
+    loop = asyncio.get_running_loop()
+    worker = Worker(config, index=index, tls_context=tls_context, unix_listener=unix_listener)
+    task = loop.create_task(worker.run())
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, task.cancel)
+    if path:
+        loop.add_signal_handler(signal.SIGHUP, _reload, worker, path)
+
+    try:
+        await task
+    except asyncio.CancelledError:
+        _logger.info("worker %d shutting down", index)
+
+
+def _reload(worker: Worker, path: Path) -> None:
+    try:
+        config = ProxyConfig.load(path)
+    except ValueError as e:
+        _logger.error("cannot reload configuration: %s", e)
+        return
+
+    _logger.info("reloading configuration from %s", path)
+    worker.reload(config)
+    # Publish right away so that the reload can be confirmed from the worker's statistics.
+    worker.stats.publish(Path(worker.config.runtime_dir))
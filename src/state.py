@@ -14,12 +14,16 @@
 
 """Manage the state of the MySQL proxy charmed operation."""
 
+import sys
 from typing import TYPE_CHECKING, cast
 
 import ops
 from hpc_libs.interfaces import ConditionEvaluation
 
-from constants import DB_URI_SECRET_KEY, DB_URI_SECRET_LABEL
+import peers
+import proxy
+from constants import DB_URI_SECRET_KEY, DB_URI_SECRET_LABEL, DIRECT_MODE, PROXY_MODES
+from proxyd import compression, tls
 
 if TYPE_CHECKING:
     from charm import MySQLProxyCharm
@@ -41,10 +45,126 @@ def db_uri_secret_exists(charm: "MySQLProxyCharm") -> ConditionEvaluation:
     )
 
 
+def proxy_config_valid(charm: "MySQLProxyCharm") -> ConditionEvaluation:
+    """Check if the proxy configuration options are valid."""
+    mode = charm.config.get("mode")
+    if mode not in PROXY_MODES:
+        return ConditionEvaluation(
+            False, f"Invalid `mode` '{mode}'. Must be one of: {', '.join(PROXY_MODES)}"
+        )
+
+    port = cast(int, charm.config.get("proxy-port"))
+    if not 0 < port < 65536:
+        return ConditionEvaluation(False, f"Invalid `proxy-port` {port}")
+
+    for option in (
+        "proxy-workers",
+        "max-backend-connections",
+        "max-relation-connections",
+        "max-buffer-memory",
+        "pool-min-connections",
+    ):
+        if (value := cast(int, charm.config.get(option))) < 0:
+            return ConditionEvaluation(False, f"Invalid `{option}` {value}")
+
+    if (timeout := cast(float, charm.config.get("queue-timeout"))) <= 0:
+        return ConditionEvaluation(False, f"Invalid `queue-timeout` {timeout}")
+
+    ok, message = _compression_config_valid(charm)
+    if not ok:
+        return ConditionEvaluation(False, message)
+
+    ok, message = _observability_config_valid(charm)
+    if not ok:
+        return ConditionEvaluation(False, message)
+
+    ssl_mode = charm.config.get("backend-ssl-mode")
+    if ssl_mode not in tls.SSL_MODES:
+        return ConditionEvaluation(
+            False,
+            f"Invalid `backend-ssl-mode` '{ssl_mode}'. Must be one of: {', '.join(tls.SSL_MODES)}",
+        )
+
+    return ConditionEvaluation(True, "")
+
+
+def _compression_config_valid(charm: "MySQLProxyCharm") -> ConditionEvaluation:
+    """Check if the backend compression options are valid."""
+    algorithm = charm.config.get("backend-compression")
+    if algorithm == "none":
+        return ConditionEvaluation(True, "")
+
+    if algorithm not in compression.LEVELS:
+        return ConditionEvaluation(
+            False,
+            f"Invalid `backend-compression` '{algorithm}'. Must be one of: none, "
+            + ", ".join(compression.LEVELS),
+        )
+    if not compression.available(algorithm):
+        # zstd needs the `compression.zstd` module of Python 3.14, newer than the base's Python.
+        return ConditionEvaluation(
+            False,
+            f"`backend-compression` '{algorithm}' requires Python 3.14 or newer, "
+            + f"the unit runs Python {sys.version_info.major}.{sys.version_info.minor}",
+        )
+
+    level = cast(int, charm.config.get("backend-compression-level"))
+    if level and level not in compression.LEVELS[algorithm]:
+        return ConditionEvaluation(False, f"Invalid `backend-compression-level` {level}")
+
+    return ConditionEvaluation(True, "")
+
+
+def _observability_config_valid(charm: "MySQLProxyCharm") -> ConditionEvaluation:
+    """Check if the metrics and slow query log options are valid."""
+    metrics_port = cast(int, charm.config.get("metrics-port"))
+    if not 0 <= metrics_port < 65536 or metrics_port == charm.config.get("proxy-port"):
+        return ConditionEvaluation(False, f"Invalid `metrics-port` {metrics_port}")
+
+    if (threshold := cast(float, charm.config.get("slow-query-threshold"))) < 0:
+        return ConditionEvaluation(False, f"Invalid `slow-query-threshold` {threshold}")
+
+    if not 0 < (rate := cast(float, charm.config.get("slow-query-sample-rate"))) <= 1:
+        return ConditionEvaluation(False, f"Invalid `slow-query-sample-rate` {rate}")
+
+    return ConditionEvaluation(True, "")
+
+
 def check_mysql_proxy(charm: "MySQLProxyCharm") -> ops.StatusBase:
     """Determine the state of the MySQL proxy application/unit based on satisfied conditions."""
     ok, message = db_uri_secret_exists(charm)
     if not ok:
         return ops.BlockedStatus(message)
 
-    return ops.ActiveStatus()
+    ok, message = proxy_config_valid(charm)
+    if not ok:
+        return ops.BlockedStatus(message)
+
+    status = _backend_status(charm)
+    if isinstance(status, ops.ActiveStatus) and charm.unit.is_leader():
+        if cursor := peers.load_cursor(charm):
+            return ops.MaintenanceStatus(
+                f"Updating client integrations ({cursor.done}/{cursor.total})"
+            )
+
+    return status
+
+
+def _backend_status(charm: "MySQLProxyCharm") -> ops.StatusBase:
+    """Determine the state of the unit from the circuit breakers of the proxy's workers."""
+    if charm.config.get("mode") == DIRECT_MODE:
+        return ops.ActiveStatus()
+
+    unreachable = proxy.unreachable_endpoints()
+    if not unreachable:
+        return ops.ActiveStatus()
+
+    try:
+        endpoints = proxy.load_database_data(charm).endpoints
+    except ValueError:
+        endpoints = []
+
+    if set(endpoints) <= set(unreachable):
+        return ops.BlockedStatus(f"All backend endpoints unreachable: {', '.join(unreachable)}")
+
+    return ops.ActiveStatus(f"Backend endpoint(s) unreachable: {', '.join(unreachable)}")
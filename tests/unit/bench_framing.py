@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Microbenchmarks of client packet framing, in packets per second.
+
+Compares `PacketFramer`, which frames packets in a ring buffer, with reading
+whole packets with `PacketStream.read_raw`. Run as a script, e.g.:
+
+    PYTHONPATH=src:lib python tests/unit/bench_framing.py --packets 200000
+"""
+
+import argparse
+import asyncio
+import time
+
+from proxyd import protocol
+from proxyd.framing import PacketFramer
+from proxyd.protocol import PacketStream
+
+# Size of the reads the byte stream is split into.
+READ_SIZE = 64 * 1024
+
+
+def _chunks(packets: int, size: int) -> list[bytes]:
+    """Split a stream of `packets` packets with `size` bytes of payload into reads."""
+    data = protocol.packet(bytes((protocol.COM_QUERY,)) + bytes(size - 1)) * packets
+    return [data[offset : offset + READ_SIZE] for offset in range(0, len(data), READ_SIZE)]
+
+
+def bench_framer(packets: int, size: int) -> float:
+    """Frame packets with `PacketFramer` and return the packets framed per second."""
+    chunks = _chunks(packets, size)
+    framer = PacketFramer()
+    framed = 0
+    started = time.perf_counter()
+    for chunk in chunks:
+        view = memoryview(chunk)
+        while view:
+            free = framer.free()
+            nbytes = min(len(free), len(view))
+            free[:nbytes] = view[:nbytes]
+            framer.commit(nbytes)
+            view = view[nbytes:]
+            while framer.next() is not None:
+                framed += framer.first
+
+    assert framed == packets
+    return packets / (time.perf_counter() - started)
+
+
+class _ReplayStream(PacketStream):
+    """Packet stream reading from a list of chunks instead of a socket."""
+
+    def __init__(self, chunks: list[bytes]) -> None:
+        super().__init__(None)  # type: ignore[arg-type]
+        self._chunks = iter(chunks)
+
+    async def _receive(self) -> bytes:
+        return next(self._chunks, b"")
+
+
+def bench_stream(packets: int, size: int) -> float:
+    """Read packets with `PacketStream.read_raw` and return the packets read per second."""
+    stream = _ReplayStream(_chunks(packets, size))
+
+    async def run() -> float:
+        started = time.perf_counter()
+        for _ in range(packets):
+            await stream.read_raw()
+        return packets / (time.perf_counter() - started)
+
+    return asyncio.run(run())
+
+
+def main() -> None:
+    """Run the microbenchmarks for several packet sizes and print their results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--packets", type=int, default=100_000, help="packets per run")
+    args = parser.parse_args()
+    for size in (16, 256, 4096, 65536):
+        packets = max(1, min(args.packets, (256 << 20) // size))
+        print(
+            f"{size:>6} bytes: PacketFramer {bench_framer(packets, size):>12,.0f} packets/s, "
+            + f"PacketStream.read_raw {bench_stream(packets, size):>12,.0f} packets/s"
+        )
+
+
+if __name__ == "__main__":  # pragma: nocover
+    main()
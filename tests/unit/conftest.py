@@ -15,13 +15,44 @@
 
 """Configure unit tests for the `mysql-proxy` charmed operator."""
 
+import subprocess
+from pathlib import Path
+from unittest.mock import MagicMock
+
 import pytest
 from ops import testing
+from pytest_mock import MockerFixture
 
 from charm import MySQLProxyCharm
 
 
 @pytest.fixture(scope="function")
-def mock_charm() -> testing.Context[MySQLProxyCharm]:
-    """Mock `MySQLProxyCharm` context."""
-    return testing.Context(MySQLProxyCharm)
+def mock_charm(tmp_path: Path) -> testing.Context[MySQLProxyCharm]:
+    """Mock `MySQLProxyCharm` context.
+
+    The charm directory is kept across runs of the context, like on a deployed unit,
+    so that the rendered proxy service does not change between events.
+    """
+    charm_root = tmp_path / "charm"
+    charm_root.mkdir()
+    return testing.Context(MySQLProxyCharm, charm_root=charm_root)
+
+
+@pytest.fixture(scope="function")
+def mock_service(mocker: MockerFixture, tmp_path: Path) -> MagicMock:
+    """Redirect proxy service files to a temporary directory and mock `systemctl`.
+
+    Returns:
+        Mock of `subprocess.run` used to invoke `systemctl`.
+    """
+    mocker.patch("proxy.PROXY_SERVICE_FILE", tmp_path / "mysql-proxy.service")
+    mocker.patch("proxy.PROXY_CONFIG_FILE", tmp_path / "proxy.json")
+    mocker.patch("proxy.PROXY_CLIENTS_FILE", tmp_path / "clients.json")
+    mocker.patch("proxy.PROXY_RUNTIME_DIR", tmp_path / "run")
+    mocker.patch("proxy.PROXY_TLS_CERT_FILE", tmp_path / "tls" / "cert.pem")
+    mocker.patch("proxy.PROXY_TLS_KEY_FILE", tmp_path / "tls" / "key.pem")
+    mocker.patch("proxy.PROXY_BACKEND_CA_FILE", tmp_path / "tls" / "backend-ca.pem")
+    return mocker.patch(
+        "proxy.subprocess.run",
+        return_value=subprocess.CompletedProcess(args=[], returncode=0, stdout="", stderr=""),
+    )
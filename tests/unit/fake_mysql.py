@@ -0,0 +1,305 @@
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Fake MySQL server speaking enough of the protocol to exercise the proxy offline.
+
+The server authenticates clients with `mysql_native_password`, answers `COM_QUERY`
+with canned result sets, and acknowledges `COM_PING`, `COM_INIT_DB`, and
+`COM_RESET_CONNECTION`. Responses can be delayed and throttled to emulate a
+remote server.
+"""
+
+import asyncio
+import socket
+import ssl
+import struct
+import time
+from dataclasses import dataclass, field
+
+from proxyd import auth, compression, protocol
+from proxyd.backend import SUPPORTED_CAPABILITIES
+from proxyd.protocol import PacketStream, ProtocolError
+
+MYSQL_TYPE_VAR_STRING = 0xFD
+# Size of the chunks throttled responses are sent in.
+THROTTLE_CHUNK_SIZE = 16 * 1024
+
+
+@dataclass(frozen=True)
+class ResultSet:
+    """Canned text result set returned for a query.
+
+    Attributes:
+        columns: Names of the result set's columns.
+        rows: Rows of the result set. `None` values are sent as `NULL`.
+    """
+
+    columns: list[str]
+    rows: list[tuple[str | None, ...]] = field(default_factory=list)
+
+    def encode(self, deprecate_eof: bool = False) -> list[bytes]:
+        """Encode the payloads of the packets that make up the result set."""
+        eof = struct.pack("<BHH", protocol.EOF_HEADER, 0, protocol.SERVER_STATUS_AUTOCOMMIT)
+        payloads = [protocol.lenenc_int(len(self.columns))]
+        payloads.extend(_column_definition(name) for name in self.columns)
+        if not deprecate_eof:
+            payloads.append(eof)
+        payloads.extend(
+            b"".join(b"\xfb" if value is None else _lenenc_str(value.encode()) for value in row)
+            for row in self.rows
+        )
+        payloads.append(protocol.ok_payload(header=protocol.EOF_HEADER) if deprecate_eof else eof)
+        return payloads
+
+
+class FakeMySQL:
+    """Fake MySQL server listening on a random local port.
+
+    Args:
+        username: Username clients must authenticate as.
+        password: Password clients must authenticate with.
+        compression: Compression algorithm to offer to clients, if any.
+        tls_context: TLS context to offer TLS to clients with, if any.
+        latency: Seconds to wait before responding to each command.
+        bandwidth: Bytes per second responses are sent at. Unlimited if `0`.
+
+    Attributes:
+        reply: Payload sent in response to queries without a canned result set.
+        results: Canned result sets by query statement.
+        logins: Usernames of authenticated clients, in order.
+        commands: Command bytes received from clients, in order.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        password: str,
+        compression: str = "",
+        tls_context: ssl.SSLContext | None = None,
+        latency: float = 0.0,
+        bandwidth: int = 0,
+    ) -> None:
+        self.username = username
+        self.password = password
+        self.compression = compression
+        self.tls_context = tls_context
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.reply = protocol.ok_payload()
+        self.results: dict[bytes, ResultSet] = {}
+        self.logins: list[str] = []
+        self.commands: list[int] = []
+        self._listener: socket.socket | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def endpoint(self) -> str:
+        """Endpoint the server listens on in `host:port` form."""
+        return f"127.0.0.1:{self.port}"
+
+    @property
+    def port(self) -> int:
+        """Port the server listens on."""
+        assert self._listener is not None
+        return self._listener.getsockname()[1]
+
+    async def start(self) -> None:
+        """Start accepting client connections."""
+        self._listener = socket.create_server(("127.0.0.1", 0))
+        self._listener.setblocking(False)
+        self._spawn(self._accept())
+
+    async def stop(self) -> None:
+        """Stop accepting client connections and close every open connection."""
+        assert self._listener is not None
+        self._listener.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _accept(self) -> None:
+        loop = asyncio.get_running_loop()
+        assert self._listener is not None
+        while True:
+            sock, _ = await loop.sock_accept(self._listener)
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._spawn(self._serve(sock))
+
+    async def _serve(self, sock: socket.socket) -> None:
+        with sock:
+            stream = PacketStream(sock)
+            try:
+                if capabilities := await self._authenticate(stream):
+                    await self._reply(stream, capabilities)
+            except (ProtocolError, ConnectionError, ssl.SSLError):
+                pass
+
+    async def _authenticate(self, stream: PacketStream) -> int:
+        """Authenticate a client.
+
+        Returns:
+            The capabilities requested by the client, or `0` if authentication failed.
+        """
+        nonce = auth.generate_nonce()
+        capabilities = SUPPORTED_CAPABILITIES | protocol.HANDSHAKE_CAPABILITIES
+        if self.compression:
+            capabilities |= compression.capability(self.compression)
+        if self.tls_context:
+            capabilities |= protocol.CLIENT_SSL
+        handshake = protocol.Handshake(
+            server_version="8.0.36-fake",
+            connection_id=len(self.logins) + 1,
+            nonce=nonce,
+            capabilities=capabilities,
+            charset=255,
+            status=protocol.SERVER_STATUS_AUTOCOMMIT,
+            auth_plugin=auth.NATIVE_PASSWORD,
+        )
+        await stream.write(handshake.encode())
+        payload = await stream.read()
+        if len(payload) == 32 and self.tls_context:
+            await stream.start_tls(self.tls_context, server_side=True).handshake()
+            payload = await stream.read()
+        response = protocol.HandshakeResponse.decode(payload)
+        if response.username != self.username or not auth.verify(
+            auth.NATIVE_PASSWORD, self.password, nonce, response.auth_response
+        ):
+            await stream.write(protocol.err_payload(1045, "28000", "Access denied"))
+            return 0
+
+        self.logins.append(response.username)
+        await stream.write(protocol.ok_payload())
+        if self.compression and response.capabilities & compression.capability(self.compression):
+            stream.codec = compression.Codec(self.compression)
+        return response.capabilities & capabilities
+
+    async def _reply(self, stream: PacketStream, capabilities: int) -> None:
+        deprecate_eof = bool(capabilities & protocol.CLIENT_DEPRECATE_EOF)
+        while True:
+            payload = await stream.read()
+            command = payload[0]
+            self.commands.append(command)
+            if command == protocol.COM_QUIT:
+                return
+
+            if self.latency:
+                await asyncio.sleep(self.latency)
+
+            if command != protocol.COM_QUERY:
+                payloads = [protocol.ok_payload()]
+            elif result := self.results.get(payload[1:]):
+                payloads = result.encode(deprecate_eof)
+            else:
+                payloads = [self.reply]
+            await self._send(stream, payloads)
+
+    async def _send(self, stream: PacketStream, payloads: list[bytes]) -> None:
+        """Send response packets, throttled to `bandwidth` if set."""
+        data = bytearray()
+        for payload in payloads:
+            data += protocol.packet(payload, seq=stream.seq)
+            stream.seq = (stream.seq + len(payload) // protocol.MAX_PAYLOAD + 1) & 0xFF
+
+        if not self.bandwidth:
+            await stream.send(data)
+            return
+
+        started = time.monotonic()
+        for offset in range(0, len(data), THROTTLE_CHUNK_SIZE):
+            await stream.send(data[offset : offset + THROTTLE_CHUNK_SIZE])
+            ahead = started + (offset + THROTTLE_CHUNK_SIZE) / self.bandwidth - time.monotonic()
+            if ahead > 0:
+                await asyncio.sleep(ahead)
+
+
+async def login(
+    port: int, username: str, password: str, /, address: str = "127.0.0.1", path: str = ""
+) -> tuple[PacketStream, bytes]:
+    """Connect and authenticate a client to the MySQL server or proxy listening on `port`.
+
+    The client connects to the Unix socket at `path` instead, if given.
+
+    Returns:
+        The client's packet stream and the server's final authentication response.
+    """
+    loop = asyncio.get_running_loop()
+    if path:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        await loop.sock_connect(sock, path)
+    else:
+        sock = socket.socket()
+        sock.setblocking(False)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        await loop.sock_connect(sock, (address, port))
+    stream = PacketStream(sock)
+    handshake = protocol.Handshake.decode(await stream.read())
+    response = protocol.HandshakeResponse(
+        capabilities=SUPPORTED_CAPABILITIES,
+        max_packet_size=1 << 24,
+        charset=255,
+        username=username,
+        auth_response=auth.scramble(handshake.auth_plugin, password, handshake.nonce),
+        auth_plugin=handshake.auth_plugin,
+    )
+    await stream.write(response.encode())
+    result = await stream.read()
+    if result == b"\x01" + auth.FAST_AUTH_SUCCESS:
+        result = await stream.read()
+    return stream, result
+
+
+async def query(stream: PacketStream, statement: bytes) -> list[bytes]:
+    """Send a query and read its whole response.
+
+    Clients are expected to have negotiated `CLIENT_DEPRECATE_EOF`, as `login` does.
+
+    Returns:
+        The payloads of every packet of the response.
+    """
+    payloads = [await stream.command(bytes((protocol.COM_QUERY,)) + statement)]
+    if payloads[0][0] in (protocol.OK_HEADER, protocol.ERR_HEADER):
+        return payloads
+
+    count, _ = protocol.read_lenenc_int(payloads[0])
+    for _ in range(count):
+        payloads.append(await stream.read())
+    while True:
+        payloads.append(payload := await stream.read())
+        if payload[0] == protocol.ERR_HEADER or (
+            payload[0] == protocol.EOF_HEADER and len(payload) < 0xFFFFFF
+        ):
+            return payloads
+
+
+def _lenenc_str(value: bytes) -> bytes:
+    return protocol.lenenc_int(len(value)) + value
+
+
+def _column_definition(name: str) -> bytes:
+    """Encode a `ColumnDefinition41` payload for a `VARCHAR` column."""
+    return (
+        _lenenc_str(b"def")
+        + b"".join(_lenenc_str(value) for value in (b"", b"", b"", name.encode(), b""))
+        + b"\x0c"
+        # Charset, column length, type, flags, decimals, and filler.
+        + struct.pack("<HIBHBH", 255, 1024, MYSQL_TYPE_VAR_STRING, 0, 0, 0)
+    )
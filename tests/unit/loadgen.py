@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Drive concurrent MySQL clients against the proxy and report throughput and latency.
+
+Run as a script to benchmark the proxy in-process against `FakeMySQL`, e.g.:
+
+    PYTHONPATH=src:lib python tests/unit/loadgen.py --mode pooled --clients 64
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass, field
+
+from fake_mysql import FakeMySQL, ResultSet, login, query
+
+from proxyd import protocol
+from proxyd.backend import Credentials
+from proxyd.config import PASSTHROUGH, POOLED, ProxyConfig
+from proxyd.pool import BackendPool
+from proxyd.server import ProxyServer
+
+
+@dataclass
+class LoadReport:
+    """Outcome of a load run.
+
+    Attributes:
+        clients: Number of concurrent clients.
+        seconds: Wall-clock duration of the run.
+        latencies: Latency of every successful query, in seconds.
+        errors: Number of queries or logins that failed.
+    """
+
+    clients: int
+    seconds: float = 0.0
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def queries(self) -> int:
+        """Number of successful queries."""
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        """Successful queries per second."""
+        return self.queries / self.seconds if self.seconds else 0.0
+
+    def percentile(self, q: float) -> float:
+        """Get the `q` quantile of query latencies, e.g. `0.99` for p99."""
+        if not self.latencies:
+            return 0.0
+
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def summary(self) -> str:
+        """Render the report as a single human-readable line."""
+        return (
+            f"{self.clients} clients: {self.queries} queries in {self.seconds:.2f}s "
+            + f"({self.throughput:.0f} q/s), {self.errors} errors, latency "
+            + ", ".join(
+                f"p{int(q * 100)} {self.percentile(q) * 1000:.2f}ms" for q in (0.5, 0.9, 0.99)
+            )
+        )
+
+
+async def generate_load(
+    port: int,
+    username: str,
+    password: str,
+    /,
+    clients: int = 10,
+    queries: int = 100,
+    statement: bytes = b"SELECT 1",
+) -> LoadReport:
+    """Run `clients` concurrent clients that each send `queries` queries over one session.
+
+    Args:
+        port: Local port of the MySQL server or proxy to connect to.
+        username: Username to authenticate with.
+        password: Password to authenticate with.
+        clients: Number of concurrent clients.
+        queries: Number of queries each client sends.
+        statement: Statement of the queries.
+    """
+    report = LoadReport(clients=clients)
+
+    async def client() -> None:
+        try:
+            stream, result = await login(port, username, password)
+        except (OSError, protocol.ProtocolError):
+            report.errors += queries
+            return
+
+        with stream.sock:
+            if result[0] != protocol.OK_HEADER:
+                report.errors += queries
+                return
+
+            for _ in range(queries):
+                started = time.perf_counter()
+                response = await query(stream, statement)
+                if response[-1][0] == protocol.ERR_HEADER:
+                    report.errors += 1
+                else:
+                    report.latencies.append(time.perf_counter() - started)
+
+            stream.seq = 0
+            await stream.write(bytes((protocol.COM_QUIT,)))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+async def benchmark(args: argparse.Namespace) -> LoadReport:
+    """Benchmark the proxy in `args.mode`, or `FakeMySQL` itself in `direct` mode."""
+    backend = FakeMySQL("bench", "bench", latency=args.latency, bandwidth=args.bandwidth)
+    backend.results[b"SELECT 1"] = ResultSet(["value"], [("x" * args.row_size,)] * args.rows)
+    await backend.start()
+    server = serving = None
+    port = backend.port
+    if args.mode != "direct":
+        config = ProxyConfig(
+            endpoints=[backend.endpoint],
+            username="bench",
+            password="bench",
+            mode=args.mode,
+            listen_address="127.0.0.1",
+            listen_port=0,
+        )
+        pool = None
+        if args.mode == POOLED:
+            pool = BackendPool(
+                config.endpoints, Credentials("bench", "bench"), max_idle=args.clients
+            )
+        server = ProxyServer(config, pool=pool)
+        port = server.bind().getsockname()[1]
+        serving = asyncio.create_task(server.serve_forever())
+
+    try:
+        return await generate_load(
+            port, "bench", "bench", clients=args.clients, queries=args.queries
+        )
+    finally:
+        if serving:
+            serving.cancel()
+            await asyncio.gather(serving, return_exceptions=True)
+        if server and server.pool:
+            server.pool.close()
+        await backend.stop()
+
+
+def main() -> None:
+    """Run a benchmark and print its report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mode", choices=("direct", PASSTHROUGH, POOLED), default=POOLED)
+    parser.add_argument("--clients", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--queries", type=int, default=500, help="queries per client")
+    parser.add_argument("--rows", type=int, default=1, help="rows per result set")
+    parser.add_argument("--row-size", type=int, default=16, help="bytes per row")
+    parser.add_argument("--latency", type=float, default=0.0, help="backend latency (s)")
+    parser.add_argument("--bandwidth", type=int, default=0, help="backend bytes/s")
+    report = asyncio.run(benchmark(parser.parse_args()))
+    print(report.summary())
+
+
+if __name__ == "__main__":  # pragma: nocover
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon admission control."""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from proxyd.admission import AdmissionController, AdmissionTimeoutError
+from proxyd.clients import UNKNOWN_CLIENT, Client, ClientMap
+from proxyd.config import ProxyConfig
+from proxyd.workers import worker_count, worker_limit
+
+
+def test_fifo_order() -> None:
+    """Test that queued sessions are admitted in arrival order."""
+
+    async def run() -> list[str]:
+        admission = AdmissionController(limit=1)
+        admitted = []
+
+        async def session(name: str) -> None:
+            async with admission.admit("1"):
+                admitted.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(session(name) for name in "abcd"))
+        assert admission.stats.queued_total == 3
+        assert admission.stats.queue_depth == 0
+        assert admission.active == 0
+        return admitted
+
+    assert asyncio.run(run()) == ["a", "b", "c", "d"]
+
+
+def test_relation_limit() -> None:
+    """Test that a relation at its limit does not block sessions of other relations."""
+
+    async def run() -> None:
+        admission = AdmissionController(limit=3, relation_limit=1)
+        await admission.acquire("1")
+        queued = asyncio.create_task(admission.acquire("1"))
+        await asyncio.sleep(0)
+
+        await asyncio.wait_for(admission.acquire("2"), timeout=1)
+        assert admission.active == 2
+        assert not queued.done()
+
+        admission.release("1")
+        await asyncio.wait_for(queued, timeout=1)
+        assert admission.active == 2
+
+    asyncio.run(run())
+
+
+def test_queue_timeout() -> None:
+    """Test that sessions are rejected once their queue timeout expires."""
+
+    async def run() -> AdmissionController:
+        admission = AdmissionController(limit=1, timeout=0.05)
+        await admission.acquire("1")
+        with pytest.raises(AdmissionTimeoutError):
+            await admission.acquire("2")
+
+        # The expired session must not hold on to the next released slot.
+        admission.release("1")
+        await asyncio.wait_for(admission.acquire("2"), timeout=1)
+        return admission
+
+    admission = asyncio.run(run())
+
+    assert admission.active == 1
+    assert admission.stats.queue_depth == 0
+    assert admission.stats.queue_timeouts_total == 1
+    assert admission.stats.queue_wait_seconds_total >= 0.05
+
+
+@pytest.mark.parametrize(
+    "limit,workers,expected",
+    (
+        pytest.param(0, 4, [0, 0, 0, 0], id="unlimited"),
+        pytest.param(100, 4, [25, 25, 25, 25], id="even split"),
+        pytest.param(10, 4, [3, 3, 2, 2], id="remainder"),
+        pytest.param(2, 4, [1, 1, 0, 0], id="limit below workers"),
+    ),
+)
+def test_worker_limit(limit, workers, expected) -> None:
+    """Test that limits are split across worker processes into shares adding up to the limit."""
+    assert [worker_limit(limit, workers, index) for index in range(workers)] == expected
+
+
+@pytest.mark.parametrize(
+    "limits,expected",
+    (
+        pytest.param({}, 16, id="unlimited"),
+        pytest.param({"max_connections": 100}, 16, id="above workers"),
+        pytest.param({"max_relation_connections": 2}, 2, id="relation limit below workers"),
+        pytest.param({"max_connections": 4, "max_relation_connections": 8}, 4, id="both"),
+    ),
+)
+def test_worker_count_limits(limits, expected) -> None:
+    """Test that no more workers run than the connection limits allow."""
+    config = ProxyConfig(endpoints=[], username="", password="", workers=16, **limits)
+    count = worker_count(config)
+    assert count == expected
+    for limit in (config.max_connections, config.max_relation_connections):
+        shares = [worker_limit(limit, count, index) for index in range(count)]
+        assert sum(shares) == limit
+        assert all(shares) or not limit
+
+
+def test_client_map(tmp_path: Path) -> None:
+    """Test that client addresses are mapped to their relation."""
+    path = tmp_path / "clients.json"
+    clients = ClientMap(path)
+    assert not clients.refresh()
+    assert clients.lookup("10.0.0.7") == UNKNOWN_CLIENT
+
+    path.write_text(json.dumps({"10.0.0.7": {"relation": "5", "application": "slurmdbd"}}))
+    assert clients.refresh()
+    assert clients.lookup("10.0.0.7") == Client(relation="5", application="slurmdbd")
+    assert clients.lookup("::ffff:10.0.0.7") == Client(relation="5", application="slurmdbd")
+    assert not clients.refresh()
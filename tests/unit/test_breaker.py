@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon backend circuit breakers."""
+
+import asyncio
+import socket
+import time
+
+import pytest
+
+from proxyd.backend import BackendError, open_socket
+from proxyd.breaker import CLOSED, HALF_OPEN, OPEN, Breakers, CircuitBreaker
+from proxyd.metrics import render
+from proxyd.stats import WorkerStats
+
+
+def _closed_port() -> int:
+    """Get a local port that refuses connections."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_breaker_transitions() -> None:
+    """Test that breakers open after consecutive failures and close after a probe."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    assert breaker.state == CLOSED
+    breaker.failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only a single probe is let through at a time.
+    assert not breaker.allow()
+    breaker.failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_fast_failover() -> None:
+    """Test that endpoints with an open breaker are skipped without connecting."""
+
+    async def run() -> WorkerStats:
+        listener = socket.create_server(("127.0.0.1", 0))
+        dead = f"127.0.0.1:{_closed_port()}"
+        alive = f"127.0.0.1:{listener.getsockname()[1]}"
+        stats = WorkerStats()
+        breakers = Breakers([dead, alive], failure_threshold=2, reset_timeout=60, stats=stats)
+        with listener:
+            for _ in range(5):
+                sock, endpoint = await open_socket(
+                    [dead, alive], timeout=1, stats=stats, breakers=breakers
+                )
+                sock.close()
+                assert endpoint == alive
+
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats.backend_errors_total == 2
+    assert stats.breaker_opens_total == 1
+    assert list(stats.breakers.values()) == [OPEN, CLOSED]
+    assert "mysql_proxy_backend_breaker_open" in render([stats])
+
+
+def test_all_breakers_open() -> None:
+    """Test that connections fail immediately while every breaker is open."""
+
+    async def run() -> None:
+        dead = f"127.0.0.1:{_closed_port()}"
+        breakers = Breakers([dead], failure_threshold=1, reset_timeout=60)
+        with pytest.raises(BackendError):
+            await open_socket([dead], timeout=1, breakers=breakers)
+        with pytest.raises(BackendError, match="circuit breaker open"):
+            await open_socket([dead], timeout=1, breakers=breakers)
+
+    asyncio.run(run())
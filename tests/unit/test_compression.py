@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon backend protocol compression."""
+
+import pytest
+
+from proxyd import compression, protocol
+
+
+def test_codec_roundtrip() -> None:
+    """Test that compressed packets decompress to the original data when split across reads."""
+    sender = compression.Codec(compression.ZLIB, level=9)
+    receiver = compression.Codec(compression.ZLIB)
+    data = protocol.packet(b"\x03" + b"SELECT * FROM job_table WHERE id_job > 0; " * 1024)
+    data += protocol.packet(b"\x0e", seq=0)
+
+    wire = sender.compress(data, command=True)
+    assert wire[3] == 0
+    assert len(wire) < len(data) // 10
+
+    received = b"".join(receiver.decompress(wire[i : i + 100]) for i in range(0, len(wire), 100))
+    assert received == data
+    assert receiver.seq == sender.seq == 1
+    assert sender.stats.compression_payload_bytes_total == len(data)
+    assert sender.stats.compression_wire_bytes_total == len(wire)
+
+
+def test_codec_small_payload() -> None:
+    """Test that small payloads are sent uncompressed and continue the sequence."""
+    codec = compression.Codec(compression.ZLIB)
+    codec.seq = 5
+    wire = codec.compress(protocol.packet(b"\x0e"))
+    assert wire == b"\x05\x00\x00\x05\x00\x00\x00" + protocol.packet(b"\x0e")
+    assert codec.seq == 6
+
+
+def test_codec_large_packet() -> None:
+    """Test that data larger than 16 MiB is split across several compressed packets."""
+    sender = compression.Codec(compression.ZLIB, level=1)
+    receiver = compression.Codec(compression.ZLIB)
+    data = protocol.packet(bytes(protocol.MAX_PAYLOAD + 1))
+
+    wire = sender.compress(data, command=True)
+    assert sender.seq == 2
+    assert receiver.decompress(wire) == data
+
+
+def test_codec_invalid() -> None:
+    """Test that invalid levels and corrupt packets are rejected."""
+    with pytest.raises(ValueError):
+        compression.Codec(compression.ZLIB, level=10)
+
+    codec = compression.Codec(compression.ZLIB)
+    with pytest.raises(protocol.ProtocolError):
+        codec.decompress(b"\x04\x00\x00\x00\x10\x00\x00junk")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon query digests."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+from fake_mysql import FakeMySQL, login
+
+from proxyd import digest, protocol
+from proxyd.backend import Credentials
+from proxyd.config import ProxyConfig
+from proxyd.digest import DigestTable
+from proxyd.pool import BackendPool
+from proxyd.server import ProxyServer
+
+
+@pytest.mark.parametrize(
+    "statement,expected",
+    (
+        pytest.param(
+            b"SELECT * FROM jobs WHERE id = 42 AND user = 'o''brien'",
+            "SELECT * FROM jobs WHERE id = ? AND user = ?",
+            id="literals",
+        ),
+        pytest.param(
+            b"SELECT c1 FROM t1 /* hint */ WHERE f > -1.5e3 -- trailing\n AND h = 0xFF",
+            "SELECT c1 FROM t1 WHERE f > -? AND h = ?",
+            id="comments",
+        ),
+        pytest.param(
+            b"DELETE FROM jobs WHERE id IN (1, 2,3)",
+            "DELETE FROM jobs WHERE id IN (...)",
+            id="in-list",
+        ),
+        pytest.param(
+            b'INSERT INTO t (a, b) VALUES (1, "x"), (2, "y")',
+            "INSERT INTO t (a, b) VALUES (...)",
+            id="multi-row",
+        ),
+        pytest.param(b"SELECT 'truncat", "SELECT ?", id="truncated"),
+    ),
+)
+def test_normalize(statement: bytes, expected: str) -> None:
+    """Test that statements are normalized into digests."""
+    assert digest.normalize(statement) == expected
+
+
+def test_space_saving() -> None:
+    """Test that the table keeps the heaviest digests within its capacity."""
+    table = DigestTable(capacity=8)
+    for i in range(1000):
+        table.record("slurmdbd", b"SELECT * FROM heavy WHERE id = %d" % i, 0.5)
+        table.record("slurmdbd", b"SELECT * FROM light_%d" % i, 0.001)
+
+    assert len(table) == 8
+    top = table.top(1)[0]
+    assert top.digest == "SELECT * FROM heavy WHERE id = ?"
+    assert top.count == 1000
+    assert top.total_seconds == pytest.approx(500)
+    assert 0.25 < top.latency.quantile(0.99) <= 0.5
+
+
+def test_publish_and_collect(tmp_path: Path) -> None:
+    """Test that digests published by several workers are merged."""
+    for worker in range(2):
+        table = DigestTable()
+        table.record("slurmdbd", b"SELECT 1", 0.1, rows=1)
+        table.record("grafana", b"SELECT 2", 0.01 * worker, error=True)
+        table.publish(tmp_path / f"digests-{worker}.json")
+
+    first, second = digest.collect(tmp_path, 5)
+    assert first.summary() == {
+        "application": "slurmdbd",
+        "digest": "SELECT ?",
+        "count": 2,
+        "errors": 0,
+        "total-seconds": 0.2,
+        "p99-seconds": pytest.approx(0.1, rel=0.1),
+        "rows": 2,
+        "bytes": 0,
+        "overestimate-seconds": 0.0,
+    }
+    assert (second.application, second.count, second.errors) == ("grafana", 2, 2)
+    assert digest.collect(tmp_path, 1) == [first]
+
+
+def test_pooled_session_digests() -> None:
+    """Test that pooled sessions record the digests of client queries."""
+
+    async def run() -> DigestTable:
+        backend = FakeMySQL("slurm", "secret")
+        await backend.start()
+        config = ProxyConfig(
+            endpoints=[backend.endpoint],
+            username="slurm",
+            password="secret",
+            mode="pooled",
+            listen_address="127.0.0.1",
+            listen_port=0,
+        )
+        digests = DigestTable()
+        pool = BackendPool(config.endpoints, Credentials(config.username, config.password))
+        server = ProxyServer(config, pool=pool, digests=digests)
+        port = server.bind().getsockname()[1]
+        serving = asyncio.create_task(server.serve_forever())
+        try:
+            client, _ = await login(port, "slurm", "secret")
+            with client.sock:
+                for job in (1, 2):
+                    query = b"UPDATE jobs SET state = 'done' WHERE id = %d" % job
+                    await client.command(bytes((protocol.COM_QUERY,)) + query)
+                await client.command(bytes((protocol.COM_PING,)))
+        finally:
+            serving.cancel()
+            pool.close()
+            await backend.stop()
+        return digests
+
+    (entry,) = asyncio.run(run()).top(10)
+    assert entry.application == "unknown"
+    assert entry.digest == "UPDATE jobs SET state = ? WHERE id = ?"
+    assert entry.count == 2
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon forwarding engines."""
+
+import asyncio
+import os
+import socket
+
+import pytest
+
+from proxyd import forward
+from proxyd.budget import BufferBudget, ConnectionBudget
+
+PAYLOAD = os.urandom(8 * 1024 * 1024 + 17)
+
+
+async def _pump(zero_copy: bool, budget: ConnectionBudget | None = None) -> tuple[int, bytes]:
+    """Forward `PAYLOAD` across a pair of socket pairs and collect what comes out."""
+    loop = asyncio.get_running_loop()
+    client, src = socket.socketpair()
+    dst, backend = socket.socketpair()
+    for sock in (client, src, dst, backend):
+        sock.setblocking(False)
+
+    async def send() -> None:
+        await loop.sock_sendall(client, PAYLOAD)
+        client.shutdown(socket.SHUT_WR)
+
+    async def receive() -> bytes:
+        chunks = []
+        while chunk := await loop.sock_recv(backend, 1 << 16):
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    try:
+        total, _, received = await asyncio.gather(
+            forward.forward(src, dst, zero_copy=zero_copy, budget=budget), send(), receive()
+        )
+    finally:
+        for sock in (client, src, dst, backend):
+            sock.close()
+
+    return total, received
+
+
+@pytest.mark.parametrize(
+    "zero_copy",
+    (
+        pytest.param(True, id="splice"),
+        pytest.param(False, id="copy"),
+    ),
+)
+def test_forward(zero_copy) -> None:
+    """Test that every byte is forwarded and end-of-file is propagated."""
+    if zero_copy and not forward.splice_available():
+        pytest.skip("splice(2) is not available on this platform")
+
+    total, received = asyncio.run(_pump(zero_copy))
+
+    assert total == len(PAYLOAD)
+    assert received == PAYLOAD
+
+
+@pytest.mark.parametrize(
+    "zero_copy",
+    (
+        pytest.param(True, id="splice"),
+        pytest.param(False, id="copy"),
+    ),
+)
+def test_forward_backpressure(zero_copy) -> None:
+    """Test that forwarding pauses and resumes reading around the buffer watermarks."""
+    if zero_copy and not forward.splice_available():
+        pytest.skip("splice(2) is not available on this platform")
+
+    async def run() -> tuple[BufferBudget, list[tuple[int, bytes]]]:
+        budget = BufferBudget(high=1, low=0)
+        return budget, await asyncio.gather(
+            *(_pump(zero_copy, budget.connection()) for _ in range(2))
+        )
+
+    budget, results = asyncio.run(run())
+
+    assert results == [(len(PAYLOAD), PAYLOAD)] * 2
+    assert budget.stats.buffer_pauses_total > 0
+    assert budget.used == budget.stats.buffer_bytes == 0
+    assert not budget.paused
+
+
+@pytest.mark.parametrize(
+    "zero_copy",
+    (
+        pytest.param(True, id="splice"),
+        pytest.param(False, id="copy"),
+    ),
+)
+def test_forward_backlogged_connection(zero_copy) -> None:
+    """Test that a connection keeps forwarding while another one holds the budget."""
+    if zero_copy and not forward.splice_available():
+        pytest.skip("splice(2) is not available on this platform")
+
+    async def run() -> tuple[int, bytes]:
+        budget = BufferBudget(high=forward.PIPE_SIZE, low=0, connection_limit=4096)
+        # A slow client holds a full pipe of data that it does not read.
+        backlogged = budget.connection()
+        backlogged.acquire(forward.PIPE_SIZE + 1)
+        assert backlogged.throttled
+
+        waiter = asyncio.create_task(backlogged.wait())
+        result = await asyncio.wait_for(_pump(zero_copy, budget.connection()), timeout=10)
+        assert budget.paused
+        assert not waiter.done()
+
+        backlogged.release(forward.PIPE_SIZE + 1)
+        await asyncio.wait_for(waiter, timeout=1)
+        return result
+
+    assert asyncio.run(run()) == (len(PAYLOAD), PAYLOAD)
+
+
+def test_buffer_budget() -> None:
+    """Test that the buffer budget pauses above its high watermark until below its low one."""
+
+    async def run() -> None:
+        budget = BufferBudget(high=100, low=50)
+        budget.acquire(80)
+        await asyncio.wait_for(budget.wait(), timeout=1)
+        budget.acquire(40)
+        assert budget.paused
+        assert budget.stats.buffer_paused == 1
+
+        waiter = asyncio.create_task(budget.wait())
+        budget.release(40)
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        budget.release(30)
+        await asyncio.wait_for(waiter, timeout=1)
+        assert budget.stats.buffer_bytes == 50
+        assert budget.stats.buffer_pauses_total == 1
+
+    asyncio.run(run())
+
+
+def test_splice_fallback(mocker) -> None:
+    """Test that `splice_forward` falls back to copying if sockets cannot be spliced."""
+    if not forward.splice_available():
+        pytest.skip("splice(2) is not available on this platform")
+
+    mocker.patch.object(forward, "_splice_available", True)
+    mocker.patch("proxyd.forward.os.splice", side_effect=OSError(22, "Invalid argument"))
+
+    total, received = asyncio.run(_pump(zero_copy=True))
+
+    assert total == len(PAYLOAD)
+    assert received == PAYLOAD
+    assert not forward.splice_available()
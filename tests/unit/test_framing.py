@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon packet framing."""
+
+import os
+import random
+
+import pytest
+from bench_framing import bench_framer, bench_stream
+
+from proxyd import protocol
+from proxyd.framing import PacketFramer
+
+
+def _frame(framer: PacketFramer, data: bytes, chunk: int) -> tuple[bytes, list[tuple[int, bytes]]]:
+    """Feed `data` to `framer` in chunks of at most `chunk` bytes.
+
+    Returns:
+        Every fragment handed out joined together, and the command and prefix
+        of every packet.
+    """
+    fragments = bytearray()
+    packets = []
+    offset = 0
+    while offset < len(data):
+        free = framer.free()
+        nbytes = min(len(free), chunk, len(data) - offset)
+        free[:nbytes] = data[offset : offset + nbytes]
+        framer.commit(nbytes)
+        offset += nbytes
+        while (fragment := framer.next()) is not None:
+            if framer.first:
+                packets.append((framer.command, bytes(framer.prefix)))
+            fragments += fragment
+
+    assert framer.buffered == 0
+    return bytes(fragments), packets
+
+
+@pytest.mark.parametrize("chunk", (1, 3, 7, 64, 1000))
+def test_split_reads(chunk: int) -> None:
+    """Test that packets split across reads and wrapping around the buffer are framed."""
+    rng = random.Random(chunk)
+    payloads = [
+        bytes((protocol.COM_QUERY,)) + rng.randbytes(rng.randrange(40)) for _ in range(200)
+    ]
+    payloads.append(b"")
+    data = b"".join(protocol.packet(payload) for payload in payloads)
+
+    fragments, packets = _frame(PacketFramer(capacity=64, prefix_size=8), data, chunk)
+
+    assert fragments == data
+    assert packets == [(payload[0] if payload else -1, payload[:8]) for payload in payloads]
+
+
+def test_continuation_packets() -> None:
+    """Test that 16 MiB packets and their continuations are forwarded without buffering."""
+    payload = bytes((protocol.COM_QUERY,)) + os.urandom(protocol.MAX_PAYLOAD + 100)
+    data = protocol.packet(payload) + protocol.packet(bytes((protocol.COM_PING,)))
+    framer = PacketFramer()
+
+    fragments, packets = _frame(framer, data, 64 * 1024)
+
+    assert fragments == data
+    assert packets == [
+        (protocol.COM_QUERY, payload[: framer.prefix_size]),
+        (protocol.COM_PING, bytes((protocol.COM_PING,))),
+    ]
+
+
+def test_small_buffer() -> None:
+    """Test that buffers too small to hold a prefix are rejected."""
+    with pytest.raises(ValueError):
+        PacketFramer(capacity=16, prefix_size=16)
+
+
+def test_benchmarks() -> None:
+    """Test that the framing microbenchmarks run."""
+    assert bench_framer(1000, 64) > 0
+    assert bench_stream(1000, 64) > 0
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the fake MySQL server and load generator used to exercise the proxy."""
+
+import argparse
+import asyncio
+import time
+
+import pytest
+from fake_mysql import FakeMySQL, ResultSet, login, query
+from loadgen import benchmark, generate_load
+
+from proxyd import protocol
+
+
+def test_fake_mysql() -> None:
+    """Test that the fake server answers pings and queries with canned result sets."""
+
+    async def run() -> None:
+        backend = FakeMySQL("slurm", "secret", latency=0.05)
+        backend.results[b"SELECT name FROM users"] = ResultSet(["name"], [("alice",), (None,)])
+        await backend.start()
+        try:
+            client, result = await login(backend.port, "slurm", "secret")
+            with client.sock:
+                assert result[0] == protocol.OK_HEADER
+                assert (await client.command(bytes((protocol.COM_PING,))))[0] == 0
+
+                started = time.monotonic()
+                response = await query(client, b"SELECT name FROM users")
+                assert time.monotonic() - started >= 0.05
+                # Column count, column definition, two rows, and the terminating OK packet.
+                assert len(response) == 5
+                assert response[2] == b"\x05alice"
+                assert response[3] == b"\xfb"
+                assert response[4][0] == protocol.EOF_HEADER
+        finally:
+            await backend.stop()
+
+        assert backend.commands == [protocol.COM_PING, protocol.COM_QUERY]
+
+    asyncio.run(run())
+
+
+def test_fake_mysql_bandwidth() -> None:
+    """Test that the fake server throttles responses to its bandwidth."""
+
+    async def run() -> float:
+        backend = FakeMySQL("slurm", "secret", bandwidth=1 << 20)
+        backend.results[b"SELECT 1"] = ResultSet(["value"], [("x" * 1000,)] * 256)
+        await backend.start()
+        try:
+            client, _ = await login(backend.port, "slurm", "secret")
+            with client.sock:
+                started = time.monotonic()
+                await query(client, b"SELECT 1")
+                return time.monotonic() - started
+        finally:
+            await backend.stop()
+
+    assert asyncio.run(run()) >= 0.2
+
+
+@pytest.mark.parametrize(
+    "mode",
+    (
+        pytest.param("direct", id="direct"),
+        pytest.param("passthrough", id="passthrough"),
+        pytest.param("pooled", id="pooled"),
+    ),
+)
+def test_load(mode: str) -> None:
+    """Test that the load generator reports every query sent through the proxy."""
+    args = argparse.Namespace(
+        mode=mode, clients=8, queries=20, rows=10, row_size=100, latency=0.0, bandwidth=0
+    )
+    report = asyncio.run(benchmark(args))
+
+    assert report.errors == 0
+    assert report.queries == 160
+    assert report.throughput > 0
+    assert 0 < report.percentile(0.5) <= report.percentile(0.99)
+    assert "160 queries" in report.summary()
+
+
+def test_load_access_denied() -> None:
+    """Test that failed logins are reported as errors."""
+
+    async def run():
+        backend = FakeMySQL("slurm", "secret")
+        await backend.start()
+        try:
+            return await generate_load(backend.port, "slurm", "guess", clients=2, queries=5)
+        finally:
+            await backend.stop()
+
+    report = asyncio.run(run())
+    assert report.errors == 10
+    assert report.queries == 0
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon Prometheus metrics."""
+
+import asyncio
+import json
+from pathlib import Path
+
+from fake_mysql import FakeMySQL, login
+
+from proxyd import protocol
+from proxyd.backend import Credentials
+from proxyd.clients import Client, ClientMap
+from proxyd.config import ProxyConfig
+from proxyd.metrics import MetricsServer, render
+from proxyd.pool import BackendPool
+from proxyd.server import ProxyServer
+from proxyd.stats import WorkerStats, collect
+
+SLURMDBD = Client(relation="5", application="slurmdbd")
+
+
+def test_render() -> None:
+    """Test that worker statistics are summed and relation statistics are labelled."""
+    first, second = WorkerStats(worker=0), WorkerStats(worker=1)
+    first.connections_total, second.connections_total = 3, 4
+    first.relation(SLURMDBD).command("COM_QUERY", 0.003)
+    second.relation(SLURMDBD).command("COM_QUERY", 20.0, error=True)
+    second.relation(SLURMDBD).bytes_in_total = 42
+
+    metrics = render([first, second]).splitlines()
+
+    assert "# TYPE mysql_proxy_connections_total counter" in metrics
+    assert "mysql_proxy_connections_total 7" in metrics
+    assert "mysql_proxy_workers 2" in metrics
+    labels = 'relation="5",application="slurmdbd"'
+    assert f"mysql_proxy_relation_bytes_in_total{{{labels}}} 42" in metrics
+    histogram = f'mysql_proxy_command_duration_seconds_bucket{{{labels},command="COM_QUERY"'
+    assert f'{histogram},le="0.0025"}} 0' in metrics
+    assert f'{histogram},le="0.005"}} 1' in metrics
+    assert f'{histogram},le="10.0"}} 1' in metrics
+    assert f'{histogram},le="+Inf"}} 2' in metrics
+    assert f'mysql_proxy_command_errors_total{{{labels},command="COM_QUERY"}} 1' in metrics
+
+
+def test_publish_and_collect(tmp_path: Path) -> None:
+    """Test that published relation statistics are collected intact."""
+    stats = WorkerStats(worker=3)
+    stats.relation(SLURMDBD).command("COM_STMT_EXECUTE", 0.1)
+    stats.relation(SLURMDBD).backend_connect_seconds.observe(0.01)
+    stats.publish(tmp_path)
+
+    assert collect(tmp_path) == [stats]
+
+
+def test_scrapes_across_workers(tmp_path: Path) -> None:
+    """Test that summed counters never go down when scrapes land on different workers."""
+    first, second = WorkerStats(worker=0), WorkerStats(worker=1)
+    servers = [
+        MetricsServer(stats, tmp_path, address="127.0.0.1", port=0) for stats in (first, second)
+    ]
+    first.publish(tmp_path)
+    second.publish(tmp_path)
+
+    scraped = []
+    for _ in range(5):
+        first.connections_total += 3
+        second.connections_total += 1
+        for server in servers:
+            metrics = render(server.workers()).splitlines()
+            total = next(m for m in metrics if m.startswith("mysql_proxy_connections_total "))
+            scraped.append(int(total.split()[1]))
+
+    assert scraped == sorted(scraped)
+    assert scraped[-1] == 20
+
+
+def test_metrics_endpoint(tmp_path: Path) -> None:
+    """Test that the metrics endpoint serves command latencies of pooled sessions."""
+    clients_file = tmp_path / "clients.json"
+    clients_file.write_text(
+        json.dumps({"127.0.0.1": {"relation": "5", "application": "slurmdbd"}})
+    )
+
+    async def run() -> tuple[bytes, bytes]:
+        backend = FakeMySQL("slurm", "secret")
+        await backend.start()
+        config = ProxyConfig(
+            endpoints=[backend.endpoint],
+            username="slurm",
+            password="secret",
+            mode="pooled",
+            listen_address="127.0.0.1",
+            listen_port=0,
+        )
+        clients = ClientMap(clients_file)
+        clients.refresh()
+        pool = BackendPool(config.endpoints, Credentials(config.username, config.password))
+        server = ProxyServer(config, stats=pool.stats, clients=clients, pool=pool)
+        port = server.bind().getsockname()[1]
+        metrics = MetricsServer(pool.stats, tmp_path, address="127.0.0.1", port=0)
+        metrics_port = metrics.bind().getsockname()[1]
+        tasks = [
+            asyncio.create_task(server.serve_forever()),
+            asyncio.create_task(metrics.serve_forever()),
+        ]
+        try:
+            client, _ = await login(port, "slurm", "secret")
+            with client.sock:
+                await client.command(bytes((protocol.COM_QUERY,)) + b"SELECT 1")
+
+            responses = []
+            for target in (b"/metrics", b"/"):
+                reader, writer = await asyncio.open_connection("127.0.0.1", metrics_port)
+                writer.write(b"GET " + target + b" HTTP/1.1\r\nHost: localhost\r\n\r\n")
+                responses.append(await reader.read())
+                writer.close()
+            return responses[0], responses[1]
+        finally:
+            for task in tasks:
+                task.cancel()
+            pool.close()
+            await backend.stop()
+
+    found, not_found = asyncio.run(run())
+
+    assert found.startswith(b"HTTP/1.1 200 OK\r\n")
+    body = found.split(b"\r\n\r\n", 1)[1].decode().splitlines()
+    labels = 'relation="5",application="slurmdbd"'
+    assert f'mysql_proxy_command_duration_seconds_count{{{labels},command="COM_QUERY"}} 1' in body
+    assert f"mysql_proxy_backend_connect_seconds_count{{{labels}}} 1" in body
+    assert "mysql_proxy_pool_misses_total 1" in body
+    assert not_found.startswith(b"HTTP/1.1 404 Not Found\r\n")
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon backend connection pool."""
+
+import asyncio
+import socket
+import struct
+from dataclasses import replace
+
+import pytest
+from fake_mysql import FakeMySQL, login
+
+from proxyd import auth, compression, protocol
+from proxyd.backend import SUPPORTED_CAPABILITIES, BackendError, Credentials
+from proxyd.config import ProxyConfig
+from proxyd.pool import BackendPool
+from proxyd.server import ProxyServer
+from proxyd.tracker import PacketScanner, ResponseTracker
+
+
+def test_scramble() -> None:
+    """Test that scrambled passwords only verify against the right password."""
+    nonce = auth.generate_nonce()
+    for plugin in auth.SUPPORTED_PLUGINS:
+        response = auth.scramble(plugin, "secret", nonce)
+        assert auth.verify(plugin, "secret", nonce, response)
+        assert not auth.verify(plugin, "guess", nonce, response)
+    assert auth.scramble(auth.NATIVE_PASSWORD, "", nonce) == b""
+
+
+def test_packet_split() -> None:
+    """Test that payloads of 16 MiB or more are split across several packets."""
+    data = protocol.packet(bytes(protocol.MAX_PAYLOAD), seq=3)
+    assert len(data) == protocol.MAX_PAYLOAD + 8
+    assert data[3] == 3
+    assert data[-4:] == b"\x00\x00\x00\x04"
+
+
+def test_handshake_response_roundtrip() -> None:
+    """Test that encoded handshake responses decode to the same values."""
+    response = protocol.HandshakeResponse(
+        capabilities=SUPPORTED_CAPABILITIES | protocol.CLIENT_CONNECT_WITH_DB,
+        max_packet_size=1 << 24,
+        charset=45,
+        username="slurm",
+        auth_response=bytes(range(20)),
+        database="slurm_acct_db",
+        auth_plugin=auth.NATIVE_PASSWORD,
+    )
+    assert protocol.HandshakeResponse.decode(response.encode()) == response
+
+
+def test_response_tracker() -> None:
+    """Test that the tracker follows a text result set split across reads."""
+    tracker = ResponseTracker(protocol.CLIENT_DEPRECATE_EOF)
+    scanner = PacketScanner(tracker.packet)
+    tracker.command(bytes((protocol.COM_QUERY,)))
+    data = b"".join(
+        (
+            protocol.packet(b"\x01", seq=1),  # Column count.
+            protocol.packet(b"\x03def" + bytes(20), seq=2),  # Column definition.
+            protocol.packet(b"\x011", seq=3),  # Row.
+            protocol.packet(b"\x012", seq=4),  # Row.
+            protocol.packet(protocol.ok_payload(header=protocol.EOF_HEADER), seq=5),
+        )
+    )
+    for offset in range(0, len(data), 3):
+        assert not tracker.idle
+        scanner.feed(data[offset : offset + 3])
+    assert tracker.idle
+
+
+def test_pool_prime_and_rotate() -> None:
+    """Test that the pool primes idle connections and swaps them after a rotation."""
+
+    async def run() -> None:
+        backend = FakeMySQL("slurm", "old")
+        await backend.start()
+        pool = BackendPool([backend.endpoint], Credentials("slurm", "old"), min_size=2)
+        maintenance = asyncio.create_task(pool.maintain())
+        try:
+            async with asyncio.timeout(5):
+                while pool.idle < 2:
+                    await asyncio.sleep(0.01)
+
+            connection = await pool.acquire()
+            assert pool.stats.pool_hits_total == 1
+            await pool.release(connection)
+            assert pool.idle == 2
+            assert protocol.COM_RESET_CONNECTION in backend.commands
+
+            backend.password = "new"
+            pool.rotate(Credentials("slurm", "new"))
+            async with asyncio.timeout(5):
+                while any(c.credentials.generation == 0 for cs in pool._idle.values() for c in cs):
+                    await asyncio.sleep(0.01)
+            assert pool.idle == 2
+            assert pool.stats.backend_connects_total == 4
+        finally:
+            maintenance.cancel()
+            pool.close()
+            await backend.stop()
+
+    asyncio.run(run())
+
+
+def test_pool_max_size() -> None:
+    """Test that idle connections count against the pool's maximum size."""
+
+    async def run() -> None:
+        backend = FakeMySQL("slurm", "secret")
+        await backend.start()
+        pool = BackendPool(
+            [backend.endpoint], Credentials("slurm", "secret"), min_size=4, max_size=2
+        )
+        try:
+            await pool.prime()
+            assert pool.idle == 2
+
+            first = await pool.acquire()
+            second = await pool.acquire()
+            assert pool.idle == 0
+            await pool.release(first)
+            await pool.release(second)
+            assert pool.idle == 2
+
+            # Connecting for another profile closes an idle connection to make room.
+            first = await pool.acquire()
+            pool._idle[first.profile][0].last_used = 0
+            other = await pool.acquire(replace(first.profile, charset=8))
+            assert pool.idle == 0
+            assert pool.stats.backend_connects_total == 3
+            await pool.release(other)
+            await pool.release(first)
+            assert pool.idle == 2
+        finally:
+            pool.close()
+            await backend.stop()
+
+    asyncio.run(run())
+
+
+def test_pool_failover() -> None:
+    """Test that the pool connects to the next endpoint if the first one is down."""
+
+    async def run() -> None:
+        backend = FakeMySQL("slurm", "secret")
+        await backend.start()
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            down = "127.0.0.1:{}".format(unused.getsockname()[1])
+
+        pool = BackendPool([down, backend.endpoint], Credentials("slurm", "secret"), min_size=1)
+        try:
+            await pool.prime()
+            assert pool.endpoint == backend.endpoint
+            assert pool.stats.backend_errors_total == 1
+        finally:
+            pool.close()
+            await backend.stop()
+
+        with pytest.raises(BackendError):
+            await BackendPool([down], Credentials("slurm", "secret")).acquire()
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "password,algorithm",
+    (
+        pytest.param("secret", "", id="authenticated"),
+        pytest.param("secret", compression.ZLIB, id="compressed"),
+        pytest.param("guess", "", id="access-denied"),
+    ),
+)
+def test_pooled_session(password: str, algorithm: str) -> None:
+    """Test that pooled sessions authenticate clients and reuse backend connections."""
+    ok = password == "secret"
+    info = b"Rows matched: 1  Changed: 1  Warnings: 0 " * 256
+
+    async def run() -> None:
+        backend = FakeMySQL("slurm", "secret", compression=algorithm)
+        backend.reply = protocol.ok_payload() + info
+        await backend.start()
+        config = ProxyConfig(
+            endpoints=[backend.endpoint],
+            username="slurm",
+            password="secret",
+            mode="pooled",
+            listen_address="127.0.0.1",
+            listen_port=0,
+            compression=algorithm,
+        )
+        pool = BackendPool(
+            config.endpoints,
+            Credentials(config.username, config.password),
+            compression_algorithm=config.compression,
+        )
+        server = ProxyServer(config, pool=pool)
+        port = server.bind().getsockname()[1]
+        serving = asyncio.create_task(server.serve_forever())
+        try:
+            for _ in range(2):
+                client, result = await login(port, "slurm", password)
+                with client.sock:
+                    if not ok:
+                        assert result[0] == protocol.ERR_HEADER
+                        assert struct.unpack("<H", result[1:3])[0] == 1045
+                        break
+
+                    assert result[0] == protocol.OK_HEADER
+                    reply = await client.command(bytes((protocol.COM_QUERY,)) + b"UPDATE t")
+                    assert reply == backend.reply
+                    client.seq = 0
+                    await client.write(bytes((protocol.COM_QUIT,)))
+                    with pytest.raises(ConnectionError):
+                        await client.read()
+
+                async with asyncio.timeout(5):
+                    while pool.idle < 1:
+                        await asyncio.sleep(0.01)
+        finally:
+            serving.cancel()
+            pool.close()
+            await backend.stop()
+
+        stats = pool.stats
+        if not ok:
+            assert backend.logins == []
+            return
+
+        assert backend.logins == ["slurm"]
+        assert stats.pool_hits_total == 1
+        assert stats.pool_misses_total == 1
+        if algorithm:
+            assert stats.compression_payload_bytes_total > 10 * stats.compression_wire_bytes_total
+        else:
+            assert stats.compression_wire_bytes_total == 0
+
+    asyncio.run(run())
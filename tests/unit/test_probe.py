@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon backend probes."""
+
+import asyncio
+import socket
+import time
+
+from fake_mysql import FakeMySQL, ResultSet
+
+from proxyd import probe
+from proxyd.backend import Credentials
+from proxyd.probe import ProbeResult
+
+
+def _closed_endpoint() -> str:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def test_probe() -> None:
+    """Test that probes report the reachability, latency, role, and version of endpoints."""
+
+    async def run() -> list[ProbeResult]:
+        primary = FakeMySQL("testuser", "testpassword")
+        replica = FakeMySQL("testuser", "testpassword")
+        for server, read_only in ((primary, "0"), (replica, "1")):
+            server.results[b"SELECT @@global.read_only"] = ResultSet(
+                ["@@global.read_only"], [(read_only,)]
+            )
+            await server.start()
+        try:
+            return await probe.probe_all(
+                [primary.endpoint, replica.endpoint, _closed_endpoint()],
+                Credentials("testuser", "testpassword"),
+                timeout=1.0,
+            )
+        finally:
+            await primary.stop()
+            await replica.stop()
+
+    primary, replica, closed = asyncio.run(run())
+
+    assert primary.reachable and primary.role == probe.PRIMARY
+    assert primary.version == "8.0.36-fake"
+    assert 0 < primary.rtt < 1
+    assert replica.reachable and replica.role == probe.REPLICA
+    assert not closed.reachable
+    assert closed.role == closed.version == ""
+
+
+def test_probe_wrong_password() -> None:
+    """Test that endpoints the proxy cannot authenticate to are reported unreachable."""
+
+    async def run() -> ProbeResult:
+        server = FakeMySQL("testuser", "testpassword")
+        await server.start()
+        try:
+            return await probe.probe(server.endpoint, Credentials("testuser", "guess"))
+        finally:
+            await server.stop()
+
+    assert not asyncio.run(run()).reachable
+
+
+def test_merge_and_order() -> None:
+    """Test that the newest fresh results order endpoints by reachability and role."""
+    now = time.time()
+    results = probe.merge(
+        [
+            ProbeResult("a:3306", reachable=True, timestamp=now - 60, role=probe.PRIMARY),
+            ProbeResult("a:3306", reachable=False, timestamp=now - 10),
+            ProbeResult("b:3306", reachable=True, timestamp=now - 10, role=probe.REPLICA),
+            ProbeResult("c:3306", reachable=True, timestamp=now - 10, role=probe.PRIMARY),
+            ProbeResult("d:3306", reachable=False, timestamp=now - 3600),
+        ],
+        max_age=900,
+    )
+
+    assert sorted(results) == ["a:3306", "b:3306", "c:3306"]
+    assert not results["a:3306"].reachable
+    assert probe.order(["a:3306", "b:3306", "c:3306", "d:3306"], results) == [
+        "c:3306",
+        "b:3306",
+        "d:3306",
+        "a:3306",
+    ]
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon server and worker processes."""
+
+import asyncio
+import json
+import os
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from proxyd import stats
+from proxyd.clients import ClientMap
+from proxyd.config import ProxyConfig
+from proxyd.server import ProxyServer
+from proxyd.workers import Worker, worker_count
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    while data := await reader.read(65536):
+        writer.write(data)
+        await writer.drain()
+    writer.close()
+
+
+@pytest.mark.parametrize(
+    "zero_copy",
+    (
+        pytest.param(True, id="splice"),
+        pytest.param(False, id="copy"),
+    ),
+)
+def test_proxy_server(zero_copy) -> None:
+    """Test that client connections are proxied to the first reachable endpoint."""
+
+    async def run() -> ProxyServer:
+        backend = await asyncio.start_server(_echo, "127.0.0.1", 0)
+        backend_port = backend.sockets[0].getsockname()[1]
+        config = ProxyConfig(
+            endpoints=[f"127.0.0.1:{_free_port()}", f"127.0.0.1:{backend_port}"],
+            username="testuser",
+            password="testpassword",
+            listen_address="127.0.0.1",
+            listen_port=0,
+            zero_copy=zero_copy,
+        )
+        server = ProxyServer(config)
+        listener = server.bind()
+        serving = asyncio.create_task(server.serve_forever())
+
+        reader, writer = await asyncio.open_connection(*listener.getsockname())
+        writer.write(b"ping" * 1024)
+        writer.write_eof()
+        assert await reader.read() == b"ping" * 1024
+        writer.close()
+
+        await asyncio.sleep(0.1)
+        serving.cancel()
+        backend.close()
+        return server
+
+    server = asyncio.run(run())
+
+    assert server.stats.connections_total == 1
+    assert server.stats.connections_active == 0
+    assert server.stats.backend_errors_total == 1
+    assert server.stats.bytes_in_total == server.stats.bytes_out_total == 4096
+
+
+def test_unix_socket(tmp_path: Path) -> None:
+    """Test that client connections are also accepted on the configured Unix socket."""
+    clients_file = tmp_path / "clients.json"
+    clients_file.write_text(json.dumps({"unix": {"relation": "5", "application": "slurmdbd"}}))
+
+    async def run() -> ProxyServer:
+        backend = await asyncio.start_server(_echo, "127.0.0.1", 0)
+        backend_port = backend.sockets[0].getsockname()[1]
+        config = ProxyConfig(
+            endpoints=[f"127.0.0.1:{backend_port}"],
+            username="testuser",
+            password="testpassword",
+            listen_address="127.0.0.1",
+            listen_port=0,
+            unix_socket=str(tmp_path / "mysql.sock"),
+        )
+        server = ProxyServer(config, clients=ClientMap(clients_file))
+        server.clients.refresh()
+        serving = asyncio.create_task(server.serve_forever())
+        await asyncio.sleep(0.1)
+
+        reader, writer = await asyncio.open_unix_connection(config.unix_socket)
+        writer.write(b"ping" * 1024)
+        writer.write_eof()
+        assert await reader.read() == b"ping" * 1024
+        writer.close()
+
+        await asyncio.sleep(0.1)
+        serving.cancel()
+        backend.close()
+        return server
+
+    server = asyncio.run(run())
+
+    assert stat.S_IMODE((tmp_path / "mysql.sock").stat().st_mode) == 0o666
+    assert server.stats.connections_total == 1
+    assert server.stats.relations["5"].bytes_in_total == 4096
+
+
+def test_reuse_port() -> None:
+    """Test that several proxy servers can listen on the same port."""
+    config = ProxyConfig(
+        endpoints=["127.0.0.1:3306"],
+        username="testuser",
+        password="testpassword",
+        listen_address="127.0.0.1",
+        listen_port=_free_port(),
+    )
+    first, second = ProxyServer(config).bind(), ProxyServer(config).bind()
+    with first, second:
+        assert first.getsockname() == second.getsockname()
+
+
+def test_worker_count() -> None:
+    """Test that one worker per CPU core is run by default."""
+    config = ProxyConfig(endpoints=[], username="", password="")
+    assert worker_count(config) == (os.cpu_count() or 1)
+    assert worker_count(ProxyConfig(endpoints=[], username="", password="", workers=3)) == 3
+
+
+def test_supervisor(tmp_path: Path) -> None:
+    """Test that the daemon runs and stops the configured number of workers."""
+    config = ProxyConfig(
+        endpoints=["127.0.0.1:3306"],
+        username="testuser",
+        password="testpassword",
+        listen_address="127.0.0.1",
+        listen_port=_free_port(),
+        workers=2,
+        runtime_dir=str(tmp_path / "run"),
+        unix_socket=str(tmp_path / "mysql.sock"),
+    )
+    config_file = tmp_path / "proxy.json"
+    config_file.write_text(config.to_json())
+
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "proxyd", "--config", str(config_file)],
+        env={**os.environ, "PYTHONPATH": str(Path(stats.__file__).parents[1])},
+    )
+    try:
+        deadline = time.monotonic() + 10
+        while len(workers := stats.collect(tmp_path / "run")) < 2:
+            assert time.monotonic() < deadline, "workers did not publish statistics"
+            time.sleep(0.1)
+
+        assert sorted(worker.worker for worker in workers) == [0, 1]
+        assert len({worker.pid for worker in workers}) == 2
+        assert stat.S_ISSOCK((tmp_path / "mysql.sock").stat().st_mode)
+
+        config_file.write_text(replace(config, password="rotated").to_json())
+        daemon.send_signal(signal.SIGHUP)
+        while sum(worker.reloads_total for worker in stats.collect(tmp_path / "run")) < 2:
+            assert time.monotonic() < deadline + 10, "workers did not reload"
+            time.sleep(0.1)
+        assert daemon.poll() is None
+    finally:
+        daemon.send_signal(signal.SIGTERM)
+        assert daemon.wait(timeout=10) == 0
+
+    assert stats.collect(tmp_path / "run") == []
+
+
+def test_worker_reload() -> None:
+    """Test that workers apply new credentials and endpoints in place."""
+    config = ProxyConfig(
+        endpoints=["127.0.0.1:3306"],
+        username="testuser",
+        password="testpassword",
+        mode="pooled",
+        listen_port=6033,
+    )
+    worker = Worker(config)
+    assert worker.pool
+    worker.reload(
+        replace(config, endpoints=["127.0.0.2:3306"], password="rotated", listen_port=6034)
+    )
+
+    assert worker.server.config == worker.config
+    assert worker.config.endpoints == worker.pool.endpoints == ["127.0.0.2:3306"]
+    assert worker.config.listen_port == 6033
+    assert worker.pool.credentials.password == "rotated"
+    assert worker.pool.credentials.generation == 1
+    assert worker.stats.breakers == {"127.0.0.2:3306": "closed"}
+    assert worker.stats.reloads_total == 1
+
+    worker.reload(worker.config)
+    assert worker.stats.reloads_total == 1
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon slow query log."""
+
+import asyncio
+import os
+import random
+from pathlib import Path
+
+import pytest
+from fake_mysql import FakeMySQL, login
+
+from proxyd import protocol
+from proxyd.backend import Credentials
+from proxyd.config import ProxyConfig
+from proxyd.pool import BackendPool
+from proxyd.server import ProxyServer
+from proxyd.slowlog import SlowQueryLog
+
+
+def test_threshold_and_sampling(tmp_path: Path) -> None:
+    """Test that only sampled queries above the threshold are logged."""
+    random.seed(0)
+    log = SlowQueryLog(tmp_path / "slow.log", threshold=0.5, sample_rate=0.25)
+    for _ in range(1000):
+        log.record(b"SELECT SLEEP(1)", 1.0, application="slurmdbd")
+        log.record(b"SELECT 1", 0.1, application="slurmdbd")
+
+    assert 200 < log.stats.slow_queries_total < 300
+    asyncio.run(log.flush())
+    assert (tmp_path / "slow.log").read_text().count("SELECT 1;") == 0
+
+
+def test_format_and_rotation(tmp_path: Path) -> None:
+    """Test that entries are written in the MySQL slow log format and the log is rotated."""
+    path = tmp_path / "slow.log"
+    log = SlowQueryLog(path, threshold=0.0, max_bytes=1024, backups=2)
+
+    async def run() -> None:
+        for rows in range(14):
+            log.record(
+                b"UPDATE jobs SET state = 'done'",
+                1.5,
+                application="slurmdbd",
+                relation="5",
+                address="10.0.0.7",
+                rows=rows,
+            )
+            await log.flush()
+
+    asyncio.run(run())
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["slow.log", "slow.log.1", "slow.log.2"]
+    assert {p.stat().st_mode & 0o777 for p in tmp_path.iterdir()} == {0o640}
+    entry = (tmp_path / "slow.log.1").read_text().split("# Time: ")[1]
+    lines = entry.splitlines()
+    assert lines[1] == "# User@Host: slurmdbd[slurmdbd] @  [10.0.0.7]"
+    assert lines[2] == "# Application: slurmdbd  Relation: 5  Error: no"
+    assert lines[3].startswith("# Query_time: 1.500000  Lock_time: 0.000000  Rows_sent: ")
+    assert lines[4].startswith("SET timestamp=")
+    assert lines[5] == "UPDATE jobs SET state = 'done';"
+
+
+def test_permissions(tmp_path: Path) -> None:
+    """Test that the log is only readable by its owner and group, even if created earlier."""
+    path = tmp_path / "logs" / "slow.log"
+    log = SlowQueryLog(path, threshold=0.0)
+
+    async def run() -> None:
+        task = asyncio.create_task(log.run(interval=0.01))
+        log.record(b"SELECT 'secret'", 1.5)
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    umask = os.umask(0o022)
+    try:
+        asyncio.run(run())
+        assert path.parent.stat().st_mode & 0o777 == 0o750
+        assert path.stat().st_mode & 0o777 == 0o640
+
+        path.chmod(0o644)
+        log.record(b"SELECT 'secret'", 1.5)
+        asyncio.run(log.flush())
+    finally:
+        os.umask(umask)
+
+    assert path.stat().st_mode & 0o777 == 0o640
+    assert path.read_text().count("SELECT 'secret';") == 2
+
+
+@pytest.mark.parametrize("unix", (pytest.param(False, id="tcp"), pytest.param(True, id="unix")))
+def test_pooled_session_slow_log(tmp_path: Path, unix) -> None:
+    """Test that pooled sessions log slow queries with their client's address."""
+    path = tmp_path / "slow.log"
+    unix_socket = str(tmp_path / "mysql.sock") if unix else ""
+
+    async def run() -> None:
+        backend = FakeMySQL("slurm", "secret")
+        await backend.start()
+        config = ProxyConfig(
+            endpoints=[backend.endpoint],
+            username="slurm",
+            password="secret",
+            mode="pooled",
+            listen_address="127.0.0.1",
+            listen_port=0,
+            unix_socket=unix_socket,
+        )
+        pool = BackendPool(config.endpoints, Credentials(config.username, config.password))
+        log = SlowQueryLog(path, threshold=0.0, stats=pool.stats)
+        server = ProxyServer(config, pool=pool, slow_log=log)
+        port = server.bind().getsockname()[1]
+        tasks = [asyncio.create_task(server.serve_forever()), asyncio.create_task(log.run())]
+        try:
+            await asyncio.sleep(0.1)
+            client, _ = await login(port, "slurm", "secret", path=unix_socket)
+            with client.sock:
+                await client.command(bytes((protocol.COM_QUERY,)) + b"SELECT 1")
+                await client.command(bytes((protocol.COM_PING,)))
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            pool.close()
+            await backend.stop()
+
+    asyncio.run(run())
+
+    content = path.read_text()
+    assert content.count("# Time: ") == 1
+    address = "localhost" if unix else "127.0.0.1"
+    assert f"# User@Host: unknown[unknown] @  [{address}]" in content
+    assert "SELECT 1;" in content
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# Copyright 2026 Canonical Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""Unit tests for the MySQL proxy daemon TLS support."""
+
+import asyncio
+import shutil
+import socket
+import ssl
+import struct
+import subprocess
+from pathlib import Path
+
+import pytest
+from fake_mysql import FakeMySQL
+
+from proxyd import auth, protocol, tls
+from proxyd.backend import SUPPORTED_CAPABILITIES, Credentials
+from proxyd.config import ProxyConfig
+from proxyd.pool import BackendPool
+from proxyd.protocol import PacketStream
+from proxyd.server import ProxyServer
+
+
+@pytest.fixture
+def certificate(tmp_path: Path) -> tuple[str, str]:
+    """Create a self-signed certificate for `127.0.0.1`."""
+    if not shutil.which("openssl"):
+        pytest.skip("openssl is not installed")
+
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:P-256",
+            "-nodes", "-days", "1", "-subj", "/CN=127.0.0.1",
+            "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", str(key), "-out", str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )  # fmt: skip
+    return str(cert), str(key)
+
+
+def test_client_context() -> None:
+    """Test that backend TLS modes map to the expected verification settings."""
+    assert tls.client_context(tls.DISABLED) is None
+
+    context = tls.client_context(tls.REQUIRED)
+    assert context and context.verify_mode == ssl.CERT_NONE and not context.check_hostname
+
+    context = tls.client_context(tls.VERIFY_IDENTITY)
+    assert context and context.verify_mode == ssl.CERT_REQUIRED and context.check_hostname
+
+    with pytest.raises(ValueError):
+        tls.client_context("PREFERRED")
+
+
+def test_tls_channel_resumption(certificate: tuple[str, str]) -> None:
+    """Test that TLS channels exchange data and resume sessions with tickets."""
+
+    async def connect(
+        server: ssl.SSLContext, client: ssl.SSLContext, session: ssl.SSLSession | None
+    ) -> tuple[ssl.SSLSession | None, bool]:
+        left, right = socket.socketpair()
+        left.setblocking(False)
+        right.setblocking(False)
+        with left, right:
+            upstream = tls.TLSChannel(left, server, server_side=True)
+            downstream = tls.TLSChannel(
+                right, client, server_hostname="127.0.0.1", session=session
+            )
+            await asyncio.gather(upstream.handshake(), downstream.handshake())
+
+            async def receive() -> bytes:
+                received = b""
+                while len(received) < 400_000:
+                    received += await downstream.recv()
+                return received
+
+            _, received = await asyncio.gather(upstream.sendall(b"ping" * 100_000), receive())
+            assert received == b"ping" * 100_000
+            return downstream.session, downstream.session_reused
+
+    async def run() -> None:
+        cert, key = certificate
+        server = tls.server_context(cert, key)
+        client = tls.client_context(tls.VERIFY_IDENTITY, cert)
+        assert client
+        session, reused = await connect(server, client, None)
+        assert session and not reused
+        _, reused = await connect(server, client, session)
+        assert reused
+
+    asyncio.run(run())
+
+
+async def _login_tls(
+    port: int, context: ssl.SSLContext, session: ssl.SSLSession | None
+) -> tuple[PacketStream, bytes]:
+    """Connect a client to the proxy listening on `port` and authenticate over TLS."""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket()
+    sock.setblocking(False)
+    await loop.sock_connect(sock, ("127.0.0.1", port))
+    stream = PacketStream(sock)
+    handshake = protocol.Handshake.decode(await stream.read())
+    assert handshake.capabilities & protocol.CLIENT_SSL
+
+    capabilities = SUPPORTED_CAPABILITIES | protocol.CLIENT_SSL
+    await stream.write(struct.pack("<IIB", capabilities, 1 << 24, 255) + bytes(23))
+    await stream.start_tls(context, server_hostname="127.0.0.1", session=session).handshake()
+    response = protocol.HandshakeResponse(
+        capabilities=capabilities,
+        max_packet_size=1 << 24,
+        charset=255,
+        username="slurm",
+        auth_response=auth.scramble(handshake.auth_plugin, "secret", handshake.nonce),
+        auth_plugin=handshake.auth_plugin,
+    )
+    await stream.write(response.encode())
+    result = await stream.read()
+    if result == b"\x01" + auth.FAST_AUTH_SUCCESS:
+        result = await stream.read()
+    return stream, result
+
+
+def test_pooled_session_tls(certificate: tuple[str, str]) -> None:
+    """Test that the proxy terminates client TLS and resumes TLS sessions on both sides."""
+
+    async def run() -> None:
+        cert, key = certificate
+        backend = FakeMySQL("slurm", "secret", tls_context=tls.server_context(cert, key))
+        await backend.start()
+        config = ProxyConfig(
+            endpoints=[backend.endpoint],
+            username="slurm",
+            password="secret",
+            mode="pooled",
+            listen_address="127.0.0.1",
+            listen_port=0,
+            backend_ssl_mode=tls.VERIFY_IDENTITY,
+            backend_ca_file=cert,
+        )
+        pool = BackendPool(
+            config.endpoints,
+            Credentials(config.username, config.password),
+            min_size=2,
+            tls_context=tls.client_context(config.backend_ssl_mode, config.backend_ca_file),
+        )
+        server = ProxyServer(config, pool=pool, tls_context=tls.server_context(cert, key))
+        port = server.bind().getsockname()[1]
+        serving = asyncio.create_task(server.serve_forever())
+        client_context = tls.client_context(tls.VERIFY_IDENTITY, cert)
+        assert client_context
+        session = None
+        try:
+            await pool.prime()
+            for _ in range(2):
+                client, result = await _login_tls(port, client_context, session)
+                with client.sock:
+                    assert result[0] == protocol.OK_HEADER
+                    reply = await client.command(bytes((protocol.COM_QUERY,)) + b"SELECT 1")
+                    assert reply == backend.reply
+                    session = client.tls.session if client.tls else None
+                    client.seq = 0
+                    await client.write(bytes((protocol.COM_QUIT,)))
+        finally:
+            serving.cancel()
+            pool.close()
+            await backend.stop()
+
+        stats = pool.stats
+        assert stats.tls_backend_handshakes_total == 2
+        assert stats.tls_backend_resumed_total == 1
+        assert stats.tls_client_handshakes_total == 2
+        assert stats.tls_client_resumed_total == 1
+
+    asyncio.run(run())